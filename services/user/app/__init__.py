@@ -1,29 +1,86 @@
-from flask import Flask
-from dotenv import load_dotenv
+from flask import Flask, jsonify
 
-load_dotenv()
 
+def create_app(config_object='config.Config'):
+    # Before the config module is imported, since Config reads the environment
+    from dotenv import load_dotenv
+    load_dotenv()
 
-def create_app():
     app = Flask(__name__)
-    app.config.from_object('config.Config')
+    app.config.from_object(config_object)
 
-    from .extensions import db, login_manager, csrf
+    if app.config.get('PROXY_FIX_X_FOR'):
+        from werkzeug.middleware.proxy_fix import ProxyFix
+        app.wsgi_app = ProxyFix(app.wsgi_app, x_for=app.config['PROXY_FIX_X_FOR'])
+
+    from .utils.json_provider import JSONProvider
+    app.json = JSONProvider(app)
+
+    from .extensions import (
+        db, login_manager, csrf, limiter, rate_limit_metrics, mail, mail_dispatcher,
+        user_cache, lookup_cache, password_hasher, http_client, google_jwks, pool_metrics, tokens,
+        request_metrics, last_login_buffer, readiness, proof_store, avatars, password_invites
+    )
+    pool_metrics.init_app(app)
+    request_metrics.init_app(app)
     db.init_app(app)
     login_manager.init_app(app)
     csrf.init_app(app)
+    limiter.init_app(app)
+    rate_limit_metrics.init_app(app)
+    user_cache.init_app(app)
+    lookup_cache.init_app(app)
+    password_hasher.init_app(app)
+    http_client.init_app(app)
+    google_jwks.init_app(app)
+    tokens.init_app(app)
+    mail.init_app(app)
+    mail_dispatcher.init_app(app)
+    password_invites.init_app(app)
+    last_login_buffer.init_app(app)
+    readiness.init_app(app)
+    proof_store.init_app(app)
+    avatars.init_app(app)
+
+    # TokenService only imports the model when it first revokes or syncs, but
+    # db.create_all() and migrations need the revoked_token table defined now
+    from .models import token_model  # noqa: F401
+    register_user_loaders(login_manager)
+
+    @app.errorhandler(429)
+    def rate_limited(error):
+        return jsonify({"error": "Too many requests"}), 429
+
+    from .routes import router_bp
+    app.register_blueprint(router_bp, url_prefix='/api')
 
+    from .cli import users_cli
+    app.cli.add_command(users_cli)
+
+    return app
+
+
+def register_user_loaders(login_manager):
+    """Registers the user loaders: from the session cookie or a bearer token, both through the user cache."""
+    from .extensions import db, user_cache, tokens
     from .models.user_model import User
+    from .utils.tokens import TokenUser, bearer_token
+
     @login_manager.user_loader
     def load_user(user_id):
+        # With tokens enabled, a bearer request is authenticated by its token only, never by a cookie sent alongside it
+        if tokens.enabled and bearer_token() is not None:
+            return None
         if user_id is not None:
             try:
-                return User.query.get(int(user_id))
+                return user_cache.load(db.session, User, int(user_id))
             except ValueError:
                 return None
         return None
 
-    from .routes import router_bp
-    app.register_blueprint(router_bp, url_prefix='/api')
-
-    return app
\ No newline at end of file
+    @login_manager.request_loader
+    def load_user_from_token(req):
+        claims = tokens.request_claims()
+        if claims is None:
+            return None
+        return TokenUser(claims, lambda user_id: user_cache.load(db.session, User, user_id))
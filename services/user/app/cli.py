@@ -0,0 +1,65 @@
+import json
+
+import click
+from flask.cli import AppGroup
+
+from .extensions import db, user_search
+from .controllers.import_controller import run_student_import
+from .controllers.export_controller import EXPORT_FORMATS, iter_export, gzip_chunks, parse_columns
+
+users_cli = AppGroup('users', help='User administration commands.')
+
+
+@users_cli.command('import')
+@click.argument('source', type=click.File('rb'))
+@click.option('--format', 'fmt', type=click.Choice(['csv', 'ndjson']), default=None,
+              help='Input format. Defaults to the file extension.')
+@click.option('--chunk-size', type=int, default=None, help='Rows per INSERT batch.')
+@click.option('--with-passwords', is_flag=True,
+              help='Hash passwords from the file instead of deferring password setup.')
+def import_students_command(source, fmt, chunk_size, with_passwords):
+    """Bulk-import students from a CSV or NDJSON file."""
+    fmt = fmt or ('ndjson' if source.name.endswith(('.ndjson', '.jsonl')) else 'csv')
+    report = run_student_import(source, fmt, chunk_size=chunk_size, defer_passwords=not with_passwords)
+
+    click.echo(f"Processed {report['processed']} rows: {report['created']} created, {report['failed']} failed, "
+               f"{report['invited']} invited.")
+    for error in report['errors']:
+        click.echo(json.dumps(error), err=True)
+    if 'retry_after' in report:
+        raise click.ClickException(
+            f"Password hashing pool is full; rows from {report['resume_row']} on were not imported. "
+            f"Retry them in {report['retry_after']}s."
+        )
+
+
+@users_cli.command('export')
+@click.argument('output', type=click.File('wb'), default='-')
+@click.option('--format', 'fmt', type=click.Choice(list(EXPORT_FORMATS)), default='csv', help='Output format.')
+@click.option('--columns', default=None, help='Comma-separated columns to export. Defaults to all.')
+@click.option('--role', default=None, help='Only export users with this role.')
+@click.option('--course', default=None, help='Only export students on this course.')
+@click.option('--status', 'application_status', default=None, help='Only export this application status.')
+@click.option('--gzip', 'compress', is_flag=True, help='Gzip the output.')
+def export_users_command(output, fmt, columns, role, course, application_status, compress):
+    """Stream users joined with their student/staff records as CSV or NDJSON."""
+    try:
+        columns = parse_columns(columns)
+    except ValueError as e:
+        raise click.BadParameter(str(e), param_hint='--columns')
+
+    filters = {'role': role, 'course': course, 'application_status': application_status}
+    chunks = iter_export(columns, fmt, filters)
+    if compress:
+        chunks = gzip_chunks(chunks)
+    for chunk in chunks:
+        output.write(chunk)
+    output.flush()
+
+
+@users_cli.command('reindex-search')
+def reindex_search_command():
+    """Creates the user search index and refills it from the user table."""
+    indexed = user_search.rebuild(db.session.connection())
+    db.session.commit()
+    click.echo(f"Indexed {indexed} users." if indexed else "Search index is in place.")
@@ -1,70 +1,91 @@
-import re
-import datetime
-
 from flask import request
 from flask_login import login_user, logout_user, login_required
+from sqlalchemy import insert, select, update, or_
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.exc import IntegrityError
 
 from ..models.user_model import User
-from ..extensions import db, limiter
-from ..forms import RegisterForm, LoginForm, sanitize_input
+from ..extensions import (
+    db, limiter, password_hasher, tokens, last_login_buffer, password_invites, user_cache, lookup_cache
+)
+from ..validation import REGISTER_SCHEMA, LOGIN_SCHEMA, PASSWORD_SETUP_SCHEMA, request_data
+from ..utils.hashing import HashPoolFull
+from ..utils.tokens import InvalidToken, bearer_token
+from ..utils.invites import InvalidInvite
+
+
+def _busy_response(error):
+    """503 returned when the password hashing pool is saturated."""
+    return {"message": "Server is busy. Please try again shortly."}, 503, {"Retry-After": str(error.retry_after)}
+
+
+# Dialects whose INSERT supports ON CONFLICT DO NOTHING
+_CONFLICT_INSERTS = {'postgresql': postgresql.insert, 'sqlite': sqlite.insert}
+
+
+def _insert_user(values):
+    """
+    Inserts a user in one statement and returns its id, or None when the
+    email or username is already taken.
+
+    Uniqueness is left to the database's unique indexes, so concurrent
+    signups with the same email cannot both succeed.
+    """
+    dialect_insert = _CONFLICT_INSERTS.get(db.session.get_bind().dialect.name)
+    if dialect_insert is not None:
+        stmt = dialect_insert(User).values(**values).on_conflict_do_nothing().returning(User.user_id)
+        return db.session.execute(stmt).scalar()
+
+    try:
+        with db.session.begin_nested():
+            return db.session.execute(insert(User).values(**values).returning(User.user_id)).scalar()
+    except IntegrityError:
+        return None
 
 
-def is_valid_email(email):
-    """Validate email format"""
-    pattern = r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$'
-    return re.match(pattern, email) is not None
+def _conflict_message(email, username):
+    """Works out which unique field a rejected registration collided with."""
+    conditions = [User.email == email]
+    if username:
+        conditions.append(User.username == username)
+    taken_emails = db.session.execute(select(User.email).where(or_(*conditions))).scalars().all()
+    if email in taken_emails:
+        return "Email already registered."
+    return "Username already taken."
 
 
 @limiter.limit("10 per minute")
 def register():
-    form = RegisterForm()
-
     if request.method != 'POST':
         return {"message": "Method not allowed"}, 405
 
-    try:
-        if form.validate_on_submit():
-            # Sanitize and normalize inputs
-            email = sanitize_input(form.email.data).lower()
-            username = sanitize_input(form.username.data)
-            name = sanitize_input(form.name.data)
-            surname = sanitize_input(form.surname.data)
-
-            # Validate email format
-            if not is_valid_email(email):
-                return {"message": "Invalid email format."}, 400
-
-            # Check for existing user
-            existing_user = User.query.filter_by(email=email).first()
-            if existing_user:
-                return {"message": "Email already registered."}, 400
-
-            # Check username uniqueness
-            if username:
-                existing_username = User.query.filter_by(username=username).first()
-                if existing_username:
-                    return {"message": "Username already taken."}, 400
-
-            # Create new user within transaction
-            with db.session.begin_nested():
-                new_user = User(
-                    email=email,
-                    username=username,
-                    name=name,
-                    surname=surname,
-                    role='student',
-                    consent_given=form.consent.data
-                )
-                new_user.set_password(form.password.data)
-                db.session.add(new_user)
-
-            # Commit the transaction
-            db.session.commit()
-
-            return {"message": "User registered successfully."}, 201
+    data, errors = REGISTER_SCHEMA.validate(request_data(request))
+    if errors:
+        return {"message": "Form validation failed.", "errors": errors}, 400
 
-        else:
-            return {"message": "Form validation failed.", "errors": form.errors}, 400
+    try:
+        email = data['email'].lower()
+        user_id = _insert_user({
+            "email": email,
+            "username": data['username'],
+            "name": data['name'],
+            "surname": data['surname'],
+            "role": 'student',
+            "consent_given": data['consent'],
+            "password_hash": password_hasher.hash(data['password']),
+        })
+        if user_id is None:
+            message = _conflict_message(email, data['username'])
+            db.session.rollback()
+            return {"message": message}, 400
+
+        db.session.commit()
+
+        return {"message": "User registered successfully."}, 201
+
+    except HashPoolFull as e:
+        db.session.rollback()
+        return _busy_response(e)
 
     except Exception as e:
         db.session.rollback()
@@ -73,31 +94,36 @@ def register():
 
 @limiter.limit("5 per minute")
 def login():
-    form = LoginForm()
-
     if request.method != 'POST':
         return {"message": "Method not allowed"}, 405
 
-    try:
-        if form.validate_on_submit():
-            # Sanitize and normalize email
-            email = sanitize_input(form.email.data).lower()
-
-            user = User.query.filter_by(email=email).first()
+    data, errors = LOGIN_SCHEMA.validate(request_data(request))
+    if errors:
+        return {"message": "Form validation failed.", "errors": errors}, 400
 
-            # Use constant-time comparison to prevent timing attacks
-            if user and user.check_password(form.password.data):
-                if user.is_active:
-                    login_user(user, remember=form.remember.data)
-                    user.last_login = datetime.datetime.now(datetime.timezone.utc)
+    try:
+        user = User.query.filter_by(email=data['email'].lower()).first()
+
+        # Use constant-time comparison to prevent timing attacks
+        if user and user.check_password(data['password']):
+            if user.is_active:
+                # Upgrade hashes written under an older cost policy
+                if password_hasher.needs_rehash(user.password_hash):
+                    user.set_password(data['password'])
                     db.session.commit()
-                    return {"message": "Login successful."}, 200
-                else:
-                    return {"message": "Account is deactivated."}, 403
+                login_user(user, remember=data['remember'])
+                last_login_buffer.record(user.user_id)
+                if tokens.enabled:
+                    return {"message": "Login successful.", **tokens.issue(user)}, 200
+                return {"message": "Login successful."}, 200
             else:
-                return {"message": "Invalid email or password."}, 401
+                return {"message": "Account is deactivated."}, 403
         else:
-            return {"message": "Form validation failed.", "errors": form.errors}, 400
+            return {"message": "Invalid email or password."}, 401
+
+    except HashPoolFull as e:
+        db.session.rollback()
+        return _busy_response(e)
 
     except Exception as e:
         db.session.rollback()
@@ -107,7 +133,91 @@ def login():
 @login_required
 def logout():
     try:
+        token = bearer_token()
+        if token is not None and tokens.enabled:
+            try:
+                tokens.revoke(tokens.verify(token))
+            except InvalidToken:
+                pass
         logout_user()
         return {"message": "Logout successful."}, 200
     except Exception as e:
-        return {"message": "Logout failed.", "error": str(e)}, 500
\ No newline at end of file
+        return {"message": "Logout failed.", "error": str(e)}, 500
+
+
+@limiter.limit("30 per minute")
+def refresh_token():
+    """Exchanges a refresh token for a new token pair, revoking the old refresh token."""
+    if not tokens.enabled:
+        return {"message": "Token authentication is disabled."}, 404
+
+    data = request.get_json(silent=True) or {}
+    try:
+        claims = tokens.verify(data.get('refresh_token') or '', token_type='refresh')
+    except InvalidToken:
+        return {"message": "Invalid refresh token."}, 401
+
+    # Refresh is where role changes and deactivation reach token holders
+    user = db.session.get(User, int(claims['sub']))
+    if user is None or not user.is_active:
+        return {"message": "Invalid refresh token."}, 401
+
+    tokens.revoke(claims)
+    return tokens.issue(user), 200
+
+
+def revoke_token():
+    """Revokes an access or refresh token presented in the body."""
+    if not tokens.enabled:
+        return {"message": "Token authentication is disabled."}, 404
+
+    token = (request.get_json(silent=True) or {}).get('token') or ''
+    for token_type in ('access', 'refresh'):
+        try:
+            claims = tokens.verify(token, token_type=token_type)
+        except InvalidToken:
+            continue
+        tokens.revoke(claims)
+        return {"message": "Token revoked."}, 200
+    return {"message": "Invalid token."}, 400
+
+
+@limiter.limit("5 per minute")
+def setup_password():
+    """Sets the first password of an account from the token in its invite."""
+    if not password_invites.enabled:
+        return {"message": "Password invites are disabled."}, 404
+
+    data, errors = PASSWORD_SETUP_SCHEMA.validate(request_data(request))
+    if errors:
+        return {"message": "Form validation failed.", "errors": errors}, 400
+
+    try:
+        user = db.session.get(User, password_invites.verify(data['token']))
+    except InvalidInvite:
+        user = None
+    if user is None or not user.is_active:
+        return {"message": "Invalid or expired invite."}, 400
+    if user.password_hash is not None:
+        return {"message": "Password has already been set."}, 400
+
+    try:
+        password_hash = password_hasher.hash(data['password'])
+    except HashPoolFull as e:
+        return _busy_response(e)
+    # Redeeming the invite is what makes it single-use: of two concurrent
+    # redemptions only the first UPDATE still finds no password
+    redeemed = db.session.execute(
+        update(User)
+        .where(User.user_id == user.user_id, User.password_hash.is_(None))
+        .values(password_hash=password_hash)
+        .execution_options(synchronize_session=False)
+    ).rowcount
+    db.session.commit()
+    if not redeemed:
+        return {"message": "Password has already been set."}, 400
+    # A Core UPDATE does not run the model's after_update listener
+    user_cache.invalidate(user.user_id)
+    lookup_cache.invalidate_user(user.user_id, user.email)
+    return {"message": "Password set. You can now log in."}, 200
+
@@ -0,0 +1,117 @@
+import os
+import logging
+import datetime
+
+from flask import current_app, jsonify, send_file, url_for
+from flask_login import current_user
+
+from ..extensions import db, avatars
+from ..models.user_model import User
+from ..utils.avatars import AvatarError
+
+logger = logging.getLogger(__name__)
+
+# Variants are content-addressed, so a URL always returns the same bytes
+AVATAR_MAX_AGE = 365 * 24 * 3600
+
+
+def avatar_urls(user):
+    """URLs of the user's stored picture by size name, or None when there is none."""
+    if not user.avatar_key:
+        return None
+    return {
+        name: url_for('.get_avatar', digest=user.avatar_key, name=name)
+        for name in avatars.sizes
+    }
+
+
+def _set_avatar(user, digest, url=None):
+    """Points ``user`` at a stored picture, bumping ``updated_at`` if anything changed."""
+    changed = user.avatar_key != digest or (url is not None and user.profile_picture_url != url)
+    user.avatar_key = digest
+    if url is not None:
+        user.profile_picture_url = url
+    if changed:
+        user.updated_at = datetime.datetime.now(datetime.timezone.utc)
+
+
+def refresh_from_url(user, url):
+    """
+    Stores the picture at ``url`` for ``user`` if it is new to them.
+
+    Used on OAuth sign-in: the picture is fetched the first time the provider
+    reports a URL and again only when the URL changes. The download and
+    resize run on the avatar pool after the sign-in has returned. Failures
+    are logged and leave the previous picture in place.
+    """
+    if not url or not avatars.enabled:
+        return
+    if url == user.profile_picture_url and user.avatar_key:
+        return
+    avatars.submit(_store_from_url, current_app._get_current_object(), user.user_id, url)
+
+
+def _store_from_url(app, user_id, url):
+    with app.app_context():
+        try:
+            digest = avatars.fetch(url)
+        except AvatarError:
+            logger.warning("Could not store the profile picture of user %s from %s", user_id, url, exc_info=True)
+            return
+        user = db.session.get(User, user_id)
+        if user is None:
+            return
+        _set_avatar(user, digest, url)
+        db.session.commit()
+
+
+def _read_upload(req):
+    """The uploaded bytes (raw body or multipart ``file``), at most ``max_bytes`` + 1 of them."""
+    if req.mimetype == 'multipart/form-data':
+        upload = req.files.get('file')
+        stream = upload.stream if upload else None
+    else:
+        stream = req.stream
+    if stream is None:
+        return None
+    return stream.read(avatars.max_bytes + 1)
+
+
+def upload_avatar(req):
+    if req.content_length is not None and req.content_length > avatars.max_bytes + 16 * 1024:
+        return jsonify({"error": f"Picture exceeds {avatars.max_bytes} bytes"}), 413
+    data = _read_upload(req)
+    if not data:
+        return jsonify({"error": "No picture uploaded"}), 400
+    if len(data) > avatars.max_bytes:
+        return jsonify({"error": f"Picture exceeds {avatars.max_bytes} bytes"}), 413
+
+    try:
+        digest = avatars.store(data)
+    except AvatarError as e:
+        return jsonify({"error": str(e)}), 415
+
+    user = current_user
+    _set_avatar(user, digest)
+    db.session.commit()
+    return jsonify({"message": "Profile picture updated.", "avatar": avatar_urls(user)}), 201
+
+
+def send_avatar(digest, name):
+    try:
+        path = avatars.path(digest, name)
+    except ValueError:
+        return jsonify({"error": "Not found"}), 404
+    if not os.path.exists(path):
+        return jsonify({"error": "Not found"}), 404
+
+    response = send_file(
+        path,
+        mimetype='image/webp',
+        conditional=True,
+        etag=f"{digest}-{name}",
+        max_age=AVATAR_MAX_AGE,
+    )
+    response.cache_control.public = True
+    response.cache_control.immutable = True
+    return response
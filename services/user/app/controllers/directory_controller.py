@@ -0,0 +1,121 @@
+import json
+import base64
+import binascii
+import datetime
+
+from flask import jsonify
+from sqlalchemy import select, tuple_
+
+from ..extensions import db
+from ..models.user_model import User, Student, Staff
+
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 200
+
+# Only these columns are selected; rows are never hydrated into ORM objects
+DIRECTORY_COLUMNS = (
+    User.user_id,
+    User.email,
+    User.username,
+    User.name,
+    User.surname,
+    User.role,
+    User.is_active,
+    User.created_at,
+    User.last_login,
+    Student.faculty,
+    Student.course,
+    Student.year_of_study,
+    Student.application_status,
+    Staff.department,
+)
+
+FILTERS = {
+    'role': User.role,
+    'course': Student.course,
+    'application_status': Student.application_status,
+    'department': Staff.department,
+}
+
+
+class InvalidCursor(ValueError):
+    pass
+
+
+def encode_cursor(created_at, user_id):
+    payload = json.dumps([created_at.isoformat(), user_id]).encode()
+    return base64.urlsafe_b64encode(payload).decode().rstrip('=')
+
+
+def decode_cursor(cursor):
+    """Returns the (created_at, user_id) position encoded in a page cursor."""
+    try:
+        payload = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4))
+        created_at, user_id = json.loads(payload)
+        return datetime.datetime.fromisoformat(created_at), int(user_id)
+    except (binascii.Error, ValueError, TypeError):
+        raise InvalidCursor(cursor)
+
+
+def parse_filters(args):
+    """Reads the directory filters from query string arguments."""
+    filters = {name: args.get(name) for name in FILTERS}
+    if 'is_active' in args:
+        filters['is_active'] = args['is_active'].lower() in ('1', 'true', 'yes')
+    return filters
+
+
+def apply_filters(stmt, filters):
+    for name, column in FILTERS.items():
+        if filters.get(name):
+            stmt = stmt.where(column == filters[name])
+    if filters.get('is_active') is not None:
+        stmt = stmt.where(User.is_active == filters['is_active'])
+    return stmt
+
+
+def directory_query(filters, after=None, limit=DEFAULT_PAGE_SIZE):
+    """
+    Builds one page of the user directory, newest first.
+
+    Pages are addressed by the last (created_at, user_id) seen rather than an
+    OFFSET, so every page is an index range scan of the same cost.
+    """
+    stmt = (
+        select(*DIRECTORY_COLUMNS)
+        .select_from(User)
+        .outerjoin(Student, Student.student_id == User.user_id)
+        .outerjoin(Staff, Staff.staff_id == User.user_id)
+    )
+    stmt = apply_filters(stmt, filters)
+    if after is not None:
+        stmt = stmt.where(tuple_(User.created_at, User.user_id) < tuple_(*after))
+    return stmt.order_by(User.created_at.desc(), User.user_id.desc()).limit(limit)
+
+
+def list_users(req):
+    args = req.args
+    try:
+        limit = min(max(int(args.get('limit', DEFAULT_PAGE_SIZE)), 1), MAX_PAGE_SIZE)
+    except ValueError:
+        return jsonify({"error": "limit must be an integer"}), 400
+
+    filters = parse_filters(args)
+
+    try:
+        after = decode_cursor(args['cursor']) if args.get('cursor') else None
+    except InvalidCursor:
+        return jsonify({"error": "Invalid cursor"}), 400
+
+    # Fetch one extra row to learn whether another page exists
+    rows = db.session.execute(directory_query(filters, after, limit + 1)).all()
+    page = rows[:limit]
+    next_cursor = None
+    if len(rows) > limit:
+        last = page[-1]
+        next_cursor = encode_cursor(last.created_at, last.user_id)
+
+    return jsonify({
+        "users": [dict(row._mapping) for row in page],
+        "next_cursor": next_cursor,
+    }), 200
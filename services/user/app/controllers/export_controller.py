@@ -0,0 +1,120 @@
+import io
+import csv
+import zlib
+import datetime
+
+from flask import Response, current_app, jsonify, stream_with_context
+from sqlalchemy import select
+
+from ..extensions import db
+from ..models.user_model import User, Student, Staff
+from .directory_controller import apply_filters, parse_filters
+
+EXPORT_FORMATS = {'csv': 'text/csv', 'ndjson': 'application/x-ndjson'}
+EXPORT_BATCH_SIZE = 1000
+
+EXPORT_COLUMNS = {
+    'user_id': User.user_id,
+    'email': User.email,
+    'username': User.username,
+    'name': User.name,
+    'surname': User.surname,
+    'role': User.role,
+    'is_active': User.is_active,
+    'consent_given': User.consent_given,
+    'created_at': User.created_at,
+    'last_login': User.last_login,
+    'faculty': Student.faculty,
+    'course': Student.course,
+    'year_of_study': Student.year_of_study,
+    'application_status': Student.application_status,
+    'has_completed_onboarding': Student.has_completed_onboarding,
+    'department': Staff.department,
+}
+
+
+def parse_columns(value):
+    """Returns the requested export columns, raising ValueError on unknown names."""
+    if not value:
+        return list(EXPORT_COLUMNS)
+    columns = [name.strip() for name in value.split(',') if name.strip()]
+    unknown = [name for name in columns if name not in EXPORT_COLUMNS]
+    if unknown or not columns:
+        raise ValueError(f"Unknown columns: {', '.join(unknown)}" if unknown else "No columns selected")
+    return columns
+
+
+def export_query(columns, filters):
+    stmt = (
+        select(*(EXPORT_COLUMNS[name].label(name) for name in columns))
+        .select_from(User)
+        .outerjoin(Student, Student.student_id == User.user_id)
+        .outerjoin(Staff, Staff.staff_id == User.user_id)
+    )
+    return apply_filters(stmt, filters).order_by(User.user_id).execution_options(yield_per=EXPORT_BATCH_SIZE)
+
+
+def _value(value):
+    return value.isoformat() if isinstance(value, (datetime.date, datetime.datetime)) else value
+
+
+def iter_export(columns, fmt, filters):
+    """
+    Yields the export as UTF-8 chunks, one per fetched batch of rows.
+
+    The query runs with ``yield_per`` so rows arrive through a server-side
+    cursor where the driver supports one; memory is bounded by the batch
+    size, not the table size.
+    """
+    buffer = io.StringIO()
+    writer = csv.writer(buffer) if fmt == 'csv' else None
+    dumpb = current_app.json.dumpb
+    if writer:
+        writer.writerow(columns)
+
+    result = db.session.execute(export_query(columns, filters))
+    for partition in result.partitions():
+        for row in partition:
+            if writer:
+                writer.writerow([_value(value) for value in row])
+            else:
+                # Keys stay in the requested column order
+                buffer.write(dumpb(dict(zip(columns, row)), sort_keys=False).decode())
+                buffer.write('\n')
+        yield buffer.getvalue().encode()
+        buffer.seek(0)
+        buffer.truncate()
+
+    if buffer.tell():
+        yield buffer.getvalue().encode()
+
+
+def gzip_chunks(chunks):
+    """Gzip-compresses a stream of byte chunks as it is produced."""
+    compressor = zlib.compressobj(6, zlib.DEFLATED, 31)
+    for chunk in chunks:
+        compressed = compressor.compress(chunk)
+        if compressed:
+            yield compressed
+    yield compressor.flush()
+
+
+def export_users(req):
+    fmt = req.args.get('format', 'csv')
+    if fmt not in EXPORT_FORMATS:
+        return jsonify({"error": "format must be csv or ndjson"}), 400
+    try:
+        columns = parse_columns(req.args.get('columns'))
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    chunks = iter_export(columns, fmt, parse_filters(req.args))
+    headers = {
+        "Content-Disposition": f"attachment; filename=users.{fmt}",
+        "Vary": "Accept-Encoding",
+    }
+    if req.accept_encodings['gzip']:
+        chunks = gzip_chunks(chunks)
+        headers["Content-Encoding"] = "gzip"
+
+    return Response(stream_with_context(chunks), mimetype=EXPORT_FORMATS[fmt], headers=headers)
@@ -0,0 +1,252 @@
+import io
+import csv
+import json
+import datetime
+
+from flask import jsonify, current_app
+from sqlalchemy import insert, select
+from sqlalchemy.exc import IntegrityError
+
+from ..extensions import db, limiter, password_hasher, password_invites
+from ..validation import sanitize_input, is_valid_email
+from ..models.user_model import User, Student
+from ..utils.hashing import HashPoolFull
+
+UTC = datetime.timezone.utc
+
+IMPORT_FORMATS = ('csv', 'ndjson')
+
+
+def iter_records(stream, fmt):
+    """Yields (row_number, record) pairs from a binary CSV or NDJSON stream."""
+    text = io.TextIOWrapper(stream, encoding='utf-8-sig', newline='')
+    if fmt == 'csv':
+        reader = csv.DictReader(text)
+        for record in reader:
+            yield reader.line_num, record
+        return
+
+    for line_no, line in enumerate(text, start=1):
+        if not line.strip():
+            continue
+        try:
+            record = json.loads(line)
+        except ValueError:
+            record = None
+        yield line_no, record if isinstance(record, dict) else None
+
+
+def _clean_record(record):
+    """Normalizes one import record, returning (row, errors)."""
+    if record is None:
+        return None, {"row": ["Malformed record."]}
+
+    def text(key):
+        value = record.get(key)
+        return sanitize_input(str(value)) if value not in (None, '') else None
+
+    row = {
+        "email": (text('email') or '').lower(),
+        "username": text('username'),
+        "name": text('name'),
+        "surname": text('surname'),
+        "faculty": text('faculty'),
+        "course": text('course'),
+        "year_of_study": text('year_of_study'),
+        "password": record.get('password') or None,
+    }
+
+    errors = {}
+    if not row['email'] or not is_valid_email(row['email']):
+        errors['email'] = ["Invalid email format."]
+    if row['username'] is not None and not 3 <= len(row['username']) <= 50:
+        errors['username'] = ["Field must be between 3 and 50 characters long."]
+    for field in ('name', 'surname', 'faculty', 'course'):
+        if not row[field]:
+            errors[field] = ["This field is required."]
+        elif len(row[field]) > 100:
+            errors[field] = ["Field cannot be longer than 100 characters."]
+    if row['year_of_study'] is not None:
+        try:
+            row['year_of_study'] = int(row['year_of_study'])
+        except ValueError:
+            errors['year_of_study'] = ["Not a valid integer value."]
+
+    return row, errors
+
+
+class StudentImport:
+    """
+    Streams student records into the database in chunks.
+
+    Duplicates inside the file are rejected in memory; conflicts with existing
+    users are found with one IN-query per chunk, and each chunk is written as a
+    multi-row INSERT for users followed by one for their student rows.
+
+    Users left without a password are mailed a set-password invite once
+    their chunk commits. If the hashing pool is saturated the import stops
+    after the last committed chunk and the report carries ``retry_after``
+    and ``resume_row``, the first row that was not written.
+    """
+
+    def __init__(self, chunk_size=1000, defer_passwords=True):
+        self.chunk_size = chunk_size
+        self.defer_passwords = defer_passwords
+        self.processed = 0
+        self.created = 0
+        self.invited = 0
+        self.retry_after = None
+        self.resume_row = None
+        self.errors = []
+        self._seen_emails = set()
+        self._seen_usernames = set()
+
+    def run(self, records):
+        try:
+            self._run(records)
+        except HashPoolFull as e:
+            db.session.rollback()
+            self.retry_after = e.retry_after
+        return self.report()
+
+    def _run(self, records):
+        chunk = []
+        for row_no, record in records:
+            self.processed += 1
+            row, errors = _clean_record(record)
+            if not errors:
+                if row['email'] in self._seen_emails:
+                    errors = {"email": ["Duplicate email in import file."]}
+                elif row['username'] and row['username'] in self._seen_usernames:
+                    errors = {"username": ["Duplicate username in import file."]}
+            if errors:
+                self._fail(row_no, row, errors)
+                continue
+
+            self._seen_emails.add(row['email'])
+            if row['username']:
+                self._seen_usernames.add(row['username'])
+            chunk.append((row_no, row))
+            if len(chunk) >= self.chunk_size:
+                self._import_chunk(chunk)
+                chunk = []
+
+        if chunk:
+            self._import_chunk(chunk)
+
+    def report(self):
+        report = {
+            "processed": self.processed,
+            "created": self.created,
+            "invited": self.invited,
+            "failed": len(self.errors),
+            "errors": self.errors,
+        }
+        if self.retry_after is not None:
+            report["retry_after"] = self.retry_after
+            report["resume_row"] = self.resume_row
+        return report
+
+    def _fail(self, row_no, row, errors):
+        self.errors.append({"row": row_no, "email": row['email'] if row else None, "errors": errors})
+
+    def _import_chunk(self, chunk):
+        self.resume_row = chunk[0][0]
+        emails = [row['email'] for _, row in chunk]
+        usernames = [row['username'] for _, row in chunk if row['username']]
+        taken_emails = set(db.session.scalars(select(User.email).where(User.email.in_(emails))))
+        taken_usernames = set(
+            db.session.scalars(select(User.username).where(User.username.in_(usernames)))
+        ) if usernames else set()
+
+        pending = []
+        for row_no, row in chunk:
+            if row['email'] in taken_emails:
+                self._fail(row_no, row, {"email": ["Email already registered."]})
+            elif row['username'] in taken_usernames:
+                self._fail(row_no, row, {"username": ["Username already taken."]})
+            else:
+                pending.append((row_no, row))
+
+        if pending:
+            self._insert(pending)
+
+    def _insert(self, pending):
+        try:
+            invitees = self._insert_rows([row for _, row in pending])
+            db.session.commit()
+            self.created += len(pending)
+            self.invited += password_invites.send(invitees)
+        except IntegrityError:
+            # Lost a race with a concurrent insert: isolate the offending rows.
+            db.session.rollback()
+            if len(pending) == 1:
+                row_no, row = pending[0]
+                self._fail(row_no, row, {"email": ["Conflicts with an existing user."]})
+                return
+            for item in pending:
+                self._insert([item])
+
+    def _insert_rows(self, rows):
+        """Writes the rows and returns ``(user_id, email, name)`` of those without a password."""
+        now = datetime.datetime.now(UTC)
+        user_rows = [{
+            "email": row['email'],
+            "username": row['username'],
+            "name": row['name'],
+            "surname": row['surname'],
+            "role": 'student',
+            "password_hash": None if self.defer_passwords or not row['password'] else password_hasher.hash(row['password']),
+            "is_active": True,
+            "consent_given": False,
+            "created_at": now,
+            "updated_at": now,
+        } for row in rows]
+
+        result = db.session.execute(
+            insert(User).returning(User.user_id, User.email, sort_by_parameter_order=True),
+            user_rows,
+        )
+        user_ids = {email: user_id for user_id, email in result}
+
+        db.session.execute(insert(Student), [{
+            "student_id": user_ids[row['email']],
+            "faculty": row['faculty'],
+            "course": row['course'],
+            "year_of_study": row['year_of_study'],
+            "application_status": 'Pending',
+            "has_completed_onboarding": False,
+            "created_at": now,
+            "updated_at": now,
+        } for row in rows])
+
+        return [
+            (user_ids[user['email']], user['email'], user['name'])
+            for user in user_rows if user['password_hash'] is None
+        ]
+
+
+def run_student_import(stream, fmt, chunk_size=None, defer_passwords=True):
+    """Imports students from a CSV/NDJSON stream and returns the per-row report."""
+    chunk_size = chunk_size or current_app.config.get('IMPORT_CHUNK_SIZE', 1000)
+    return StudentImport(chunk_size=chunk_size, defer_passwords=defer_passwords).run(iter_records(stream, fmt))
+
+
+@limiter.limit("10 per hour")
+def import_students(req):
+    upload = req.files.get('file')
+    fmt = (req.args.get('format') or '').lower()
+    if not fmt and upload and upload.filename:
+        fmt = upload.filename.rsplit('.', 1)[-1].lower()
+    if not fmt:
+        fmt = 'ndjson' if req.mimetype in ('application/x-ndjson', 'application/ndjson') else 'csv'
+    if fmt not in IMPORT_FORMATS:
+        return jsonify({"error": "Unsupported import format"}), 400
+
+    defer_passwords = req.args.get('with_passwords', 'false').lower() != 'true'
+    stream = upload.stream if upload else req.stream
+    report = run_student_import(stream, fmt, defer_passwords=defer_passwords)
+    if 'retry_after' in report:
+        # Committed chunks stay; the caller re-sends the file from resume_row
+        return jsonify(report), 503, {"Retry-After": str(report['retry_after'])}
+    return jsonify(report), 200
@@ -0,0 +1,108 @@
+from flask import Response, current_app, jsonify
+from sqlalchemy import select
+
+from ..extensions import (
+    db, pool_metrics, rate_limit_metrics, user_cache, lookup_cache, password_hasher, mail_dispatcher,
+    request_metrics, last_login_buffer, readiness, proof_store, avatars, password_invites
+)
+from ..models.user_model import User
+
+# Public profile fields other services may resolve user ids to
+LOOKUP_COLUMNS = (
+    User.user_id,
+    User.email,
+    User.username,
+    User.name,
+    User.surname,
+    User.role,
+    User.is_active,
+    User.profile_picture_url,
+)
+
+
+def get_stats():
+    return jsonify({
+        "db_pool": pool_metrics.stats(db.engine),
+        "user_cache": user_cache.stats(),
+        "lookup_cache": lookup_cache.stats(),
+        "password_hasher": password_hasher.stats(),
+        "rate_limits": rate_limit_metrics.stats(),
+        "mail": mail_dispatcher.stats(),
+        "password_invites": password_invites.stats(),
+        "last_login": last_login_buffer.stats(),
+        "readiness": readiness.stats(),
+        "medical_proofs": proof_store.stats(),
+        "avatars": avatars.stats(),
+    }), 200
+
+
+def get_readiness():
+    if readiness.check():
+        return jsonify({"status": "ready"}), 200
+    return jsonify({"status": "warming"}), 503, {'Retry-After': '1'}
+
+
+def get_metrics():
+    return Response(request_metrics.render(), mimetype='text/plain; version=0.0.4')
+
+
+def _parse_lookup_keys(data):
+    """Returns ('id' | 'email', keys) from the body, deduplicated in request order."""
+    if not isinstance(data, dict) or ('ids' in data) == ('emails' in data):
+        raise ValueError("Send either 'ids' or 'emails'")
+    kind = 'id' if 'ids' in data else 'email'
+    keys = data['ids' if kind == 'id' else 'emails']
+    if not isinstance(keys, list):
+        raise ValueError(f"'{kind}s' must be a list")
+    if kind == 'id':
+        if not all(isinstance(key, int) and not isinstance(key, bool) for key in keys):
+            raise ValueError("'ids' must be integers")
+    else:
+        if not all(isinstance(key, str) for key in keys):
+            raise ValueError("'emails' must be strings")
+        keys = [key.strip().lower() for key in keys]
+    return kind, list(dict.fromkeys(keys))
+
+
+def lookup_profiles(kind, keys, chunk_size):
+    """
+    Returns {key: profile} for the users that exist, reading the cache first.
+
+    Misses are fetched with one ``IN`` query per ``chunk_size`` keys, which
+    keeps each statement under the driver's bound-parameter limit.
+    """
+    column = User.user_id if kind == 'id' else User.email
+    found = {}
+    misses = []
+    for key in keys:
+        profile = lookup_cache.get((kind, key))
+        if profile is None:
+            misses.append(key)
+        else:
+            found[key] = profile
+
+    for start in range(0, len(misses), chunk_size):
+        chunk = misses[start:start + chunk_size]
+        for row in db.session.execute(select(*LOOKUP_COLUMNS).where(column.in_(chunk))):
+            profile = dict(row._mapping)
+            key = profile['user_id'] if kind == 'id' else profile['email']
+            found[key] = profile
+            lookup_cache.set((kind, key), profile)
+    return found
+
+
+def lookup_users(req):
+    try:
+        kind, keys = _parse_lookup_keys(req.get_json(silent=True))
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    max_keys = current_app.config.get('USER_LOOKUP_MAX_KEYS', 1000)
+    if len(keys) > max_keys:
+        return jsonify({"error": f"At most {max_keys} {kind}s per request"}), 400
+
+    found = lookup_profiles(kind, keys, current_app.config.get('USER_LOOKUP_CHUNK_SIZE', 500))
+    return jsonify({
+        "users": [found[key] for key in keys if key in found],
+        "missing": [key for key in keys if key not in found],
+    }), 200
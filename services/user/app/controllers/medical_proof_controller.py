@@ -0,0 +1,123 @@
+import os
+import datetime
+import itertools
+
+from flask import jsonify, send_file
+from flask_login import current_user
+
+from ..extensions import db, proof_store
+from ..models.user_model import Student
+from ..utils.file_store import FileTooLarge
+
+# Accepted formats, recognised from the file's first bytes rather than the client's Content-Type
+SIGNATURES = (
+    (b'%PDF-', 'pdf', 'application/pdf'),
+    (b'\x89PNG\r\n\x1a\n', 'png', 'image/png'),
+    (b'\xff\xd8\xff', 'jpg', 'image/jpeg'),
+)
+MIMETYPES = {extension: mimetype for _, extension, mimetype in SIGNATURES}
+SIGNATURE_LENGTH = max(len(signature) for signature, _, _ in SIGNATURES)
+
+# Room for multipart boundaries and part headers on top of the file itself
+MULTIPART_OVERHEAD = 16 * 1024
+
+
+def _sniff(head):
+    for signature, extension, _ in SIGNATURES:
+        if head.startswith(signature):
+            return extension
+    return None
+
+
+def _too_large():
+    return jsonify({"error": f"File exceeds {proof_store.max_bytes} bytes"}), 413
+
+
+def _upload_stream(req):
+    """The file's stream: the raw request body, or the ``file`` part of a multipart form."""
+    if req.mimetype != 'multipart/form-data':
+        return req.stream
+    # Werkzeug stops parsing (413) once the body passes this, instead of spooling it all
+    req.max_content_length = proof_store.max_bytes + MULTIPART_OVERHEAD
+    upload = req.files.get('file')
+    return upload.stream if upload else None
+
+
+def upload_medical_proof(req):
+    if current_user.role != 'student':
+        return jsonify({"error": "Only students upload medical proof"}), 403
+    student = db.session.get(Student, current_user.user_id)
+    if student is None:
+        return jsonify({"error": "Student record not found"}), 404
+
+    # Refuse an oversized body from its Content-Length, before reading any of it
+    overhead = MULTIPART_OVERHEAD if req.mimetype == 'multipart/form-data' else 0
+    if req.content_length is not None and req.content_length > proof_store.max_bytes + overhead:
+        return _too_large()
+
+    stream = _upload_stream(req)
+    if stream is None:
+        return jsonify({"error": "No file uploaded"}), 400
+
+    chunks = proof_store.chunks(stream)
+    head = b''
+    for chunk in chunks:
+        head += chunk
+        if len(head) >= SIGNATURE_LENGTH:
+            break
+    extension = _sniff(head)
+    if extension is None:
+        return jsonify({"error": "Medical proof must be a PDF, PNG or JPEG file"}), 415
+
+    try:
+        key, size, created = proof_store.save(itertools.chain((head,), chunks), extension)
+    except FileTooLarge:
+        return _too_large()
+
+    if student.medical_proof_path != key:
+        student.medical_proof_path = key
+        student.updated_at = datetime.datetime.now(datetime.timezone.utc)
+        db.session.commit()
+
+    return jsonify({
+        "message": "Medical proof uploaded.",
+        "sha256": key.rsplit('/', 1)[-1].split('.')[0],
+        "size": size,
+        "deduplicated": not created,
+    }), 201
+
+
+def send_medical_proof(user_id):
+    """
+    Streams a student's medical proof from disk.
+
+    Range requests, If-None-Match and If-Modified-Since are answered by
+    ``send_file``; the file goes out through the server's file wrapper
+    (sendfile under gunicorn), or as X-Sendfile when USE_X_SENDFILE is set.
+    """
+    student = db.session.get(Student, user_id)
+    if student is None or not student.medical_proof_path:
+        return jsonify({"error": "No medical proof uploaded"}), 404
+    key = student.medical_proof_path
+    try:
+        path = proof_store.path(key)
+    except ValueError:
+        return jsonify({"error": "No medical proof uploaded"}), 404
+    if not os.path.exists(path):
+        return jsonify({"error": "Medical proof file is missing"}), 404
+
+    digest, _, extension = key.rsplit('/', 1)[-1].partition('.')
+    response = send_file(
+        path,
+        mimetype=MIMETYPES.get(extension, 'application/octet-stream'),
+        download_name=f"medical-proof.{extension}",
+        conditional=True,
+        etag=digest,
+        max_age=0,
+    )
+    # Werkzeug only sets this on 206 responses; advertise it so viewers can seek
+    response.accept_ranges = 'bytes'
+    # Stored content never changes, but the student may upload a new file
+    response.cache_control.private = True
+    response.cache_control.no_cache = True
+    return response
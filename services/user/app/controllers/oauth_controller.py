@@ -1,15 +1,12 @@
-import jwt
-import requests
-import datetime
+from urllib.parse import urlencode
 
 from flask_login import login_user
 from sqlalchemy.exc import IntegrityError
 from flask import jsonify, redirect, current_app, request
 
-from ..extensions import db
+from ..extensions import db, http_client, google_jwks, last_login_buffer, tokens as auth_tokens
 from ..models.user_model import User
-
-UTC = datetime.timezone.utc
+from .avatar_controller import refresh_from_url
 
 
 def google_auth():
@@ -35,7 +32,6 @@ def google_auth():
         'prompt': 'consent'
     }
 
-    from requests.compat import urlencode
     return redirect(f"{auth_url}?{urlencode(params)}")
 
 
@@ -48,7 +44,7 @@ def google_callback():
     if not code:
         return jsonify({"error": "Missing authorization code"}), 400
 
-    token_url = 'https://oauth2.googleapis.com/token'
+    token_url = current_app.config.get("GOOGLE_TOKEN_URI", 'https://oauth2.googleapis.com/token')
     payload = {
         'code': code,
         'client_id': client_id,
@@ -58,7 +54,7 @@ def google_callback():
     }
 
     try:
-        response = requests.post(token_url, data=payload, timeout=10)
+        response = http_client.post(token_url, data=payload)
         response.raise_for_status()
         tokens = response.json()
     except Exception as e:
@@ -66,7 +62,7 @@ def google_callback():
 
     id_token = tokens.get('id_token')
     try:
-        user_info = jwt.decode(id_token, options={"verify_signature": False}, algorithms=["RS256"])
+        user_info = google_jwks.decode(id_token, audience=client_id)
     except Exception as e:
         return jsonify({"error": "Invalid token from Google"}), 500
 
@@ -85,7 +81,7 @@ def google_callback():
         if user:
             user.social_provider_id = google_id
             user.social_provider = 'Google'
-            db.session.flush()
+            db.session.commit()
         else:
             try:
                 user = User(
@@ -104,9 +100,13 @@ def google_callback():
                 db.session.rollback()
                 return jsonify({"error": "Database constraint violation"}), 500
 
-    user.last_login = datetime.datetime.now(UTC)
-    db.session.commit()
+    refresh_from_url(user, picture)
+    last_login_buffer.record(user.user_id)
     login_user(user)
 
     # Redirect based on user role
-    return redirect(f"http://localhost:5173/{user.role}/dashboard")
\ No newline at end of file
+    dashboard_url = f"http://localhost:5173/{user.role}/dashboard"
+    if auth_tokens.enabled:
+        # The fragment reaches the SPA without being sent to any server
+        dashboard_url += f"#{urlencode(auth_tokens.issue(user))}"
+    return redirect(dashboard_url)
\ No newline at end of file
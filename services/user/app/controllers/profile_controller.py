@@ -1,24 +1,125 @@
-from flask import jsonify
+import hashlib
+import datetime
+
+from flask import Response, jsonify
 from flask_login import current_user
+from sqlalchemy import select
+from sqlalchemy.exc import IntegrityError
 
-from ..extensions import db
+from ..extensions import db, user_cache
+from ..models.user_model import User, role_loader_options
+from ..validation import PROFILE_SCHEMA, request_data
+from .avatar_controller import avatar_urls
+
+PROFILE_FIELDS = ('name', 'surname', 'username')
+
+# Role-specific fields returned under "student" / "staff"
+ROLE_DETAIL_FIELDS = {
+    'student': ('faculty', 'course', 'year_of_study', 'application_status', 'has_completed_onboarding'),
+    'staff': ('department',),
+}
+
+
+def _load_profile(user):
+    """
+    The user together with their student or staff row, in one query.
+
+    The session user is usually already in the identity map, where a plain
+    SELECT would hand back its cached attributes; ``populate_existing``
+    overwrites them with the row as it is now.
+    """
+    return db.session.execute(
+        select(User)
+        .options(*role_loader_options(user.role))
+        .where(User.user_id == user.user_id)
+        .execution_options(populate_existing=True)
+    ).unique().scalar_one()
+
+
+def _role_details(user):
+    """Returns ('student' | 'staff', row) for the user's role, or (None, None)."""
+    # Only touch the relationship the role implies; the other one is not loaded
+    if user.role == 'student':
+        return 'student', user.student
+    if user.role in ('staff', 'admin'):
+        return 'staff', user.staff
+    return None, None
+
+
+def _as_utc(value):
+    return value.replace(tzinfo=datetime.timezone.utc) if value.tzinfo is None else value
+
+
+def _profile_validators(user, details=None):
+    """Strong ETag and Last-Modified for a user's profile, from the latest updated_at."""
+    updated_at = _as_utc(user.updated_at or user.created_at)
+    if details is not None:
+        updated_at = max(updated_at, _as_utc(details.updated_at or details.created_at))
+    etag = hashlib.sha1(f"{user.user_id}:{updated_at.isoformat()}".encode()).hexdigest()
+    return etag, updated_at.replace(microsecond=0)
+
+
+def _not_modified(req, etag, last_modified):
+    # If-None-Match takes precedence over If-Modified-Since when both are sent
+    if req.if_none_match:
+        return req.if_none_match.contains_weak(etag)
+    if req.if_modified_since:
+        return last_modified <= req.if_modified_since
+    return False
+
+
+def get_profile(req):
+    user = _load_profile(current_user)
+    kind, details = _role_details(user)
+    etag, last_modified = _profile_validators(user, details)
+
+    # Answer revalidations before building the body
+    if _not_modified(req, etag, last_modified):
+        response = Response(status=304)
+    else:
+        profile = {
+            "email": user.email,
+            "username": user.username,
+            "name": user.name,
+            "surname": user.surname,
+            "role": user.role,
+            "profile_picture_url": user.profile_picture_url,
+            "avatar": avatar_urls(user),
+        }
+        if kind is not None:
+            profile[kind] = None if details is None else {
+                field: getattr(details, field) for field in ROLE_DETAIL_FIELDS[kind]
+            }
+        response = jsonify(profile)
+
+    response.set_etag(etag)
+    response.last_modified = last_modified
+    response.cache_control.private = True
+    response.cache_control.no_cache = True
+    return response
 
-def get_profile():
-    user = current_user
-    return jsonify({
-        "email": user.email,
-        "username": user.username,
-        "name": user.name,
-        "surname": user.surname,
-        "role": user.role,
-        "profile_picture_url": user.profile_picture_url
-    }), 200
 
 def update_profile(req):
     user = current_user
-    data = req.get_json()
-    user.name = data.get('name', user.name)
-    user.surname = data.get('surname', user.surname)
-    user.username = data.get('username', user.username)
-    db.session.commit()
-    return jsonify({"message": "Profile updated."}), 200
\ No newline at end of file
+    data, errors = PROFILE_SCHEMA.validate(request_data(req))
+    if errors:
+        return jsonify({"error": "Validation failed.", "errors": errors}), 400
+
+    changed = False
+    for field in PROFILE_FIELDS:
+        value = data.get(field, getattr(user, field))
+        if value != getattr(user, field):
+            setattr(user, field, value)
+            changed = True
+    if changed:
+        user.updated_at = datetime.datetime.now(datetime.timezone.utc)
+    user_id = user.user_id
+    try:
+        db.session.commit()
+    except IntegrityError:
+        # Usernames are unique; the index is the check, as in register
+        db.session.rollback()
+        return jsonify({"message": "Username already taken."}), 400
+    finally:
+        user_cache.invalidate(user_id)
+    return jsonify({"message": "Profile updated."}), 200
@@ -0,0 +1,94 @@
+import logging
+import datetime
+
+from flask import current_app, jsonify
+from flask_login import current_user
+from sqlalchemy import select, update
+
+from ..extensions import db, mail_dispatcher
+from ..models.user_model import User, Student
+from ..validation import STATUS_TRANSITION_SCHEMA, request_data
+
+logger = logging.getLogger(__name__)
+
+UTC = datetime.timezone.utc
+
+# Body fields that select students, and the columns they compare
+TRANSITION_FILTERS = {
+    'from_status': Student.application_status,
+    'course': Student.course,
+    'faculty': Student.faculty,
+}
+
+
+def notify_students(status, student_ids):
+    """Queues a mail telling each student their new status; returns how many were accepted."""
+    if not student_ids or not mail_dispatcher.enabled or not current_app.config.get('APPLICATION_STATUS_NOTIFY', True):
+        return 0
+    from flask_mail import Message
+
+    sender = current_app.config.get('MAIL_DEFAULT_SENDER')
+    recipients = db.session.execute(select(User.email, User.name).where(User.user_id.in_(student_ids)))
+    return mail_dispatcher.enqueue_many(
+        Message(
+            subject=f"Your NumerAid application is now {status}",
+            recipients=[email],
+            sender=sender,
+            body=f"Hi {name},\n\nThe status of your NumerAid application has changed to: {status}.\n",
+        )
+        for email, name in recipients
+    )
+
+
+def transition_statuses(status, filters, chunk_size):
+    """
+    Moves every student matching ``filters`` to ``status``.
+
+    Each chunk is one UPDATE over a ``LIMIT``-ed subquery of matching ids,
+    committed on its own so row locks are held briefly. Students already in
+    ``status`` never match, so the next chunk picks up where the last one
+    stopped and rerunning a transition is harmless. The ids each UPDATE
+    returns are mailed their new status once the chunk commits. Returns
+    ``(updated, chunks, notified)``.
+    """
+    batch = select(Student.student_id).where(Student.application_status.is_distinct_from(status))
+    for name, column in TRANSITION_FILTERS.items():
+        if filters.get(name):
+            batch = batch.where(column == filters[name])
+    batch = batch.limit(chunk_size)
+
+    updated = chunks = notified = 0
+    while True:
+        moved = db.session.execute(
+            update(Student)
+            .where(Student.student_id.in_(batch.scalar_subquery()))
+            .values(application_status=status, updated_at=datetime.datetime.now(UTC))
+            .returning(Student.student_id)
+            .execution_options(synchronize_session=False)
+        ).scalars().all()
+        db.session.commit()
+        chunks += 1
+        updated += len(moved)
+        notified += notify_students(status, moved)
+        if len(moved) < chunk_size:
+            return updated, chunks, notified
+
+
+def transition_application_status(req):
+    values, errors = STATUS_TRANSITION_SCHEMA.validate(request_data(req))
+    if errors:
+        return jsonify({"error": "Validation failed.", "errors": errors}), 400
+    if not any(values.get(name) for name in TRANSITION_FILTERS):
+        return jsonify({"error": "Select students by from_status, course or faculty."}), 400
+
+    chunk_size = current_app.config.get('APPLICATION_STATUS_CHUNK_SIZE', 1000)
+    updated, chunks, notified = transition_statuses(values['status'], values, chunk_size)
+    logger.info("User %s moved %d students to %r (filters: %s)", current_user.user_id, updated,
+                values['status'], {name: values.get(name) for name in TRANSITION_FILTERS})
+
+    return jsonify({
+        "status": values['status'],
+        "updated": updated,
+        "chunks": chunks,
+        "notified": notified,
+    }), 200
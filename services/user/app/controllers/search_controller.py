@@ -0,0 +1,75 @@
+from flask import jsonify
+from sqlalchemy import column, func, literal, literal_column, select, table, text
+
+from ..extensions import db, user_search
+from ..models.user_model import User
+from ..utils.search import FTS_TABLE, FTS_RANK, TRIGRAM_DOCUMENT, search_terms, fts_query, like_pattern
+
+DEFAULT_LIMIT = 10
+MAX_LIMIT = 50
+# Shorter queries match too much of the table to be useful as a typeahead
+MIN_QUERY_LENGTH = 2
+
+SEARCH_COLUMNS = (
+    User.user_id,
+    User.email,
+    User.username,
+    User.name,
+    User.surname,
+    User.role,
+    User.is_active,
+    User.profile_picture_url,
+)
+
+
+def search_query(backend, terms, role=None, limit=DEFAULT_LIMIT):
+    """
+    Builds the ranked search for ``terms`` on the given index backend.
+
+    FTS5 matches every term as a word prefix and ranks by bm25; the top
+    ``limit`` matches are picked inside the FTS5 query and only those are
+    joined to the user table. The trigram index matches every term as a
+    substring and ranks by word similarity to the whole query. Without
+    either, the same substring match is a scan ordered by name.
+    """
+    if backend == 'fts5':
+        fts = table(FTS_TABLE, column('rowid'), column('role'))
+        score = literal_column(FTS_RANK).label('score')
+        candidates = select(fts.c.rowid.label('user_id'), score).where(
+            text(f"{FTS_TABLE} MATCH :match").bindparams(match=fts_query(terms))
+        )
+        if role:
+            candidates = candidates.where(fts.c.role == role)
+        candidates = candidates.order_by(score, fts.c.rowid).limit(limit).subquery('candidates')
+        return (
+            select(*SEARCH_COLUMNS)
+            .join_from(candidates, User, User.user_id == candidates.c.user_id)
+            .order_by(candidates.c.score, User.user_id)
+        )
+
+    document = literal_column(TRIGRAM_DOCUMENT)
+    stmt = select(*SEARCH_COLUMNS).where(*(document.like(literal(like_pattern(term)), escape='\\') for term in terms))
+    if role:
+        stmt = stmt.where(User.role == role)
+    if backend == 'trigram':
+        order = (func.word_similarity(' '.join(terms), document).desc(),)
+    else:
+        order = (User.surname, User.name)
+    return stmt.order_by(*order, User.user_id).limit(limit)
+
+
+def search_users(req):
+    args = req.args
+    try:
+        limit = min(max(int(args.get('limit', DEFAULT_LIMIT)), 1), MAX_LIMIT)
+    except ValueError:
+        return jsonify({"error": "limit must be an integer"}), 400
+
+    query = args.get('q', '').strip()
+    terms = search_terms(query)
+    if len(query) < MIN_QUERY_LENGTH or not terms:
+        return jsonify({"users": []}), 200
+
+    backend = user_search.backend(db.session.connection())
+    rows = db.session.execute(search_query(backend, terms, args.get('role'), limit)).all()
+    return jsonify({"users": [dict(row._mapping) for row in rows]}), 200
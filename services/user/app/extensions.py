@@ -1,14 +1,45 @@
 from flask_sqlalchemy import SQLAlchemy
 from flask_login import LoginManager
-from flask_wtf import CSRFProtect
 from flask_limiter import Limiter
-from flask_limiter.util import get_remote_address
 from flask_mail import Mail
 
+from .utils.cache import UserCache, LookupCache
+from .utils.hashing import PasswordHasher
+from .utils.http_client import HttpClient
+from .utils.jwks import JWKSCache
+from .utils.pool_metrics import PoolMetrics
+from .utils.rate_limit import RateLimitMetrics, rate_limit_key
+from .utils.csrf import TokenAwareCSRFProtect
+from .utils.tokens import TokenService
+from .utils.mail_queue import MailDispatcher
+from .utils.request_metrics import RequestMetrics
+from .utils.last_login import LastLoginBuffer
+from .utils.readiness import Readiness
+from .utils.file_store import ContentStore
+from .utils.avatars import AvatarStore
+from .utils.search import UserSearchIndex
+from .utils.invites import PasswordInvites
+
 mail = Mail()
+mail_dispatcher = MailDispatcher(mail)
+password_invites = PasswordInvites(mail_dispatcher)
 db = SQLAlchemy()
 login_manager = LoginManager()
 login_manager.login_view = 'auth.login'
 login_manager.login_message_category = 'info'
-csrf = CSRFProtect()
-limiter = Limiter(key_func=get_remote_address, default_limits=["200 per day", "50 per hour"])
\ No newline at end of file
+tokens = TokenService()
+csrf = TokenAwareCSRFProtect(tokens)
+limiter = Limiter(key_func=rate_limit_key)
+rate_limit_metrics = RateLimitMetrics(limiter)
+user_cache = UserCache()
+lookup_cache = LookupCache()
+password_hasher = PasswordHasher()
+http_client = HttpClient()
+google_jwks = JWKSCache(http_client)
+pool_metrics = PoolMetrics()
+request_metrics = RequestMetrics()
+last_login_buffer = LastLoginBuffer()
+readiness = Readiness()
+proof_store = ContentStore()
+avatars = AvatarStore(http_client)
+user_search = UserSearchIndex()
@@ -1,50 +0,0 @@
-from flask_wtf import FlaskForm
-from wtforms import StringField, PasswordField, SubmitField, BooleanField
-from wtforms.validators import DataRequired, Email, Length, EqualTo, Regexp, ValidationError
-import re
-
-
-def validate_password_strength(form, field):
-    password = field.data
-    if len(password) < 8:
-        raise ValidationError('Password must be at least 8 characters long.')
-    if not re.search(r'[A-Z]', password):
-        raise ValidationError('Password must contain at least one uppercase letter.')
-    if not re.search(r'[a-z]', password):
-        raise ValidationError('Password must contain at least one lowercase letter.')
-    if not re.search(r'\d', password):
-        raise ValidationError('Password must contain at least one number.')
-
-
-def sanitize_input(text):
-    """Sanitize input to prevent XSS attacks"""
-    if text:
-        # Remove potentially dangerous characters and trim
-        sanitized = text.strip().replace('<', '&lt;').replace('>', '&gt;')
-        return sanitized
-    return text
-
-
-class RegisterForm(FlaskForm):
-    email = StringField("Email", validators=[DataRequired(), Email()])
-    username = StringField("Username", validators=[DataRequired(), Length(min=3, max=50)])
-    name = StringField("First Name", validators=[DataRequired(), Length(max=100)])
-    surname = StringField("Surname", validators=[DataRequired(), Length(max=100)])
-    password = PasswordField("Password", validators=[DataRequired(), validate_password_strength])
-    confirm_password = PasswordField("Confirm Password", validators=[DataRequired(), EqualTo("password")])
-    consent = BooleanField("I consent to data processing", validators=[DataRequired()])
-    submit = SubmitField("Register")
-
-    def validate_email(self, field):
-        """Custom email validation"""
-        email = sanitize_input(field.data).lower()
-        pattern = r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$'
-        if not re.match(pattern, email):
-            raise ValidationError('Invalid email format.')
-
-
-class LoginForm(FlaskForm):
-    email = StringField("Email", validators=[DataRequired(), Email()])
-    password = PasswordField("Password", validators=[DataRequired()])
-    remember = BooleanField("Remember Me")
-    submit = SubmitField("Login")
\ No newline at end of file
@@ -0,0 +1,17 @@
+import datetime
+
+from ..extensions import db
+
+
+class RevokedToken(db.Model):
+    __tablename__ = 'revoked_token'
+
+    jti = db.Column(db.String(32), primary_key=True)
+    user_id = db.Column(db.Integer, db.ForeignKey('user.user_id', ondelete='CASCADE'), nullable=False, index=True)
+
+    # Rows are only needed until the token would have expired on its own
+    expires_at = db.Column(db.DateTime, nullable=False, index=True)
+    revoked_at = db.Column(db.DateTime, default=lambda: datetime.datetime.now(datetime.timezone.utc))
+
+    def __repr__(self):
+        return f"<RevokedToken(jti={self.jti}, user_id={self.user_id})>"
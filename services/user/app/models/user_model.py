@@ -1,10 +1,10 @@
 import datetime
 
 from flask_login import UserMixin
-from sqlalchemy import CheckConstraint
-from werkzeug.security import generate_password_hash, check_password_hash
+from sqlalchemy import CheckConstraint, Index, event
+from sqlalchemy.orm import joinedload, selectinload
 
-from ..extensions import db
+from ..extensions import db, user_cache, lookup_cache, password_hasher, user_search
 
 
 class User(db.Model, UserMixin):
@@ -23,6 +23,8 @@ class User(db.Model, UserMixin):
     social_provider = db.Column(db.String(50), nullable=True)
 
     profile_picture_url = db.Column(db.Text, nullable=True)
+    # SHA-256 of the locally stored picture; see app/utils/avatars.py
+    avatar_key = db.Column(db.String(64), nullable=True)
 
     role = db.Column(
         db.String(20),
@@ -34,6 +36,9 @@ class User(db.Model, UserMixin):
         CheckConstraint(
             role.in_(['student', 'staff', 'admin']),
         ),
+        # Directory keyset pagination, unfiltered and filtered by role / status
+        Index('ix_user_created_at_user_id', 'created_at', 'user_id'),
+        Index('ix_user_role_active_created_at', 'role', 'is_active', 'created_at', 'user_id'),
     )
 
     is_active = db.Column(db.Boolean, default=True)
@@ -51,13 +56,13 @@ class User(db.Model, UserMixin):
 
     def set_password(self, password):
         """Hashes the given password."""
-        self.password_hash = generate_password_hash(password)
+        self.password_hash = password_hasher.hash(password)
 
     def check_password(self, password):
         """Validates a password against the stored hash."""
         if self.password_hash is None:
             return False
-        return check_password_hash(self.password_hash, password)
+        return password_hasher.verify(self.password_hash, password)
 
     def __repr__(self):
         return f"<User(username={self.username or self.email}, role={self.role})>"
@@ -67,6 +72,24 @@ class User(db.Model, UserMixin):
         return str(self.user_id)
 
 
+@event.listens_for(User, 'after_update')
+@event.listens_for(User, 'after_delete')
+def _invalidate_cached_user(mapper, connection, target):
+    """Drops the cache entries on any write, e.g. when an account is deactivated."""
+    user_cache.invalidate(target.user_id)
+    lookup_cache.invalidate_user(target.user_id, target.email)
+
+
+@event.listens_for(User.__table__, 'after_create')
+def _install_search_index(table, connection, **kw):
+    user_search.install(connection)
+
+
+@event.listens_for(User.__table__, 'before_drop')
+def _drop_search_index(table, connection, **kw):
+    user_search.drop(connection)
+
+
 class Staff(db.Model):
     __tablename__ = 'staff'
 
@@ -86,6 +109,10 @@ class Staff(db.Model):
         return f"<Staff(id={self.staff_id}, department={self.department})>"
 
 
+# Stages of a student's application, in review order
+APPLICATION_STATUSES = ('Pending', 'Under Review', 'Approved', 'Rejected')
+
+
 class Student(db.Model):
     __tablename__ = 'student'
 
@@ -107,5 +134,24 @@ class Student(db.Model):
         default=lambda: datetime.datetime.now(datetime.timezone.utc)
     )
 
+    __table_args__ = (
+        Index('ix_student_course_application_status', 'course', 'application_status'),
+    )
+
     def __repr__(self):
-        return f"<Student(id={self.student_id}, course={self.course}, status={self.application_status})>"
\ No newline at end of file
+        return f"<Student(id={self.student_id}, course={self.course}, status={self.application_status})>"
+
+
+def role_loader_options(role=None):
+    """
+    Loader options that fetch a user's student or staff row with the user.
+
+    For a single role the extension row is JOINed, since there is at most one
+    per user. Mixed listings use selectin loading: one extra IN query per
+    extension table, however many users come back.
+    """
+    if role == 'student':
+        return (joinedload(User.student),)
+    if role in ('staff', 'admin'):
+        return (joinedload(User.staff),)
+    return (selectinload(User.student), selectinload(User.staff))
@@ -3,9 +3,13 @@ from flask import Blueprint
 from .auth_router import auth_bp
 from .oauth_router import oauth_bp
 from .profile_router import profile_bp
+from .users_router import users_bp
+from .internal_router import internal_bp
 
 router_bp = Blueprint('router', __name__)
 
 router_bp.register_blueprint(auth_bp, url_prefix='/auth')
 router_bp.register_blueprint(oauth_bp, url_prefix='/oauth')
-router_bp.register_blueprint(profile_bp, url_prefix='/profile')
\ No newline at end of file
+router_bp.register_blueprint(profile_bp, url_prefix='/profile')
+router_bp.register_blueprint(users_bp, url_prefix='/users')
+router_bp.register_blueprint(internal_bp, url_prefix='/internal')
\ No newline at end of file
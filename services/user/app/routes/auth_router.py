@@ -1,6 +1,7 @@
 from flask import Blueprint
 
-from ..controllers.auth_controller import register, logout, login
+from ..extensions import csrf
+from ..controllers.auth_controller import register, logout, login, refresh_token, revoke_token, setup_password
 
 auth_bp = Blueprint('auth', __name__)
 
@@ -14,4 +15,21 @@ def register_route():
 
 @auth_bp.route('/logout', methods=['POST'])
 def logout_route():
-    return logout()
\ No newline at end of file
+    return logout()
+
+# The token in the body is the credential, so there is no ambient session to forge
+@auth_bp.route('/token/refresh', methods=['POST'])
+@csrf.exempt
+def refresh_token_route():
+    return refresh_token()
+
+@auth_bp.route('/token/revoke', methods=['POST'])
+@csrf.exempt
+def revoke_token_route():
+    return revoke_token()
+
+# The invite token in the body is the credential, as for token refresh
+@auth_bp.route('/password/setup', methods=['POST'])
+@csrf.exempt
+def setup_password_route():
+    return setup_password()
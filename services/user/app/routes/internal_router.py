@@ -0,0 +1,32 @@
+from flask import Blueprint, request
+
+from ..controllers import internal_controller
+from ..extensions import csrf, limiter
+from ..utils.decorators import internal_only
+
+internal_bp = Blueprint('internal', __name__)
+
+@internal_bp.route('/stats', methods=['GET'])
+@internal_only
+def get_stats():
+    return internal_controller.get_stats()
+
+# Polled by the orchestrator's readiness probe; reveals nothing beyond ready / not ready
+@internal_bp.route('/ready', methods=['GET'])
+@limiter.exempt
+def get_readiness():
+    return internal_controller.get_readiness()
+
+@internal_bp.route('/metrics', methods=['GET'])
+@limiter.exempt
+@internal_only
+def get_metrics():
+    return internal_controller.get_metrics()
+
+# Called service-to-service with X-Internal-Token, never from a browser session
+@internal_bp.route('/users/lookup', methods=['POST'])
+@csrf.exempt
+@limiter.exempt
+@internal_only
+def lookup_users():
+    return internal_controller.lookup_users(request)
@@ -1,13 +1,15 @@
 from flask import Blueprint
 
-from ..controllers.oauth_controller import google_auth, google_callback
-
 oauth_bp = Blueprint('oauth', __name__)
 
+# The controller is imported on first use; most workers never serve an OAuth request
+
 @oauth_bp.route('/google/auth')
 def google_auth_route():
+    from ..controllers.oauth_controller import google_auth
     return google_auth()
 
 @oauth_bp.route('/google/callback')
 def google_callback_route():
+    from ..controllers.oauth_controller import google_callback
     return google_callback()
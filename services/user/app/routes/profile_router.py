@@ -1,16 +1,36 @@
 from flask import Blueprint, request
-from flask_login import login_required
+from flask_login import current_user, login_required
 
-from ..controllers import profile_controller
+from ..controllers import profile_controller, medical_proof_controller, avatar_controller
 
 profile_bp = Blueprint('profile', __name__)
 
 @profile_bp.route('/me', methods=['GET'])
 @login_required
 def get_profile():
-    return profile_controller.get_profile()
+    return profile_controller.get_profile(request)
 
 @profile_bp.route('/me', methods=['PUT'])
 @login_required
 def update_profile():
-    return profile_controller.update_profile(request)
\ No newline at end of file
+    return profile_controller.update_profile(request)
+
+@profile_bp.route('/me/medical-proof', methods=['PUT'])
+@login_required
+def upload_medical_proof():
+    return medical_proof_controller.upload_medical_proof(request)
+
+@profile_bp.route('/me/medical-proof', methods=['GET'])
+@login_required
+def get_medical_proof():
+    return medical_proof_controller.send_medical_proof(current_user.user_id)
+
+@profile_bp.route('/me/avatar', methods=['PUT'])
+@login_required
+def upload_avatar():
+    return avatar_controller.upload_avatar(request)
+
+# Public: variants are addressed by content hash and shown wherever the user appears
+@profile_bp.route('/avatars/<digest>/<name>.webp', methods=['GET'])
+def get_avatar(digest, name):
+    return avatar_controller.send_avatar(digest, name)
@@ -0,0 +1,46 @@
+from flask import Blueprint, request
+from flask_login import login_required
+
+from ..controllers import (
+    import_controller, directory_controller, export_controller, medical_proof_controller, review_controller,
+    search_controller
+)
+from ..utils.decorators import roles_required
+
+users_bp = Blueprint('users', __name__)
+
+@users_bp.route('', methods=['GET'])
+@login_required
+@roles_required('staff', 'admin')
+def list_users():
+    return directory_controller.list_users(request)
+
+@users_bp.route('/search', methods=['GET'])
+@login_required
+@roles_required('staff', 'admin')
+def search_users():
+    return search_controller.search_users(request)
+
+@users_bp.route('/export', methods=['GET'])
+@login_required
+@roles_required('staff', 'admin')
+def export_users():
+    return export_controller.export_users(request)
+
+@users_bp.route('/import', methods=['POST'])
+@login_required
+@roles_required('staff', 'admin')
+def import_students():
+    return import_controller.import_students(request)
+
+@users_bp.route('/<int:user_id>/medical-proof', methods=['GET'])
+@login_required
+@roles_required('staff', 'admin')
+def get_medical_proof(user_id):
+    return medical_proof_controller.send_medical_proof(user_id)
+
+@users_bp.route('/application-status', methods=['POST'])
+@login_required
+@roles_required('staff', 'admin')
+def transition_application_status():
+    return review_controller.transition_application_status(request)
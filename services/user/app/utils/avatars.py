@@ -0,0 +1,205 @@
+import io
+import os
+import time
+import hashlib
+import logging
+import tempfile
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from .counters import Counters
+from .file_store import DIGEST_PATTERN
+from .workers import ProcessLocal, wait_for
+
+logger = logging.getLogger(__name__)
+
+
+class AvatarError(Exception):
+    """Raised when a picture cannot be fetched or is not a usable image."""
+
+
+class AvatarStore(Counters):
+    """
+    Profile pictures resized once and kept on local disk.
+
+    A source image (fetched from a URL or uploaded) is identified by the
+    SHA-256 of its bytes. Each configured size is written as a square WebP
+    named ``<root>/<xx>/<digest>-<size>.webp``, so a variant's URL never
+    changes meaning and can be cached forever. Pictures already stored are
+    not decoded again. Until ``init_app`` runs no pictures are fetched.
+
+    Fetches from a URL run on a small background pool (``submit``) so a
+    slow picture host never holds up a sign-in, and each download must
+    finish within ``fetch_timeout`` seconds.
+    """
+
+    def __init__(self, http_client):
+        self.http_client = http_client
+        self.root = None
+        self.sizes = {'sm': 48, 'md': 96, 'lg': 256}
+        self.max_bytes = 5 * 1024 * 1024
+        self.max_pixels = 40_000_000
+        self.quality = 85
+        self.fetch_timeout = 5.0
+        self.fetch_workers = 2
+        self.max_pending = 100
+        self._pending = 0
+        self._lock = threading.Lock()
+        self._executor = ProcessLocal(self._start_pool, self._lock)
+        self.fetches = 0
+        self.stored = 0
+        self.reused = 0
+        self.failures = 0
+        self.skipped = 0
+
+    def init_app(self, app):
+        self.root = app.config.get('AVATAR_DIR') or os.path.join(app.instance_path, 'avatars')
+        self.max_bytes = app.config.get('AVATAR_MAX_BYTES', self.max_bytes)
+        self.quality = app.config.get('AVATAR_QUALITY', self.quality)
+        self.fetch_timeout = app.config.get('AVATAR_FETCH_TIMEOUT', self.fetch_timeout)
+        self.fetch_workers = app.config.get('AVATAR_FETCH_WORKERS', self.fetch_workers)
+        self.max_pending = app.config.get('AVATAR_MAX_PENDING', self.max_pending)
+        app.extensions['avatars'] = self
+
+    @property
+    def enabled(self):
+        return self.root is not None
+
+    def submit(self, func, *args):
+        """
+        Runs ``func(*args)`` on the background fetch pool. Returns False, and
+        drops the call, when ``max_pending`` calls are already waiting.
+        """
+        executor = self._executor.get()
+        with self._lock:
+            if self._pending >= self.max_pending:
+                self.skipped += 1
+                return False
+            self._pending += 1
+        try:
+            executor.submit(self._run, func, args)
+        except BaseException:
+            self._done()
+            raise
+        return True
+
+    def wait_idle(self, timeout=None):
+        """Blocks until every submitted call has finished. Returns False on timeout."""
+        return wait_for(lambda: not self._pending, timeout)
+
+    def shutdown(self):
+        """Waits for submitted calls to finish and stops the pool."""
+        executor = self._executor.clear()
+        if executor is not None:
+            executor.shutdown(wait=True)
+
+    def fetch(self, url):
+        """Downloads the picture at ``url`` through the shared HTTP client and stores it."""
+        self._count('fetches')
+        try:
+            deadline = time.monotonic() + self.fetch_timeout
+            response = self.http_client.get(url, stream=True, timeout=self.fetch_timeout)
+            try:
+                response.raise_for_status()
+                length = response.headers.get('Content-Length')
+                if length is not None and int(length) > self.max_bytes:
+                    raise AvatarError(f"Picture exceeds {self.max_bytes} bytes")
+                data = bytearray()
+                for chunk in response.iter_content(64 * 1024):
+                    data += chunk
+                    if len(data) > self.max_bytes:
+                        raise AvatarError(f"Picture exceeds {self.max_bytes} bytes")
+                    # The read timeout is per socket read, so bound the whole download too
+                    if time.monotonic() > deadline:
+                        raise AvatarError(f"Picture took longer than {self.fetch_timeout}s to download")
+            finally:
+                response.close()
+        except AvatarError:
+            self._count('failures')
+            raise
+        except Exception as e:
+            self._count('failures')
+            raise AvatarError(f"Could not fetch picture: {e}") from e
+        return self.store(bytes(data))
+
+    def store(self, data):
+        """Writes every size variant of the image in ``data``. Returns its digest."""
+        digest = hashlib.sha256(data).hexdigest()
+        if all(os.path.exists(self.path(digest, name)) for name in self.sizes):
+            self._count('reused')
+            return digest
+        try:
+            variants = self._resize(data)
+        except AvatarError:
+            self._count('failures')
+            raise
+        for name, encoded in variants.items():
+            self._write(self.path(digest, name), encoded)
+        self._count('stored')
+        return digest
+
+    def path(self, digest, name):
+        """Absolute path of a variant; raises ValueError for an unknown size or a malformed digest."""
+        if not DIGEST_PATTERN.match(digest) or name not in self.sizes:
+            raise ValueError(f"No avatar variant {digest!r}/{name!r}")
+        return os.path.join(self.root, digest[:2], f"{digest}-{name}.webp")
+
+    def stats(self):
+        with self._lock:
+            return {
+                "fetches": self.fetches,
+                "stored": self.stored,
+                "reused": self.reused,
+                "failures": self.failures,
+                "pending": self._pending,
+                "skipped": self.skipped,
+            }
+
+    def _start_pool(self):
+        self._pending = 0
+        return ThreadPoolExecutor(max_workers=self.fetch_workers, thread_name_prefix='avatar-fetch')
+
+    def _run(self, func, args):
+        try:
+            func(*args)
+        except Exception:
+            logger.exception("Background avatar job failed")
+        finally:
+            self._done()
+
+    def _done(self):
+        with self._lock:
+            self._pending -= 1
+
+    def _resize(self, data):
+        # Pillow is only needed when a new picture arrives
+        from PIL import Image, ImageOps
+
+        try:
+            with Image.open(io.BytesIO(data)) as image:
+                if image.width * image.height > self.max_pixels:
+                    raise AvatarError("Picture dimensions are too large")
+                image = ImageOps.exif_transpose(image).convert('RGB')
+                variants = {}
+                for name, size in self.sizes.items():
+                    square = ImageOps.fit(image, (size, size), Image.Resampling.LANCZOS)
+                    buffer = io.BytesIO()
+                    square.save(buffer, 'WEBP', quality=self.quality, method=4)
+                    variants[name] = buffer.getvalue()
+                return variants
+        except AvatarError:
+            raise
+        except (OSError, ValueError, Image.DecompressionBombError) as e:
+            raise AvatarError(f"Not a usable image: {e}") from e
+
+    def _write(self, path, data):
+        directory = os.path.dirname(path)
+        os.makedirs(directory, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=directory, suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as fh:
+                fh.write(data)
+            os.replace(tmp_path, path)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
@@ -0,0 +1,128 @@
+import time
+import threading
+from collections import OrderedDict
+
+from sqlalchemy import inspect
+from sqlalchemy.orm import make_transient_to_detached
+
+
+class TTLCache:
+    """Thread-safe LRU cache whose entries expire after a fixed TTL."""
+
+    def __init__(self, ttl=60, max_size=1024, clock=time.monotonic):
+        self.ttl = ttl
+        self.max_size = max_size
+        self._clock = clock
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key):
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            expires_at, value = entry
+            if expires_at <= self._clock():
+                del self._data[key]
+                self.misses += 1
+                return None
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, key, value):
+        if self.ttl <= 0 or self.max_size <= 0:
+            return
+        with self._lock:
+            self._data[key] = (self._clock() + self.ttl, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_size:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def invalidate(self, key):
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._data),
+                "max_size": self.max_size,
+                "ttl": self.ttl,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+            }
+
+
+class UserCache(TTLCache):
+    """
+    Per-process cache in front of the Flask-Login user loader.
+
+    Only column values are cached. On a hit the user is rebuilt and merged
+    into the current session without emitting SQL, so controllers get a
+    regular session-bound instance they can modify and commit.
+    """
+
+    def init_app(self, app):
+        self.ttl = app.config.get('USER_CACHE_TTL', self.ttl)
+        self.max_size = app.config.get('USER_CACHE_MAX_SIZE', self.max_size)
+        self.clear()
+        app.extensions['user_cache'] = self
+
+    def load(self, session, model, user_id):
+        """Returns the user with the given primary key, from cache if possible."""
+        cached = self.get(user_id)
+        if cached is not None:
+            user = model(**cached)
+            make_transient_to_detached(user)
+            return session.merge(user, load=False)
+
+        user = session.get(model, user_id)
+        if user is not None:
+            self.set(user_id, self._snapshot(user))
+        return user
+
+    @staticmethod
+    def _snapshot(user):
+        state = inspect(user)
+        return {
+            attr.key: state.dict[attr.key]
+            for attr in state.mapper.column_attrs
+            if attr.key in state.dict
+        }
+
+
+class LookupCache(TTLCache):
+    """
+    Short-lived cache of public profile fields for the internal batch lookup.
+
+    Entries are keyed by ``('id', user_id)`` and ``('email', email)``. Writes to
+    a user drop both keys; otherwise entries live for ``USER_LOOKUP_CACHE_TTL``
+    seconds, which is 0 (disabled) unless configured.
+    """
+
+    def __init__(self, ttl=0, max_size=10000, clock=time.monotonic):
+        super().__init__(ttl=ttl, max_size=max_size, clock=clock)
+
+    def init_app(self, app):
+        self.ttl = app.config.get('USER_LOOKUP_CACHE_TTL', self.ttl)
+        self.max_size = app.config.get('USER_LOOKUP_CACHE_MAX_SIZE', self.max_size)
+        self.clear()
+        app.extensions['lookup_cache'] = self
+
+    def invalidate_user(self, user_id, email=None):
+        self.invalidate(('id', user_id))
+        if email is not None:
+            self.invalidate(('email', email))
@@ -0,0 +1,6 @@
+class Counters:
+    """Stats kept as integer attributes and bumped under ``self._lock``."""
+
+    def _count(self, name):
+        with self._lock:
+            setattr(self, name, getattr(self, name) + 1)
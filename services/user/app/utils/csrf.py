@@ -0,0 +1,22 @@
+from flask_wtf import CSRFProtect
+
+
+class TokenAwareCSRFProtect(CSRFProtect):
+    """
+    CSRF protection for cookie sessions only.
+
+    Browsers never attach an Authorization header on their own, so requests
+    authenticated with a bearer token cannot be forged cross-site. Only a
+    token that verifies earns the exemption: the user loader then ignores
+    the session cookie, so such a request acts as the token's user alone.
+    Any other Authorization header is checked like a cookie session.
+    """
+
+    def __init__(self, tokens, app=None):
+        self.tokens = tokens
+        super().__init__(app)
+
+    def protect(self):
+        if self.tokens.request_claims() is not None:
+            return
+        super().protect()
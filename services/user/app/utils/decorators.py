@@ -0,0 +1,41 @@
+import hmac
+from functools import wraps
+
+from flask import jsonify, request, current_app
+from flask_login import current_user
+
+LOOPBACK_ADDRESSES = ('127.0.0.1', '::1')
+
+
+def roles_required(*roles):
+    """Restricts a view to authenticated users holding one of the given roles."""
+    def decorator(view):
+        @wraps(view)
+        def wrapped(*args, **kwargs):
+            if not current_user.is_authenticated or current_user.role not in roles:
+                return jsonify({"error": "Forbidden"}), 403
+            return view(*args, **kwargs)
+        return wrapped
+    return decorator
+
+
+def internal_only(view):
+    """
+    Restricts a view to other Numeraid services.
+
+    Callers must send the configured INTERNAL_API_TOKEN in X-Internal-Token;
+    without a configured token only loopback requests are accepted.
+    """
+    @wraps(view)
+    def wrapped(*args, **kwargs):
+        token = current_app.config.get('INTERNAL_API_TOKEN')
+        if token:
+            # Bytes, since compare_digest rejects str with non-ASCII characters
+            sent = request.headers.get('X-Internal-Token', '')
+            allowed = hmac.compare_digest(sent.encode(), token.encode())
+        else:
+            allowed = request.remote_addr in LOOPBACK_ADDRESSES
+        if not allowed:
+            return jsonify({"error": "Forbidden"}), 403
+        return view(*args, **kwargs)
+    return wrapped
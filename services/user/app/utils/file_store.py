@@ -0,0 +1,107 @@
+import os
+import re
+import hashlib
+import tempfile
+import threading
+
+from .counters import Counters
+
+DIGEST_PATTERN = re.compile(r'^[0-9a-f]{64}$')
+
+
+class FileTooLarge(Exception):
+    """Raised while saving once a stream passes the size limit."""
+
+    def __init__(self, limit):
+        super().__init__(f"File exceeds {limit} bytes")
+        self.limit = limit
+
+
+class ContentStore(Counters):
+    """
+    Content-addressed files on local disk.
+
+    A file is stored once under the SHA-256 of its bytes, as
+    ``<root>/<first two hex digits>/<digest>.<ext>``. Saving streams chunks to
+    a temporary file in the same directory tree while hashing them, stops as
+    soon as the size limit is passed, and then renames the file into place.
+    Identical uploads map to the same path, so the second copy is discarded.
+    """
+
+    def __init__(self):
+        self.root = None
+        self.max_bytes = 10 * 1024 * 1024
+        self.chunk_size = 64 * 1024
+        self._lock = threading.Lock()
+        self.saved = 0
+        self.deduplicated = 0
+        self.rejected = 0
+
+    def init_app(self, app):
+        self.root = app.config.get('MEDICAL_PROOF_DIR') or os.path.join(app.instance_path, 'medical_proofs')
+        self.max_bytes = app.config.get('MEDICAL_PROOF_MAX_BYTES', self.max_bytes)
+        self.chunk_size = app.config.get('MEDICAL_PROOF_CHUNK_SIZE', self.chunk_size)
+        app.extensions['proof_store'] = self
+
+    def chunks(self, stream):
+        """Iterates over ``stream`` in ``chunk_size`` reads."""
+        return iter(lambda: stream.read(self.chunk_size), b'')
+
+    def save(self, chunks, extension):
+        """
+        Writes the byte ``chunks`` and returns ``(key, size, created)``.
+
+        ``key`` is the path relative to the root; ``created`` is False when the
+        same content was already stored. Raises FileTooLarge past ``max_bytes``.
+        """
+        tmp_dir = os.path.join(self.root, 'tmp')
+        os.makedirs(tmp_dir, exist_ok=True)
+        digest = hashlib.sha256()
+        size = 0
+        fd, tmp_path = tempfile.mkstemp(dir=tmp_dir)
+        try:
+            with os.fdopen(fd, 'wb') as fh:
+                for chunk in chunks:
+                    size += len(chunk)
+                    if size > self.max_bytes:
+                        self._count('rejected')
+                        raise FileTooLarge(self.max_bytes)
+                    digest.update(chunk)
+                    fh.write(chunk)
+                fh.flush()
+                os.fsync(fh.fileno())
+
+            key = self.key(digest.hexdigest(), extension)
+            path = self.path(key)
+            if os.path.exists(path):
+                self._count('deduplicated')
+                return key, size, False
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            os.replace(tmp_path, path)
+            tmp_path = None
+            self._count('saved')
+            return key, size, True
+        finally:
+            if tmp_path is not None:
+                os.unlink(tmp_path)
+
+    @staticmethod
+    def key(digest, extension):
+        return f"{digest[:2]}/{digest}.{extension}"
+
+    def path(self, key):
+        """Absolute path for a stored key; raises ValueError for anything that is not a key."""
+        directory, _, name = key.partition('/')
+        digest, _, extension = name.partition('.')
+        if not DIGEST_PATTERN.match(digest) or directory != digest[:2] or not extension.isalnum():
+            raise ValueError(f"Not a content key: {key!r}")
+        return os.path.join(self.root, directory, name)
+
+    def stats(self):
+        with self._lock:
+            return {
+                "saved": self.saved,
+                "deduplicated": self.deduplicated,
+                "rejected": self.rejected,
+                "max_bytes": self.max_bytes,
+            }
@@ -0,0 +1,134 @@
+import os
+import threading
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, TimeoutError as FutureTimeoutError
+
+from werkzeug.security import generate_password_hash, check_password_hash, DEFAULT_PBKDF2_ITERATIONS
+
+from .request_metrics import timed
+
+
+class HashPoolFull(Exception):
+    """Raised when the hashing pool cannot accept more work."""
+
+    def __init__(self, retry_after):
+        super().__init__("Password hashing pool is full")
+        self.retry_after = retry_after
+
+
+def canonical_hash_method(method):
+    """Expands a werkzeug hash method to the prefix it writes, e.g. 'scrypt' -> 'scrypt:32768:8:1'."""
+    name, *args = method.split(':')
+    if name == 'scrypt':
+        n, r, p = args or (2 ** 15, 8, 1)
+        return f"scrypt:{int(n)}:{int(r)}:{int(p)}"
+    if name == 'pbkdf2':
+        hash_name = args[0] if args else 'sha256'
+        iterations = int(args[1]) if len(args) > 1 else DEFAULT_PBKDF2_ITERATIONS
+        return f"pbkdf2:{hash_name}:{iterations}"
+    raise ValueError(f"Invalid hash method '{method}'.")
+
+
+class PasswordHasher:
+    """
+    Runs password hashing and verification in a bounded process pool.
+
+    At most ``workers + max_queue`` calls are admitted at once; anything beyond
+    that fails fast with HashPoolFull instead of tying up a request thread.
+    With ``workers = 0`` the work runs inline in the calling thread.
+    """
+
+    def __init__(self):
+        self.method = canonical_hash_method('scrypt')
+        self.salt_length = 16
+        self.workers = 0
+        self.max_queue = 0
+        self.timeout = 5.0
+        self.retry_after = 2
+        self.rejected = 0
+        self._slots = None
+        self._executor = None
+        self._executor_pid = None
+        self._lock = threading.Lock()
+
+    def init_app(self, app):
+        self.method = canonical_hash_method(app.config.get('PASSWORD_HASH_METHOD', 'scrypt'))
+        self.salt_length = app.config.get('PASSWORD_SALT_LENGTH', 16)
+        self.workers = app.config.get('PASSWORD_HASH_WORKERS', 0)
+        self.max_queue = app.config.get('PASSWORD_HASH_MAX_QUEUE', 0)
+        self.timeout = app.config.get('PASSWORD_HASH_TIMEOUT', 5.0)
+        self.retry_after = app.config.get('PASSWORD_HASH_RETRY_AFTER', 2)
+        self._slots = threading.BoundedSemaphore(self.workers + self.max_queue) if self.workers else None
+        app.extensions['password_hasher'] = self
+
+    def hash(self, password):
+        return self._run(generate_password_hash, password, self.method, self.salt_length)
+
+    def verify(self, pwhash, password):
+        return self._run(check_password_hash, pwhash, password)
+
+    def needs_rehash(self, pwhash):
+        """True when the stored hash was produced under a different policy."""
+        method, _, rest = pwhash.partition('$')
+        salt = rest.partition('$')[0]
+        return method != self.method or len(salt) != self.salt_length
+
+    def stats(self):
+        with self._lock:
+            rejected = self.rejected
+        return {
+            "method": self.method,
+            "workers": self.workers,
+            "max_queue": self.max_queue,
+            "rejected": rejected,
+        }
+
+    def shutdown(self):
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+            self._executor_pid = None
+
+    def _run(self, func, *args):
+        with timed('password_hash'):
+            return self._submit(func, *args)
+
+    def _submit(self, func, *args):
+        if not self._slots:
+            return func(*args)
+
+        slots = self._slots
+        if not slots.acquire(blocking=False):
+            self._count_rejected()
+            raise HashPoolFull(self.retry_after)
+        try:
+            future = self._get_executor().submit(func, *args)
+        except BaseException:
+            slots.release()
+            raise
+        # The slot is held until the pool finishes the job, not until the caller gives up on it,
+        # so abandoned hashes still count against the bound.
+        future.add_done_callback(lambda _: slots.release())
+        try:
+            return future.result(timeout=self.timeout)
+        except FutureTimeoutError:
+            self._count_rejected()
+            raise HashPoolFull(self.retry_after) from None
+
+    def _count_rejected(self):
+        with self._lock:
+            self.rejected += 1
+
+    def _get_executor(self):
+        # Pools do not survive a fork, so each worker process builds its own.
+        pid = os.getpid()
+        if self._executor_pid != pid:
+            with self._lock:
+                if self._executor_pid != pid:
+                    self._executor = ProcessPoolExecutor(
+                        max_workers=self.workers,
+                        mp_context=multiprocessing.get_context('spawn'),
+                    )
+                    self._executor_pid = pid
+        return self._executor
@@ -0,0 +1,93 @@
+import os
+import threading
+
+from .request_metrics import timed
+
+
+class HttpClient:
+    """
+    Shared outbound HTTP client.
+
+    Wraps one keep-alive requests.Session per process so repeated calls to the
+    same host reuse pooled TCP/TLS connections. Every request gets the
+    configured (connect, read) timeout unless the caller passes its own.
+    """
+
+    def __init__(self):
+        self.pool_connections = 4
+        self.pool_maxsize = 16
+        self.max_retries = 2
+        self.backoff_factor = 0.2
+        self.connect_timeout = 3.05
+        self.read_timeout = 10.0
+        self._session = None
+        self._session_pid = None
+        self._lock = threading.Lock()
+
+    def init_app(self, app):
+        self.pool_connections = app.config.get('HTTP_POOL_CONNECTIONS', self.pool_connections)
+        self.pool_maxsize = app.config.get('HTTP_POOL_MAXSIZE', self.pool_maxsize)
+        self.max_retries = app.config.get('HTTP_MAX_RETRIES', self.max_retries)
+        self.backoff_factor = app.config.get('HTTP_BACKOFF_FACTOR', self.backoff_factor)
+        self.connect_timeout = app.config.get('HTTP_CONNECT_TIMEOUT', self.connect_timeout)
+        self.read_timeout = app.config.get('HTTP_READ_TIMEOUT', self.read_timeout)
+        self.close()
+        app.extensions['http_client'] = self
+
+    @property
+    def session(self):
+        # Sockets must not be shared across a fork, so each process builds its own.
+        pid = os.getpid()
+        if self._session_pid != pid:
+            with self._lock:
+                if self._session_pid != pid:
+                    self._session = self._build_session()
+                    self._session_pid = pid
+        return self._session
+
+    def request(self, method, url, **kwargs):
+        kwargs.setdefault('timeout', (self.connect_timeout, self.read_timeout))
+        with timed('http'):
+            return self.session.request(method, url, **kwargs)
+
+    def get(self, url, **kwargs):
+        return self.request('GET', url, **kwargs)
+
+    def post(self, url, **kwargs):
+        return self.request('POST', url, **kwargs)
+
+    def close(self):
+        with self._lock:
+            if self._session is not None and self._session_pid == os.getpid():
+                self._session.close()
+            self._session = None
+            self._session_pid = None
+
+    def _build_session(self):
+        # Imported here: requests is only needed once the process makes its first outbound call
+        import requests
+        from requests.adapters import HTTPAdapter
+        from urllib3.util.retry import Retry
+
+        # Connection failures are retried for any method since nothing was sent.
+        # Read errors are never retried and 5xx gateway errors only for GET and
+        # HEAD, so a POST that may have reached the server is never replayed.
+        retry = Retry(
+            total=self.max_retries,
+            connect=self.max_retries,
+            read=0,
+            status=self.max_retries,
+            status_forcelist=(502, 503, 504),
+            allowed_methods=frozenset({'GET', 'HEAD'}),
+            backoff_factor=self.backoff_factor,
+            raise_on_status=False,
+        )
+        adapter = HTTPAdapter(
+            pool_connections=self.pool_connections,
+            pool_maxsize=self.pool_maxsize,
+            max_retries=retry,
+        )
+        session = requests.Session()
+        session.mount('https://', adapter)
+        session.mount('http://', adapter)
+        return session
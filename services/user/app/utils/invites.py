@@ -0,0 +1,82 @@
+import threading
+from urllib.parse import urlencode
+
+from itsdangerous import BadSignature, URLSafeTimedSerializer
+
+
+class InvalidInvite(Exception):
+    """Raised for a password invite that is malformed, tampered with or expired."""
+
+
+class PasswordInvites:
+    """
+    Invitations for users created without a password, e.g. by a bulk import.
+
+    Each invite is a signed, expiring token naming the user, mailed as a link
+    to the front end's set-password page through the mail dispatcher. The
+    token only sets a password while the account has none, so it cannot be
+    reused once redeemed. Until ``init_app`` runs no invites are sent.
+    """
+
+    salt = 'password-invite'
+
+    def __init__(self, dispatcher):
+        self.dispatcher = dispatcher
+        self.enabled = False
+        self.ttl = 7 * 24 * 3600
+        self.setup_url = 'http://localhost:5173/set-password'
+        self.sender = None
+        self._serializer = None
+        self._lock = threading.Lock()
+        self.sent = 0
+        self.dropped = 0
+
+    def init_app(self, app):
+        self.ttl = app.config.get('PASSWORD_INVITE_TTL', self.ttl)
+        self.setup_url = app.config.get('PASSWORD_SETUP_URL', self.setup_url)
+        self.sender = app.config.get('MAIL_DEFAULT_SENDER')
+        self._serializer = URLSafeTimedSerializer(app.config['SECRET_KEY'], salt=self.salt)
+        self.enabled = True
+        app.extensions['password_invites'] = self
+
+    def token(self, user_id):
+        return self._serializer.dumps({"uid": user_id})
+
+    def verify(self, token):
+        """Returns the user id an unexpired invite was issued for."""
+        try:
+            return int(self._serializer.loads(token, max_age=self.ttl)["uid"])
+        except (BadSignature, KeyError, TypeError, ValueError):
+            raise InvalidInvite()
+
+    def message(self, user_id, email, name):
+        from flask_mail import Message
+
+        link = f"{self.setup_url}?{urlencode({'token': self.token(user_id)})}"
+        days = max(self.ttl // 86400, 1)
+        return Message(
+            subject="Set your NumerAid password",
+            recipients=[email],
+            sender=self.sender,
+            body=(
+                f"Hi {name},\n\n"
+                f"An account has been created for you. Choose a password to sign in:\n\n"
+                f"{link}\n\n"
+                f"The link expires in {days} day{'s' if days != 1 else ''}.\n"
+            ),
+        )
+
+    def send(self, users):
+        """Queues an invite per ``(user_id, email, name)`` and returns how many were accepted."""
+        if not self.enabled:
+            return 0
+        users = list(users)
+        accepted = self.dispatcher.enqueue_many(self.message(*user) for user in users)
+        with self._lock:
+            self.sent += accepted
+            self.dropped += len(users) - accepted
+        return accepted
+
+    def stats(self):
+        with self._lock:
+            return {"enabled": self.enabled, "sent": self.sent, "dropped": self.dropped}
@@ -0,0 +1,85 @@
+import json
+import uuid
+import decimal
+import datetime
+import dataclasses
+
+from flask.json.provider import DefaultJSONProvider
+
+try:
+    import orjson
+except ImportError:  # optional; the stdlib encoder is used instead
+    orjson = None
+
+BACKENDS = ('auto', 'orjson', 'stdlib')
+
+
+def default(o):
+    """Types neither encoder handles natively. Dates are ISO 8601, as the API has always sent them."""
+    if isinstance(o, (datetime.date, datetime.time)):
+        return o.isoformat()
+    if isinstance(o, (decimal.Decimal, uuid.UUID)):
+        return str(o)
+    if dataclasses.is_dataclass(o) and not isinstance(o, type):
+        return dataclasses.asdict(o)
+    if hasattr(o, '__html__'):
+        return str(o.__html__())
+    raise TypeError(f"Object of type {type(o).__name__} is not JSON serializable")
+
+
+def resolve_backend(name):
+    """Returns 'orjson' or 'stdlib' for a JSON_BACKEND setting."""
+    if name not in BACKENDS:
+        raise ValueError(f"JSON_BACKEND must be one of {', '.join(BACKENDS)}")
+    if name == 'orjson' and orjson is None:
+        raise RuntimeError("JSON_BACKEND is 'orjson' but the orjson package is not installed")
+    if name == 'auto':
+        return 'orjson' if orjson is not None else 'stdlib'
+    return name
+
+
+class JSONProvider(DefaultJSONProvider):
+    """
+    Flask JSON provider that encodes with orjson when it is installed.
+
+    Both backends write datetimes (``created_at``, ``last_login``,
+    ``updated_at``) as ISO 8601 strings and honour Flask's ``sort_keys`` and
+    debug-mode indenting, so responses do not depend on which one is active.
+    ``JSON_BACKEND`` picks 'orjson', 'stdlib' or 'auto' (the default).
+    """
+
+    def __init__(self, app, backend=None):
+        super().__init__(app)
+        self.backend = resolve_backend(backend or app.config.get('JSON_BACKEND', 'auto'))
+
+    def dumps(self, obj, **kwargs):
+        if self.backend == 'orjson' and not kwargs:
+            return self.dumpb(obj).decode()
+        kwargs.setdefault('default', default)
+        kwargs.setdefault('ensure_ascii', self.ensure_ascii)
+        kwargs.setdefault('sort_keys', self.sort_keys)
+        return json.dumps(obj, **kwargs)
+
+    def dumpb(self, obj, indent=False, sort_keys=None):
+        """Encodes ``obj`` to compact UTF-8 bytes; ``sort_keys`` defaults to the provider's setting."""
+        if sort_keys is None:
+            sort_keys = self.sort_keys
+        if self.backend == 'orjson':
+            option = orjson.OPT_NON_STR_KEYS
+            if sort_keys:
+                option |= orjson.OPT_SORT_KEYS
+            if indent:
+                option |= orjson.OPT_INDENT_2
+            return orjson.dumps(obj, default=default, option=option)
+        return self.dumps(obj, indent=2 if indent else None, sort_keys=sort_keys,
+                          separators=None if indent else (',', ':')).encode()
+
+    def loads(self, s, **kwargs):
+        if self.backend == 'orjson' and not kwargs:
+            return orjson.loads(s)
+        return json.loads(s, **kwargs)
+
+    def response(self, *args, **kwargs):
+        obj = self._prepare_response_obj(args, kwargs)
+        indent = self.compact is False or (self.compact is None and self._app.debug)
+        return self._app.response_class(self.dumpb(obj, indent=indent) + b'\n', mimetype=self.mimetype)
@@ -0,0 +1,93 @@
+import re
+import time
+import threading
+
+MAX_AGE_PATTERN = re.compile(r'max-age=(\d+)')
+
+
+class JWKSCache:
+    """
+    In-memory JSON Web Key Set used to verify RS256 ID tokens locally.
+
+    Keys are fetched once and kept until they expire (the provider's
+    Cache-Control max-age, capped by ``ttl``). A token signed with an unknown
+    ``kid`` triggers a refresh, at most once per ``min_refresh_interval``.
+    """
+
+    def __init__(self, http_client, clock=time.monotonic):
+        self.http_client = http_client
+        self.uri = 'https://www.googleapis.com/oauth2/v3/certs'
+        self.issuers = ('https://accounts.google.com', 'accounts.google.com')
+        self.ttl = 3600
+        self.min_refresh_interval = 60
+        self.leeway = 30
+        self.fetches = 0
+        self._clock = clock
+        self._keys = {}
+        self._expires_at = 0
+        self._fetched_at = None
+        self._lock = threading.Lock()
+
+    def init_app(self, app):
+        self.uri = app.config.get('GOOGLE_JWKS_URI', self.uri)
+        self.issuers = tuple(app.config.get('GOOGLE_ISSUERS', self.issuers))
+        self.ttl = app.config.get('JWKS_CACHE_TTL', self.ttl)
+        self.min_refresh_interval = app.config.get('JWKS_MIN_REFRESH_INTERVAL', self.min_refresh_interval)
+        self.clear()
+        app.extensions['google_jwks'] = self
+
+    def decode(self, token, audience):
+        """Verifies the token signature and standard claims, returning its payload."""
+        import jwt
+
+        kid = jwt.get_unverified_header(token).get('kid')
+        key = self.get_key(kid)
+        return jwt.decode(
+            token,
+            key.key,
+            algorithms=['RS256'],
+            audience=audience,
+            issuer=self.issuers,
+            leeway=self.leeway,
+        )
+
+    def get_key(self, kid):
+        import jwt
+
+        key = self._keys.get(kid)
+        if key is None or self._clock() >= self._expires_at:
+            self.refresh(kid)
+            key = self._keys.get(kid)
+        if key is None:
+            raise jwt.InvalidTokenError(f"Unknown signing key '{kid}'")
+        return key
+
+    def refresh(self, kid=None):
+        import jwt
+
+        with self._lock:
+            now = self._clock()
+            if kid in self._keys and now < self._expires_at:
+                return  # another thread refreshed while we waited
+            if (kid not in self._keys and now < self._expires_at
+                    and self._fetched_at is not None
+                    and now - self._fetched_at < self.min_refresh_interval):
+                return  # unknown kid, but we refreshed very recently
+
+            response = self.http_client.get(self.uri)
+            response.raise_for_status()
+            jwk_set = jwt.PyJWKSet.from_dict(response.json())
+
+            max_age = MAX_AGE_PATTERN.search(response.headers.get('Cache-Control', ''))
+            ttl = min(int(max_age.group(1)), self.ttl) if max_age else self.ttl
+
+            self._keys = {key.key_id: key for key in jwk_set.keys}
+            self._fetched_at = now
+            self._expires_at = now + ttl
+            self.fetches += 1
+
+    def clear(self):
+        with self._lock:
+            self._keys = {}
+            self._expires_at = 0
+            self._fetched_at = None
@@ -0,0 +1,131 @@
+import atexit
+import logging
+import datetime
+import threading
+
+from sqlalchemy import bindparam, or_, update
+
+from .workers import ProcessThread
+
+logger = logging.getLogger(__name__)
+
+
+class LastLoginBuffer:
+    """
+    Write-behind buffer for ``user.last_login``.
+
+    Logins only record a timestamp in memory; a worker thread per process
+    writes the newest value per user every ``LAST_LOGIN_FLUSH_INTERVAL``
+    seconds as one executemany UPDATE, and once more on shutdown. A row is
+    only overwritten by a later timestamp, so flushes from several workers
+    can land in any order. With an interval of 0 every login is written
+    immediately, as before.
+    """
+
+    def __init__(self):
+        self.app = None
+        self.interval = 0.0
+        self.max_pending = 10000
+        self._pending = {}
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._worker = ProcessThread(self._run, 'last-login-writer', self._lock, reset=self._reset)
+        self.recorded = 0
+        self.flushes = 0
+        self.rows_written = 0
+        self.failures = 0
+
+    def init_app(self, app):
+        self.app = app
+        self.interval = app.config.get('LAST_LOGIN_FLUSH_INTERVAL', self.interval)
+        self.max_pending = app.config.get('LAST_LOGIN_MAX_PENDING', self.max_pending)
+        app.extensions['last_login_buffer'] = self
+        atexit.register(self.shutdown)
+
+    def record(self, user_id, when=None):
+        """Notes that ``user_id`` logged in at ``when`` (default now)."""
+        when = when or datetime.datetime.now(datetime.timezone.utc)
+        if self.interval <= 0:
+            self._write({user_id: when})
+            return
+
+        self._worker.ensure()
+        with self._lock:
+            previous = self._pending.get(user_id)
+            if previous is None or when > previous:
+                self._pending[user_id] = when
+            self.recorded += 1
+            full = len(self._pending) >= self.max_pending
+        if full:
+            self._wake.set()
+
+    def flush(self):
+        """Writes every pending timestamp. Returns the number of users written."""
+        with self._lock:
+            pending, self._pending = self._pending, {}
+        if not pending:
+            return 0
+        try:
+            self._write(pending)
+        except Exception:
+            logger.exception("Could not write %d last-login times; keeping them for the next flush", len(pending))
+            with self._lock:
+                self.failures += 1
+                for user_id, when in pending.items():
+                    current = self._pending.get(user_id)
+                    if current is None or when > current:
+                        self._pending[user_id] = when
+            return 0
+        return len(pending)
+
+    def shutdown(self):
+        """Stops the worker thread and writes what is still buffered."""
+        if not self._worker.started:
+            return
+        self._worker.stopping.set()
+        self._wake.set()
+        self._worker.stop(5)
+        with self.app.app_context():
+            self.flush()
+
+    def stats(self):
+        with self._lock:
+            return {
+                "interval": self.interval,
+                "pending": len(self._pending),
+                "recorded": self.recorded,
+                "flushes": self.flushes,
+                "rows_written": self.rows_written,
+                "failures": self.failures,
+            }
+
+    def _write(self, pending):
+        from ..extensions import db
+        from ..models.user_model import User
+
+        table = User.__table__
+        stmt = (
+            update(table)
+            .where(table.c.user_id == bindparam('b_user_id'))
+            .where(or_(table.c.last_login.is_(None), table.c.last_login < bindparam('b_last_login')))
+            .values(last_login=bindparam('b_last_login'))
+        )
+        db.session.execute(stmt, [
+            {"b_user_id": user_id, "b_last_login": when} for user_id, when in pending.items()
+        ])
+        db.session.commit()
+        with self._lock:
+            self.flushes += 1
+            self.rows_written += len(pending)
+
+    def _reset(self):
+        self._pending = {}
+
+    def _run(self):
+        while not self._worker.stopping.is_set():
+            self._wake.wait(self.interval)
+            self._wake.clear()
+            if self._worker.stopping.is_set():
+                return
+            with self.app.app_context():
+                self.flush()
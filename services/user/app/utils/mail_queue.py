@@ -0,0 +1,201 @@
+import time
+import heapq
+import queue
+import atexit
+import logging
+import smtplib
+import itertools
+import threading
+
+from .workers import ProcessThread, wait_for
+
+logger = logging.getLogger(__name__)
+
+
+class MailDispatcher:
+    """
+    Background delivery for Flask-Mail messages.
+
+    Requests call ``enqueue`` and return immediately. One worker thread per
+    process drains the bounded queue in batches of up to ``MAIL_BATCH_SIZE``
+    messages, each sent over a single SMTP connection. Temporary failures are
+    retried with exponential backoff; when the queue is full new messages are
+    dropped and counted rather than blocking the request.
+    """
+
+    def __init__(self, mail, clock=time.monotonic):
+        self.mail = mail
+        self.clock = clock
+        self.app = None
+        self.max_queue = 1000
+        self.batch_size = 50
+        self.max_retries = 3
+        self.retry_backoff = 1.0
+        self.shutdown_timeout = 5.0
+        self._queue = None
+        self._retries = []
+        self._sequence = itertools.count()
+        self._lock = threading.Lock()
+        self._outstanding = 0
+        self._worker = ProcessThread(self._run, 'mail-dispatcher', self._lock, reset=self._reset)
+        self.reset_stats()
+
+    def init_app(self, app):
+        config = app.config
+        self.app = app
+        self.max_queue = config.get('MAIL_QUEUE_SIZE', self.max_queue)
+        self.batch_size = config.get('MAIL_BATCH_SIZE', self.batch_size)
+        self.max_retries = config.get('MAIL_MAX_RETRIES', self.max_retries)
+        self.retry_backoff = config.get('MAIL_RETRY_BACKOFF', self.retry_backoff)
+        self.shutdown_timeout = config.get('MAIL_SHUTDOWN_TIMEOUT', self.shutdown_timeout)
+        app.extensions['mail_dispatcher'] = self
+        atexit.register(self.shutdown)
+
+    @property
+    def enabled(self):
+        return self.app is not None
+
+    def reset_stats(self):
+        self.enqueued = 0
+        self.dropped = 0
+        self.sent = 0
+        self.failed = 0
+        self.retried = 0
+        self.batches = 0
+        self.connections = 0
+
+    def enqueue(self, message):
+        """Queues one message for delivery. Returns False if the queue was full."""
+        self._worker.ensure()
+        try:
+            self._queue.put_nowait((message, 0))
+        except queue.Full:
+            with self._lock:
+                self.dropped += 1
+            logger.warning("Mail queue full; dropped message to %s", message.recipients)
+            return False
+        with self._lock:
+            self.enqueued += 1
+            self._outstanding += 1
+        return True
+
+    def enqueue_many(self, messages):
+        """Queues several messages and returns how many were accepted."""
+        return sum(self.enqueue(message) for message in messages)
+
+    def wait_idle(self, timeout=None):
+        """Blocks until every accepted message has been sent or given up on."""
+        return wait_for(lambda: not self._outstanding, timeout, self.clock)
+
+    def shutdown(self):
+        """Delivers what is already queued, up to MAIL_SHUTDOWN_TIMEOUT, then stops the worker."""
+        if not self._worker.started:
+            return
+        self.wait_idle(self.shutdown_timeout)
+        self._worker.stop(self.shutdown_timeout)
+
+    def stats(self):
+        with self._lock:
+            return {
+                "queued": self._queue.qsize() if self._queue is not None else 0,
+                "retrying": len(self._retries),
+                "max_queue": self.max_queue,
+                "enqueued": self.enqueued,
+                "dropped": self.dropped,
+                "sent": self.sent,
+                "failed": self.failed,
+                "retried": self.retried,
+                "batches": self.batches,
+                "connections": self.connections,
+            }
+
+    def _reset(self):
+        self._queue = queue.Queue(maxsize=self.max_queue)
+        self._retries = []
+        self._outstanding = 0
+
+    def _run(self):
+        while not self._worker.stopping.is_set():
+            batch = self._next_batch()
+            if not batch:
+                continue
+            with self.app.app_context():
+                self._deliver(batch)
+
+    def _next_batch(self):
+        batch = self._due_retries()
+        try:
+            if not batch:
+                batch.append(self._queue.get(timeout=self._idle_wait()))
+            while len(batch) < self.batch_size:
+                batch.append(self._queue.get_nowait())
+        except queue.Empty:
+            pass
+        return batch
+
+    def _due_retries(self):
+        """Pops the retries whose backoff has elapsed."""
+        due = []
+        now = self.clock()
+        with self._lock:
+            while self._retries and self._retries[0][0] <= now and len(due) < self.batch_size:
+                _, _, message, attempts = heapq.heappop(self._retries)
+                due.append((message, attempts))
+        return due
+
+    def _idle_wait(self):
+        with self._lock:
+            if self._retries:
+                return max(0.0, min(0.5, self._retries[0][0] - self.clock()))
+        return 0.5
+
+    def _deliver(self, batch):
+        pending = list(batch)
+        with self._lock:
+            self.batches += 1
+        try:
+            with self.mail.connect() as connection:
+                with self._lock:
+                    self.connections += 1
+                while pending:
+                    message, attempts = pending[0]
+                    try:
+                        connection.send(message)
+                    except smtplib.SMTPRecipientsRefused as e:
+                        self._fail(message, e)
+                    except smtplib.SMTPResponseException as e:
+                        # 4xx replies are temporary, 5xx permanent
+                        if 400 <= e.smtp_code < 500:
+                            self._retry(message, attempts, e)
+                        else:
+                            self._fail(message, e)
+                    except OSError:
+                        # Includes SMTPServerDisconnected: the connection is gone
+                        raise
+                    except Exception as e:
+                        # Malformed message (no recipients, bad headers): retrying will not help
+                        self._fail(message, e)
+                    else:
+                        with self._lock:
+                            self.sent += 1
+                            self._outstanding -= 1
+                    pending.pop(0)
+        except Exception as e:
+            # Connection-level failure: everything not yet sent is retried
+            for message, attempts in pending:
+                self._retry(message, attempts, e)
+
+    def _retry(self, message, attempts, error):
+        if attempts >= self.max_retries:
+            return self._fail(message, error)
+        delay = self.retry_backoff * (2 ** attempts)
+        with self._lock:
+            self.retried += 1
+            heapq.heappush(self._retries, (self.clock() + delay, next(self._sequence), message, attempts + 1))
+        logger.info("Retrying mail to %s in %.1fs: %s", message.recipients, delay, error)
+
+    def _fail(self, message, error):
+        with self._lock:
+            self.failed += 1
+            self._outstanding -= 1
+        logger.error("Giving up on mail to %s: %s", message.recipients, error)
@@ -0,0 +1,99 @@
+import os
+import time
+import threading
+
+from sqlalchemy import event, exc
+from sqlalchemy.pool import QueuePool
+
+from .counters import Counters
+
+
+class PoolMetrics(Counters):
+    """
+    Connection pool statistics for the current worker process.
+
+    Checkout wait time is measured by a QueuePool subclass installed through
+    SQLALCHEMY_ENGINE_OPTIONS; connection churn is counted with pool events.
+    Gauges (size, checked out, overflow) are read from the live pool.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.pool_class = self._build_pool_class()
+        self.reset()
+
+    def init_app(self, app):
+        """Must run before ``db.init_app`` so the engine picks up the pool class."""
+        uri = app.config.get('SQLALCHEMY_DATABASE_URI') or ''
+        if not uri.startswith('sqlite'):
+            options = dict(app.config.get('SQLALCHEMY_ENGINE_OPTIONS') or {})
+            options.setdefault('poolclass', self.pool_class)
+            app.config['SQLALCHEMY_ENGINE_OPTIONS'] = options
+        app.extensions['pool_metrics'] = self
+
+    def reset(self):
+        with self._lock:
+            self.checkouts = 0
+            self.checkout_timeouts = 0
+            self.wait_total = 0.0
+            self.wait_max = 0.0
+            self.connections_opened = 0
+            self.connections_closed = 0
+            self.invalidations = 0
+
+    def record_wait(self, seconds, timed_out=False):
+        with self._lock:
+            if timed_out:
+                self.checkout_timeouts += 1
+            else:
+                self.checkouts += 1
+            self.wait_total += seconds
+            self.wait_max = max(self.wait_max, seconds)
+
+    def stats(self, engine):
+        pool = engine.pool
+        if isinstance(pool, QueuePool):
+            gauges = {
+                "size": pool.size(),
+                "checked_out": pool.checkedout(),
+                "checked_in": pool.checkedin(),
+                "overflow": pool.overflow(),
+            }
+        else:
+            gauges = {"status": pool.status()}
+
+        with self._lock:
+            waits = self.checkouts + self.checkout_timeouts
+            return {
+                "pid": os.getpid(),
+                "pool_class": type(pool).__name__,
+                **gauges,
+                "checkouts": self.checkouts,
+                "checkout_timeouts": self.checkout_timeouts,
+                "checkout_wait_avg_ms": round(self.wait_total / waits * 1000, 3) if waits else 0.0,
+                "checkout_wait_max_ms": round(self.wait_max * 1000, 3),
+                "connections_opened": self.connections_opened,
+                "connections_closed": self.connections_closed,
+                "invalidations": self.invalidations,
+            }
+
+    def _build_pool_class(self):
+        metrics = self
+
+        class TimedQueuePool(QueuePool):
+            """QueuePool that reports how long each checkout waited for a connection."""
+
+            def _do_get(self):
+                started = time.perf_counter()
+                try:
+                    connection = super()._do_get()
+                except exc.TimeoutError:
+                    metrics.record_wait(time.perf_counter() - started, timed_out=True)
+                    raise
+                metrics.record_wait(time.perf_counter() - started)
+                return connection
+
+        event.listen(TimedQueuePool, 'connect', lambda *args: metrics._count('connections_opened'))
+        event.listen(TimedQueuePool, 'close', lambda *args: metrics._count('connections_closed'))
+        event.listen(TimedQueuePool, 'invalidate', lambda *args: metrics._count('invalidations'))
+        return TimedQueuePool
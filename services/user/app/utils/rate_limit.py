@@ -0,0 +1,187 @@
+import time
+import threading
+from math import floor
+from collections import OrderedDict, defaultdict
+
+from flask import request
+from flask_limiter.util import get_remote_address
+from flask_login import current_user
+from limits.storage import Storage, SlidingWindowCounterSupport
+from limits.storage.base import TimestampedSlidingWindow
+
+
+def rate_limit_key():
+    """
+    Signed-in callers are limited per user, everyone else per client address.
+
+    Behind a reverse proxy the address is only the client's once
+    ``PROXY_FIX_X_FOR`` names how many proxies to trust.
+    """
+    if current_user and current_user.is_authenticated:
+        return f"user:{current_user.get_id()}"
+    return get_remote_address()
+
+
+class SlidingWindowCounters(TimestampedSlidingWindow):
+    """
+    Sliding window counter strategy built on ``incr``/``decr``/``get``.
+
+    Same weighting as limits' own in-memory storage: the previous window's
+    count is scaled by the part of it still inside the sliding window.
+    """
+
+    def acquire_sliding_window_entry(self, key, limit, expiry, amount=1):
+        if amount > limit:
+            return False
+        now = time.time()
+        previous_key, current_key = self.sliding_window_keys(key, expiry, now)
+        previous_count, previous_ttl, current_count, _ = self._sliding_window(previous_key, current_key, expiry, now)
+        weighted = previous_count * previous_ttl / expiry
+        if floor(weighted + current_count) + amount > limit:
+            return False
+        current_count = self.incr(current_key, 2 * expiry, amount)
+        if floor(weighted + current_count) > limit:
+            # Another hit won the race; give the slot back
+            self.decr(current_key, amount)
+            return False
+        return True
+
+    def get_sliding_window(self, key, expiry):
+        now = time.time()
+        previous_key, current_key = self.sliding_window_keys(key, expiry, now)
+        return self._sliding_window(previous_key, current_key, expiry, now)
+
+    def clear_sliding_window(self, key, expiry):
+        for window_key in self.sliding_window_keys(key, expiry, time.time()):
+            self.clear(window_key)
+
+    def _sliding_window(self, previous_key, current_key, expiry, now):
+        previous_count, current_count = self._counts(previous_key, current_key)
+        previous_ttl = (1 - (((now - expiry) / expiry) % 1)) * expiry if previous_count else 0.0
+        current_ttl = (1 - ((now / expiry) % 1)) * expiry + expiry
+        return previous_count, previous_ttl, current_count, current_ttl
+
+    def _counts(self, *keys):
+        return [self.get(key) for key in keys]
+
+
+class BoundedMemoryStorage(SlidingWindowCounters, Storage, SlidingWindowCounterSupport):
+    """
+    Per-process rate limit storage holding at most ``max_keys`` counters.
+
+    When full, the least recently used counter is evicted, so a flood of
+    distinct client addresses cannot grow memory without bound. Expired
+    counters are dropped as they are touched.
+
+        RATELIMIT_STORAGE_URI = "bounded-memory://"
+    """
+
+    STORAGE_SCHEME = ["bounded-memory"]
+
+    def __init__(self, uri=None, wrap_exceptions=False, max_keys=10000, clock=time.time, **options):
+        self.max_keys = int(max_keys)
+        self.clock = clock
+        self.evictions = 0
+        self._counters = OrderedDict()
+        self._lock = threading.Lock()
+        super().__init__(uri, wrap_exceptions=wrap_exceptions, **options)
+
+    @property
+    def base_exceptions(self):
+        return ValueError
+
+    def incr(self, key, expiry, amount=1):
+        with self._lock:
+            now = self.clock()
+            entry = self._live(key, now)
+            if entry is None:
+                while len(self._counters) >= self.max_keys:
+                    self._counters.popitem(last=False)
+                    self.evictions += 1
+                entry = self._counters[key] = [0, now + expiry]
+            entry[0] += amount
+            return entry[0]
+
+    def decr(self, key, amount=1):
+        with self._lock:
+            entry = self._live(key, self.clock())
+            if entry is None:
+                return 0
+            entry[0] = max(entry[0] - amount, 0)
+            return entry[0]
+
+    def get(self, key):
+        with self._lock:
+            entry = self._live(key, self.clock())
+            return entry[0] if entry else 0
+
+    def get_expiry(self, key):
+        with self._lock:
+            now = self.clock()
+            entry = self._live(key, now)
+            return entry[1] if entry else now
+
+    def check(self):
+        return True
+
+    def reset(self):
+        with self._lock:
+            count = len(self._counters)
+            self._counters.clear()
+            return count
+
+    def clear(self, key):
+        with self._lock:
+            self._counters.pop(key, None)
+
+    def stats(self):
+        with self._lock:
+            return {"keys": len(self._counters), "max_keys": self.max_keys, "evictions": self.evictions}
+
+    def _live(self, key, now):
+        entry = self._counters.get(key)
+        if entry is None:
+            return None
+        if entry[1] <= now:
+            del self._counters[key]
+            return None
+        self._counters.move_to_end(key)
+        return entry
+
+
+class RateLimitMetrics:
+    """Counts allowed and rejected rate-limited requests per endpoint."""
+
+    def __init__(self, limiter):
+        self.limiter = limiter
+        self._lock = threading.Lock()
+        self.allowed = defaultdict(int)
+        self.rejected = defaultdict(int)
+
+    def init_app(self, app):
+        app.after_request(self._record)
+        app.extensions['rate_limit_metrics'] = self
+
+    def stats(self):
+        with self._lock:
+            endpoints = sorted(set(self.allowed) | set(self.rejected))
+            routes = {
+                endpoint: {"allowed": self.allowed[endpoint], "rejected": self.rejected[endpoint]}
+                for endpoint in endpoints
+            }
+        storage = self.limiter.storage if self.limiter.initialized else None
+        return {
+            "storage": type(storage).__name__ if storage else None,
+            **(storage.stats() if hasattr(storage, 'stats') else {}),
+            "routes": routes,
+        }
+
+    def _record(self, response):
+        endpoint = request.endpoint or request.path
+        if response.status_code == 429:
+            with self._lock:
+                self.rejected[endpoint] += 1
+        elif self.limiter.initialized and self.limiter.current_limits:
+            with self._lock:
+                self.allowed[endpoint] += 1
+        return response
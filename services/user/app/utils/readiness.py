@@ -0,0 +1,89 @@
+import os
+import time
+import logging
+import threading
+
+from sqlalchemy import text
+
+logger = logging.getLogger(__name__)
+
+
+class Readiness:
+    """
+    Readiness of the current worker process.
+
+    A worker is ready once it has opened ``DB_WARM_CONNECTIONS`` pooled
+    connections (by default the pool size) and run a trivial query on each,
+    so the first real requests do not pay for connecting. Forked workers
+    start not ready; gunicorn warms each one before it accepts traffic, and
+    otherwise the first readiness probe starts warming in the background.
+    """
+
+    def __init__(self):
+        self.app = None
+        self.connections = 1
+        self._lock = threading.Lock()
+        self._ready_pid = None
+        self._warming_pid = None
+        self.warmed_in_ms = None
+        self.failures = 0
+
+    def init_app(self, app):
+        self.app = app
+        pool_size = (app.config.get('SQLALCHEMY_ENGINE_OPTIONS') or {}).get('pool_size', 1)
+        self.connections = app.config.get('DB_WARM_CONNECTIONS') or pool_size
+        self._ready_pid = None
+        self._warming_pid = None
+        app.extensions['readiness'] = self
+
+    @property
+    def ready(self):
+        return self._ready_pid == os.getpid()
+
+    def warm(self):
+        """Fills the pool for this process. Returns True once the worker is ready."""
+        from ..extensions import db
+
+        started = time.perf_counter()
+        try:
+            with self.app.app_context():
+                opened = []
+                try:
+                    for _ in range(self.connections):
+                        connection = db.engine.connect()
+                        opened.append(connection)
+                        connection.execute(text('SELECT 1'))
+                finally:
+                    for connection in opened:
+                        connection.close()
+        except Exception:
+            logger.exception("Could not warm the database pool")
+            with self._lock:
+                self.failures += 1
+                self._warming_pid = None
+            return False
+
+        with self._lock:
+            self.warmed_in_ms = round((time.perf_counter() - started) * 1000, 2)
+            self._ready_pid = os.getpid()
+            self._warming_pid = None
+        return True
+
+    def check(self):
+        """Returns readiness, starting a background warm-up on the first miss in this process."""
+        if self.ready:
+            return True
+        with self._lock:
+            if self._warming_pid == os.getpid():
+                return False
+            self._warming_pid = os.getpid()
+        threading.Thread(target=self.warm, name='db-pool-warmup', daemon=True).start()
+        return False
+
+    def stats(self):
+        return {
+            "ready": self.ready,
+            "connections": self.connections,
+            "warmed_in_ms": self.warmed_in_ms,
+            "failures": self.failures,
+        }
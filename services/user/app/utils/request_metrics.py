@@ -0,0 +1,221 @@
+import time
+import bisect
+import logging
+import threading
+import contextvars
+from contextlib import contextmanager
+from collections import defaultdict
+
+from flask import request
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+logger = logging.getLogger(__name__)
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_COUNT_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100)
+
+_trace = contextvars.ContextVar('request_trace', default=None)
+
+
+class RequestTrace:
+    """What one request spent its time on, filled in by engine events and ``timed``."""
+
+    def __init__(self, keep_statements):
+        self.started = time.perf_counter()
+        self.queries = 0
+        self.db_seconds = 0.0
+        self.dependencies = defaultdict(float)
+        self.statements = [] if keep_statements else None
+        self._query_started = None
+
+
+@contextmanager
+def timed(dependency):
+    """Adds the time spent in the block to the current request under ``dependency``."""
+    trace = _trace.get()
+    if trace is None:
+        yield
+        return
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        trace.dependencies[dependency] += time.perf_counter() - started
+
+
+class Histogram:
+    """Cumulative Prometheus histogram keyed by label values."""
+
+    def __init__(self, name, help, labels, buckets):
+        self.name = name
+        self.help = help
+        self.labels = labels
+        self.buckets = buckets
+        self._series = {}
+
+    def observe(self, label_values, value):
+        series = self._series.get(label_values)
+        if series is None:
+            series = self._series[label_values] = [[0] * (len(self.buckets) + 1), 0.0]
+        series[0][bisect.bisect_left(self.buckets, value)] += 1
+        series[1] += value
+
+    def render(self):
+        yield f"# HELP {self.name} {self.help}"
+        yield f"# TYPE {self.name} histogram"
+        for label_values, (counts, total) in sorted(self._series.items()):
+            labels = _labels(self.labels, label_values)
+            cumulative = 0
+            for bound, count in zip(self.buckets, counts):
+                cumulative += count
+                yield f'{self.name}_bucket{{{labels},le="{bound}"}} {cumulative}'
+            cumulative += counts[-1]
+            yield f'{self.name}_bucket{{{labels},le="+Inf"}} {cumulative}'
+            yield f"{self.name}_sum{{{labels}}} {total}"
+            yield f"{self.name}_count{{{labels}}} {cumulative}"
+
+
+class Counter:
+    """Prometheus counter keyed by label values."""
+
+    def __init__(self, name, help, labels):
+        self.name = name
+        self.help = help
+        self.labels = labels
+        self._series = defaultdict(int)
+
+    def inc(self, label_values):
+        self._series[label_values] += 1
+
+    def render(self):
+        yield f"# HELP {self.name} {self.help}"
+        yield f"# TYPE {self.name} counter"
+        for label_values, value in sorted(self._series.items()):
+            yield f"{self.name}{{{_labels(self.labels, label_values)}}} {value}"
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _labels(names, values):
+    return ','.join(f'{name}="{_escape(value)}"' for name, value in zip(names, values))
+
+
+class RequestMetrics:
+    """
+    Per-endpoint request instrumentation for the current worker process.
+
+    Each request gets a trace that SQLAlchemy cursor events and ``timed``
+    blocks (password hashing, outbound HTTP) add to; when the response is
+    ready the trace is folded into latency, query count, DB time and
+    dependency histograms labelled by blueprint and endpoint. Requests slower
+    than ``SLOW_REQUEST_THRESHOLD_MS`` are logged with the SQL they ran.
+    """
+
+    def __init__(self):
+        self.slow_threshold = 0.0
+        self.max_statements = 50
+        self._lock = threading.Lock()
+        self._listening = False
+        self.reset()
+
+    def init_app(self, app):
+        self.slow_threshold = app.config.get('SLOW_REQUEST_THRESHOLD_MS', 0) / 1000
+        self.max_statements = app.config.get('SLOW_REQUEST_MAX_STATEMENTS', self.max_statements)
+        app.before_request(self._start)
+        app.after_request(self._finish)
+        app.teardown_request(self._discard)
+        if not self._listening:
+            event.listen(Engine, 'before_cursor_execute', self._before_cursor_execute)
+            event.listen(Engine, 'after_cursor_execute', self._after_cursor_execute)
+            self._listening = True
+        app.extensions['request_metrics'] = self
+
+    def reset(self):
+        with self._lock:
+            self.requests = Counter(
+                'user_http_requests_total', 'Requests handled, by endpoint and status.',
+                ('blueprint', 'endpoint', 'method', 'status'))
+            self.slow_requests = Counter(
+                'user_http_slow_requests_total', 'Requests slower than SLOW_REQUEST_THRESHOLD_MS.',
+                ('blueprint', 'endpoint'))
+            self.latency = Histogram(
+                'user_http_request_duration_seconds', 'Time from routing to response, by endpoint.',
+                ('blueprint', 'endpoint', 'method'), LATENCY_BUCKETS)
+            self.db_queries = Histogram(
+                'user_http_request_db_queries', 'SQL statements executed per request.',
+                ('blueprint', 'endpoint'), QUERY_COUNT_BUCKETS)
+            self.db_time = Histogram(
+                'user_http_request_db_seconds', 'Time spent executing SQL per request.',
+                ('blueprint', 'endpoint'), LATENCY_BUCKETS)
+            self.dependency_time = Histogram(
+                'user_http_request_dependency_seconds',
+                'Time spent in password hashing and outbound HTTP per request.',
+                ('blueprint', 'endpoint', 'dependency'), LATENCY_BUCKETS)
+
+    def render(self):
+        """Returns every metric in the Prometheus text exposition format."""
+        with self._lock:
+            metrics = (self.requests, self.slow_requests, self.latency,
+                       self.db_queries, self.db_time, self.dependency_time)
+            lines = [line for metric in metrics for line in metric.render()]
+        return '\n'.join(lines) + '\n'
+
+    def _start(self):
+        _trace.set(RequestTrace(keep_statements=bool(self.slow_threshold)))
+
+    def _finish(self, response):
+        trace = _trace.get()
+        if trace is None:
+            return response
+        _trace.set(None)
+        elapsed = time.perf_counter() - trace.started
+
+        # Unmatched URLs share one series so scanners cannot explode the label set
+        blueprint = request.blueprint or ''
+        endpoint = request.endpoint or 'unmatched'
+        with self._lock:
+            self.requests.inc((blueprint, endpoint, request.method, str(response.status_code)))
+            self.latency.observe((blueprint, endpoint, request.method), elapsed)
+            self.db_queries.observe((blueprint, endpoint), trace.queries)
+            self.db_time.observe((blueprint, endpoint), trace.db_seconds)
+            for dependency, seconds in trace.dependencies.items():
+                self.dependency_time.observe((blueprint, endpoint, dependency), seconds)
+            if self.slow_threshold and elapsed >= self.slow_threshold:
+                self.slow_requests.inc((blueprint, endpoint))
+
+        if self.slow_threshold and elapsed >= self.slow_threshold:
+            self._log_slow(trace, elapsed, endpoint, response.status_code)
+        return response
+
+    def _discard(self, error=None):
+        _trace.set(None)
+
+    def _log_slow(self, trace, elapsed, endpoint, status):
+        statements = '\n'.join(f"  {ms:.1f}ms {statement}" for ms, statement in trace.statements)
+        dependencies = ', '.join(f"{name}={seconds * 1000:.1f}ms" for name, seconds in trace.dependencies.items())
+        logger.warning(
+            "Slow request %s %s (%s) -> %s in %.1fms; %d queries in %.1fms%s%s",
+            request.method, request.path, endpoint, status, elapsed * 1000,
+            trace.queries, trace.db_seconds * 1000,
+            f"; {dependencies}" if dependencies else '',
+            f"\n{statements}" if statements else '',
+        )
+
+    def _before_cursor_execute(self, conn, cursor, statement, parameters, context, executemany):
+        trace = _trace.get()
+        if trace is not None:
+            trace._query_started = time.perf_counter()
+
+    def _after_cursor_execute(self, conn, cursor, statement, parameters, context, executemany):
+        trace = _trace.get()
+        if trace is None or trace._query_started is None:
+            return
+        seconds = time.perf_counter() - trace._query_started
+        trace._query_started = None
+        trace.queries += 1
+        trace.db_seconds += seconds
+        if trace.statements is not None and len(trace.statements) < self.max_statements:
+            trace.statements.append((seconds * 1000, statement))
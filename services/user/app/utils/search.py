@@ -0,0 +1,104 @@
+import re
+
+from sqlalchemy import text
+
+# User columns a search matches, in the order the FTS5 table declares them
+SEARCH_FIELDS = ('name', 'surname', 'email', 'username')
+# Everything the FTS5 table stores: the role is kept, unindexed, for filtering
+INDEX_FIELDS = SEARCH_FIELDS + ('role',)
+
+FTS_TABLE = 'user_search'
+FTS_TRIGGERS = tuple(f'{FTS_TABLE}_{suffix}' for suffix in ('insert', 'update', 'delete'))
+# bm25 column weights: a hit on a name counts for more than one inside an email
+FTS_RANK = f'bm25({FTS_TABLE}, 10.0, 10.0, 4.0, 6.0, 0.0)'
+
+# The text pg_trgm indexes; queries must use this exact expression to hit the index
+TRIGRAM_DOCUMENT = "lower(name || ' ' || surname || ' ' || email || ' ' || coalesce(username, ''))"
+
+MAX_TERMS = 8
+TOKEN_RE = re.compile(r'\w')
+
+
+def search_terms(query):
+    """Lower-cased whitespace-separated terms of ``query`` that contain a word character."""
+    return [term for term in query.lower().split() if TOKEN_RE.search(term)][:MAX_TERMS]
+
+
+def fts_query(terms):
+    """An FTS5 MATCH expression: every term, as a quoted phrase prefix."""
+    return ' AND '.join('"{}"*'.format(term.replace('"', '""')) for term in terms)
+
+
+def like_pattern(term):
+    """A LIKE pattern matching ``term`` anywhere, with wildcards in it escaped by backslash."""
+    return '%' + re.sub(r'([\\%_])', r'\\\1', term) + '%'
+
+
+class UserSearchIndex:
+    """
+    Keeps the user search index for the connected database.
+
+    On PostgreSQL a GIN trigram index over ``TRIGRAM_DOCUMENT`` serves
+    substring matches and the database maintains it. On SQLite an FTS5 table
+    whose rowid is the ``user_id`` serves word-prefix matches, and triggers
+    on the user table keep it in step with every write, whether it comes
+    from the ORM, a Core INSERT or the bulk import. Other databases fall
+    back to an unindexed LIKE scan.
+    """
+
+    @staticmethod
+    def backend(connection):
+        return {'sqlite': 'fts5', 'postgresql': 'trigram'}.get(connection.dialect.name)
+
+    def install(self, connection):
+        """Creates the index; safe to run again."""
+        backend = self.backend(connection)
+        if backend == 'fts5':
+            connection.execute(text(
+                f"CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5("
+                f"{', '.join(SEARCH_FIELDS)}, role UNINDEXED, tokenize='unicode61 remove_diacritics 2', prefix='2 3 4')"
+            ))
+            self._install_triggers(connection)
+        elif backend == 'trigram':
+            connection.execute(text("CREATE EXTENSION IF NOT EXISTS pg_trgm"))
+            connection.execute(text(
+                f'CREATE INDEX IF NOT EXISTS ix_user_search_trgm ON "user" '
+                f'USING gin (({TRIGRAM_DOCUMENT}) gin_trgm_ops)'
+            ))
+
+    def drop(self, connection):
+        if self.backend(connection) == 'fts5':
+            for trigger in FTS_TRIGGERS:
+                connection.execute(text(f"DROP TRIGGER IF EXISTS {trigger}"))
+            connection.execute(text(f"DROP TABLE IF EXISTS {FTS_TABLE}"))
+
+    def rebuild(self, connection):
+        """Installs the index and, on SQLite, refills it from the user table. Returns the rows indexed."""
+        self.install(connection)
+        if self.backend(connection) != 'fts5':
+            return 0
+        connection.execute(text(f"DELETE FROM {FTS_TABLE}"))
+        result = connection.execute(text(
+            f"INSERT INTO {FTS_TABLE} (rowid, {', '.join(INDEX_FIELDS)}) "
+            f"SELECT user_id, name, surname, email, coalesce(username, ''), role FROM \"user\""
+        ))
+        return result.rowcount
+
+    @staticmethod
+    def _install_triggers(connection):
+        columns = ', '.join(INDEX_FIELDS)
+        values = ', '.join(f"coalesce(new.{field}, '')" for field in INDEX_FIELDS)
+        insert, update, delete = FTS_TRIGGERS
+        connection.execute(text(
+            f'CREATE TRIGGER IF NOT EXISTS {insert} AFTER INSERT ON "user" BEGIN '
+            f'INSERT INTO {FTS_TABLE} (rowid, {columns}) VALUES (new.user_id, {values}); END'
+        ))
+        connection.execute(text(
+            f'CREATE TRIGGER IF NOT EXISTS {update} AFTER UPDATE OF user_id, {columns} ON "user" BEGIN '
+            f'DELETE FROM {FTS_TABLE} WHERE rowid = old.user_id; '
+            f'INSERT INTO {FTS_TABLE} (rowid, {columns}) VALUES (new.user_id, {values}); END'
+        ))
+        connection.execute(text(
+            f'CREATE TRIGGER IF NOT EXISTS {delete} AFTER DELETE ON "user" BEGIN '
+            f'DELETE FROM {FTS_TABLE} WHERE rowid = old.user_id; END'
+        ))
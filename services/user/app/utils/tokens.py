@@ -0,0 +1,212 @@
+import time
+import uuid
+import logging
+import datetime
+import threading
+
+from flask import g, request
+
+logger = logging.getLogger(__name__)
+
+ISSUER = 'numeraid-user-service'
+
+
+def bearer_token():
+    """Returns the token from the request's ``Authorization: Bearer`` header, or None."""
+    scheme, _, token = request.headers.get('Authorization', '').partition(' ')
+    if scheme.lower() != 'bearer':
+        return None
+    return token.strip() or None
+
+
+class InvalidToken(Exception):
+    """Raised for malformed, expired, revoked or wrong-type tokens."""
+
+
+class TokenService:
+    """
+    Issues and verifies signed access and refresh tokens.
+
+    Access tokens carry ``sub`` (user id), ``role`` and ``active`` so any
+    service holding the signing key can authorize a call without a database
+    lookup. Revoked token ids are kept in an in-memory map pruned by expiry
+    and persisted in ``revoked_token``; each process re-reads that table at
+    most once per ``TOKEN_REVOCATION_SYNC_INTERVAL`` to learn about
+    revocations made by other workers.
+    """
+
+    def __init__(self, clock=time.time):
+        self.clock = clock
+        self.enabled = False
+        self.secret = None
+        self.algorithm = 'HS256'
+        self.access_ttl = 900
+        self.refresh_ttl = 14 * 24 * 3600
+        self.sync_interval = 30
+        self._revoked = {}
+        self._synced_at = None
+        self._lock = threading.Lock()
+
+    def init_app(self, app):
+        config = app.config
+        self.enabled = config.get('AUTH_TOKENS_ENABLED', False)
+        self.secret = config.get('JWT_SECRET_KEY') or config.get('SECRET_KEY')
+        self.algorithm = config.get('JWT_ALGORITHM', self.algorithm)
+        self.access_ttl = config.get('JWT_ACCESS_TOKEN_TTL', self.access_ttl)
+        self.refresh_ttl = config.get('JWT_REFRESH_TOKEN_TTL', self.refresh_ttl)
+        self.sync_interval = config.get('TOKEN_REVOCATION_SYNC_INTERVAL', self.sync_interval)
+        self._revoked = {}
+        self._synced_at = None
+        app.extensions['tokens'] = self
+
+    def issue(self, user):
+        """Returns a new access/refresh token pair for ``user``."""
+        return {
+            "access_token": self._encode(user, 'access', self.access_ttl,
+                                         role=user.role, active=bool(user.is_active)),
+            "refresh_token": self._encode(user, 'refresh', self.refresh_ttl),
+            "token_type": "Bearer",
+            "expires_in": self.access_ttl,
+        }
+
+    def request_claims(self):
+        """
+        Claims of the current request's bearer access token, or None when
+        tokens are disabled, there is no token, it does not verify, or it
+        belongs to an inactive user. The result is kept in ``g`` so CSRF
+        protection and the request loader verify the token only once.
+        """
+        if '_token_claims' not in g:
+            g._token_claims = self._request_claims()
+        return g._token_claims
+
+    def _request_claims(self):
+        token = bearer_token()
+        if not self.enabled or token is None:
+            return None
+        try:
+            claims = self.verify(token)
+        except InvalidToken:
+            return None
+        return claims if claims.get('active') else None
+
+    def verify(self, token, token_type='access'):
+        """Decodes ``token`` and returns its claims, raising InvalidToken if it is not usable."""
+        import jwt
+
+        try:
+            claims = jwt.decode(token, self.secret, algorithms=[self.algorithm], issuer=ISSUER,
+                                options={'require': ['exp', 'iat', 'sub', 'jti', 'typ']})
+        except jwt.InvalidTokenError as e:
+            raise InvalidToken(str(e))
+        if claims['typ'] != token_type:
+            raise InvalidToken(f"Expected a {token_type} token")
+        if self.is_revoked(claims['jti']):
+            raise InvalidToken("Token has been revoked")
+        return claims
+
+    def revoke(self, claims):
+        """Revokes a verified token for every worker until it would have expired anyway."""
+        from ..extensions import db
+        from ..models.token_model import RevokedToken
+
+        expires_at = datetime.datetime.fromtimestamp(claims['exp'], datetime.timezone.utc)
+        db.session.merge(RevokedToken(jti=claims['jti'], user_id=int(claims['sub']), expires_at=expires_at))
+        db.session.commit()
+        with self._lock:
+            self._revoked[claims['jti']] = claims['exp']
+
+    def is_revoked(self, jti):
+        if self._synced_at is None or self.clock() - self._synced_at >= self.sync_interval:
+            self.sync()
+        return jti in self._revoked
+
+    def sync(self):
+        """Replaces the in-memory revocation map with the unexpired rows from the database."""
+        from ..extensions import db
+        from ..models.token_model import RevokedToken
+
+        now = self.clock()
+        try:
+            rows = db.session.query(RevokedToken.jti, RevokedToken.expires_at).filter(
+                RevokedToken.expires_at > datetime.datetime.fromtimestamp(now, datetime.timezone.utc)
+            ).all()
+        except Exception:
+            logger.exception("Could not sync revoked tokens; keeping the previous list")
+            db.session.rollback()
+            self._synced_at = now
+            return
+        revoked = {jti: _timestamp(expires_at) for jti, expires_at in rows}
+        with self._lock:
+            # Keep local revocations that have not expired but may not be visible yet
+            revoked.update((jti, exp) for jti, exp in self._revoked.items() if exp > now)
+            self._revoked = revoked
+            self._synced_at = now
+
+    def stats(self):
+        return {"revoked": len(self._revoked), "synced_at": self._synced_at}
+
+    def _encode(self, user, token_type, ttl, **claims):
+        import jwt
+
+        now = int(self.clock())
+        payload = {
+            "iss": ISSUER,
+            "sub": str(user.user_id),
+            "typ": token_type,
+            "jti": uuid.uuid4().hex,
+            "iat": now,
+            "exp": now + int(ttl),
+            **claims,
+        }
+        return jwt.encode(payload, self.secret, algorithm=self.algorithm)
+
+
+def _timestamp(value):
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=datetime.timezone.utc)
+    return value.timestamp()
+
+
+class TokenUser:
+    """
+    ``current_user`` for bearer-token requests.
+
+    ``user_id``, ``role`` and ``is_active`` come straight from the verified
+    claims; any other attribute loads the full user through ``loader`` the
+    first time it is needed.
+    """
+
+    def __init__(self, claims, loader):
+        object.__setattr__(self, 'claims', claims)
+        object.__setattr__(self, 'user_id', int(claims['sub']))
+        object.__setattr__(self, 'role', claims['role'])
+        object.__setattr__(self, '_loader', loader)
+        object.__setattr__(self, '_user', None)
+
+    @property
+    def is_active(self):
+        return bool(self.claims.get('active'))
+
+    @property
+    def is_authenticated(self):
+        return True
+
+    @property
+    def is_anonymous(self):
+        return False
+
+    def get_id(self):
+        return str(self.user_id)
+
+    @property
+    def user(self):
+        if self._user is None:
+            object.__setattr__(self, '_user', self._loader(self.user_id))
+        return self._user
+
+    def __getattr__(self, name):
+        return getattr(self.user, name)
+
+    def __setattr__(self, name, value):
+        setattr(self.user, name, value)
@@ -0,0 +1,102 @@
+import os
+import time
+import threading
+
+
+def wait_for(condition, timeout=None, clock=time.monotonic):
+    """Polls ``condition`` until it returns true. Returns False if ``timeout`` seconds pass first."""
+    deadline = None if timeout is None else clock() + timeout
+    while not condition():
+        if deadline is not None and clock() >= deadline:
+            return False
+        time.sleep(0.01)
+    return True
+
+
+class ProcessLocal:
+    """
+    A value built on first use in each process.
+
+    Threads and pools do not survive fork, so every gunicorn worker needs
+    its own. ``get`` calls ``factory`` under ``lock`` the first time it runs
+    in a process; what the parent built is never used or cleaned up there.
+    """
+
+    def __init__(self, factory, lock):
+        self.factory = factory
+        self.lock = lock
+        self._value = None
+        self._pid = None
+
+    def current(self):
+        """The value built in this process, or None."""
+        return self._value if self._pid == os.getpid() else None
+
+    def get(self):
+        value = self.current()
+        if value is not None:
+            return value
+        with self.lock:
+            if self._pid != os.getpid() or self._value is None:
+                self._pid = os.getpid()
+                self._value = self.factory()
+            return self._value
+
+    def clear(self):
+        """Forgets the value, returning it if it was built in this process."""
+        with self.lock:
+            value = self.current()
+            self._value = None
+            return value
+
+
+class ProcessThread:
+    """
+    A daemon thread started on first use in each process.
+
+    ``ensure`` starts the thread the first time it is called in a process,
+    after running ``reset`` under ``lock`` to drop state inherited from the
+    parent. ``target`` should return soon after ``stopping`` is set.
+    """
+
+    def __init__(self, target, name, lock, reset=None):
+        self.target = target
+        self.name = name
+        self.reset = reset
+        self.stopping = threading.Event()
+        self._thread = ProcessLocal(self._start, lock)
+
+    @property
+    def started(self):
+        """True once the thread has been started in this process and not stopped since."""
+        return self._thread.current() is not None
+
+    def ensure(self):
+        self._thread.get()
+
+    def join(self, timeout=None):
+        """Waits up to ``timeout`` seconds for the thread to return."""
+        thread = self._thread.current()
+        if thread is not None:
+            thread.join(timeout)
+
+    def stop(self, timeout=None):
+        """
+        Sets ``stopping``, waits for the thread and forgets it, so the next
+        ``ensure`` starts a fresh one. Returns False if this process never
+        started the thread.
+        """
+        if not self.started:
+            return False
+        self.stopping.set()
+        self.join(timeout)
+        self._thread.clear()
+        return True
+
+    def _start(self):
+        if self.reset is not None:
+            self.reset()
+        self.stopping = threading.Event()
+        thread = threading.Thread(target=self.target, name=self.name, daemon=True)
+        thread.start()
+        return thread
@@ -0,0 +1,203 @@
+"""
+Request body validation for the JSON API.
+
+Schemas are built once at import time from precompiled validators, so
+validating a request is a dict walk with no per-request object graph.
+Errors come back as ``{field: [message, ...]}``, the shape clients already
+received from the WTForms forms they replace.
+"""
+import re
+
+from .models.user_model import APPLICATION_STATUSES
+
+EMAIL_RE = re.compile(r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$')
+
+TRUE_VALUES = frozenset({True, 1, 'true', 'True', 'y', 'yes', 'on', '1'})
+
+REQUIRED = "This field is required."
+
+
+def sanitize_input(text):
+    """Sanitize input to prevent XSS attacks"""
+    if text:
+        # Remove potentially dangerous characters and trim
+        sanitized = text.strip().replace('<', '&lt;').replace('>', '&gt;')
+        return sanitized
+    return text
+
+
+def is_valid_email(email):
+    """Validate email format"""
+    return EMAIL_RE.match(email) is not None
+
+
+def request_data(req):
+    """The request body as a dict: JSON when sent as JSON, otherwise form fields."""
+    if req.is_json:
+        return req.get_json(silent=True)
+    return req.form.to_dict()
+
+
+# --- Validators: each returns an error message or None ---
+
+def length(min=None, max=None):
+    if min is not None and max is not None:
+        message = f"Field must be between {min} and {max} characters long."
+    elif min is not None:
+        message = f"Field must be at least {min} characters long."
+    else:
+        message = f"Field cannot be longer than {max} characters."
+
+    def check(value):
+        if (min is not None and len(value) < min) or (max is not None and len(value) > max):
+            return message
+    return check
+
+
+def one_of(*choices):
+    message = f"Must be one of: {', '.join(choices)}."
+
+    def check(value):
+        if value not in choices:
+            return message
+    return check
+
+
+def email(value):
+    if not is_valid_email(value):
+        return "Invalid email address."
+
+
+def password_strength(value):
+    """Password policy in one pass over the characters."""
+    if len(value) < 8:
+        return 'Password must be at least 8 characters long.'
+    upper = lower = digit = False
+    for char in value:
+        if 'A' <= char <= 'Z':
+            upper = True
+        elif 'a' <= char <= 'z':
+            lower = True
+        elif char.isdecimal():
+            # Any Unicode decimal digit, as the r'\d' check this replaced allowed
+            digit = True
+        else:
+            continue
+        if upper and lower and digit:
+            return None
+    if not upper:
+        return 'Password must contain at least one uppercase letter.'
+    if not lower:
+        return 'Password must contain at least one lowercase letter.'
+    return 'Password must contain at least one number.'
+
+
+class Field:
+    """
+    One body field.
+
+    ``kind`` is 'text' (stripped and sanitized), 'password' (kept verbatim)
+    or 'bool'. Required fields must be present and non-empty; a required
+    'bool' must be true.
+    """
+
+    def __init__(self, *validators, kind='text', required=True):
+        self.validators = validators
+        self.kind = kind
+        self.required = required
+
+
+class Schema:
+    """Validates a body against a fixed set of fields; unknown keys are ignored."""
+
+    def __init__(self, partial=False, equal=(), **fields):
+        self.fields = tuple(fields.items())
+        self.partial = partial
+        self.equal = equal
+
+    def validate(self, data):
+        """
+        Returns ``(values, errors)``.
+
+        ``values`` holds the cleaned fields; in a partial schema only the
+        fields present in ``data`` are returned and none are required.
+        """
+        if not isinstance(data, dict):
+            return {}, {"body": ["Expected a JSON object."]}
+
+        values, errors = {}, {}
+        for name, field in self.fields:
+            if name not in data and self.partial:
+                continue
+            value = data.get(name)
+
+            if field.kind == 'bool':
+                value = isinstance(value, (bool, int, str)) and value in TRUE_VALUES
+                if field.required and not value:
+                    errors[name] = [REQUIRED]
+                values[name] = value
+                continue
+
+            if value is not None and not isinstance(value, str):
+                errors[name] = ["Must be a string."]
+                continue
+            if field.kind == 'text':
+                value = sanitize_input(value)
+            if not value:
+                if field.required or self.partial:
+                    errors[name] = [REQUIRED]
+                else:
+                    values[name] = None
+                continue
+
+            for validator in field.validators:
+                message = validator(value)
+                if message is not None:
+                    errors[name] = [message]
+                    break
+            else:
+                values[name] = value
+
+        for name, other in self.equal:
+            if name not in errors and other in values and values.get(name) != values[other]:
+                errors[name] = [f"Field must be equal to {other}."]
+        return values, errors
+
+
+REGISTER_SCHEMA = Schema(
+    email=Field(email),
+    username=Field(length(min=3, max=50)),
+    name=Field(length(max=100)),
+    surname=Field(length(max=100)),
+    password=Field(password_strength, kind='password'),
+    confirm_password=Field(kind='password'),
+    consent=Field(kind='bool'),
+    equal=(('confirm_password', 'password'),),
+)
+
+LOGIN_SCHEMA = Schema(
+    email=Field(email),
+    password=Field(kind='password'),
+    remember=Field(kind='bool', required=False),
+)
+
+PROFILE_SCHEMA = Schema(
+    partial=True,
+    name=Field(length(max=100)),
+    surname=Field(length(max=100)),
+    username=Field(length(min=3, max=50)),
+)
+
+STATUS_TRANSITION_SCHEMA = Schema(
+    status=Field(one_of(*APPLICATION_STATUSES)),
+    from_status=Field(one_of(*APPLICATION_STATUSES), required=False),
+    course=Field(length(max=100), required=False),
+    faculty=Field(length(max=100), required=False),
+)
+
+PASSWORD_SETUP_SCHEMA = Schema(
+    token=Field(kind='password'),
+    password=Field(password_strength, kind='password'),
+    confirm_password=Field(kind='password'),
+    equal=(('confirm_password', 'password'),),
+)
@@ -0,0 +1,99 @@
+"""
+Micro-benchmark of JSON responses: the stdlib encoder against orjson, through
+``JSONProvider.response`` as a view would return them, on payloads shaped like
+the profile, directory and batch lookup responses.
+
+Run from ``services/user``:
+
+    python -m benchmarks.bench_json --output json.json
+    python -m benchmarks.bench_json --baseline json.json
+
+The orjson cases are skipped when orjson is not installed.
+"""
+import sys
+import argparse
+import datetime
+
+from flask import Flask
+
+from app.utils import json_provider
+from app.utils.json_provider import JSONProvider
+
+from .harness import run_closed_loop, environment, add_result_arguments, report
+
+BASE_TIME = datetime.datetime(2026, 3, 1, 9, 30, 0, 123456)
+
+
+def user_record(n):
+    """One user as the directory lists it, with naive datetimes straight from the database."""
+    return {
+        "user_id": n,
+        "email": f"student{n}@numeraid.org",
+        "username": f"student{n}",
+        "name": "Thandiwe",
+        "surname": f"Nkosi-{n}",
+        "role": 'student',
+        "is_active": n % 17 != 0,
+        "created_at": BASE_TIME - datetime.timedelta(days=n % 900, seconds=n),
+        "last_login": None if n % 5 == 0 else BASE_TIME + datetime.timedelta(minutes=n),
+        "profile_picture_url": None if n % 3 else f"https://cdn.numeraid.org/avatars/{n}.png",
+    }
+
+
+def payloads():
+    profile = {
+        **user_record(1),
+        "consent_given": True,
+        "social_provider": None,
+        "student": {
+            "faculty": 'Science', "course": 'Applied Mathematics', "year_of_study": 2,
+            "application_status": 'Approved', "has_completed_onboarding": True,
+        },
+    }
+    return {
+        'profile': profile,
+        'directory_page': {
+            "users": [user_record(n) for n in range(50)],
+            "next_cursor": 'WyIyMDI2LTAxLTEwVDA5OjMwOjAwIiwgNDld',
+        },
+        'lookup_batch': {"users": [user_record(n) for n in range(1000)], "missing": [1001, 1002]},
+    }
+
+
+def run_benchmarks(backends, iterations, warmup):
+    results = {}
+    for name, payload in payloads().items():
+        for backend in backends:
+            app = Flask(__name__)
+            app.config['JSON_BACKEND'] = backend
+            app.json = JSONProvider(app)
+
+            def operation(session, n, app=app, payload=payload):
+                with app.app_context():
+                    return app.json.response(payload).status_code == 200
+
+            # Fewer iterations for the large batch, so every case takes similar time
+            count = max(iterations // 20, 10) if name == 'lookup_batch' else iterations
+            results[f'{name}.{backend}'] = run_closed_loop(operation, [None], count, warmup)
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('-n', '--iterations', type=int, default=5000, help='Measured calls per benchmark')
+    parser.add_argument('--warmup', type=int, default=50, help='Unmeasured calls per benchmark')
+    add_result_arguments(parser)
+    args = parser.parse_args(argv)
+
+    backends = ['stdlib']
+    if json_provider.orjson is not None:
+        backends.append('orjson')
+    else:
+        print("orjson is not installed; skipping the orjson cases", file=sys.stderr)
+    results = run_benchmarks(backends, args.iterations, args.warmup)
+
+    return report(args, results, {**environment(), "iterations": args.iterations})
+
+
+if __name__ == '__main__':
+    sys.exit(main())
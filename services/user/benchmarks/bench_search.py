@@ -0,0 +1,84 @@
+"""
+Typeahead search over a large user table: the SQLite FTS5 index the search
+endpoint uses, against the unindexed LIKE scan it would otherwise need.
+
+Run from ``services/user``:
+
+    python -m benchmarks.bench_search --users 300000 --output search.json
+    python -m benchmarks.bench_search --baseline search.json
+
+Users are written straight into a temporary SQLite file and indexed with
+``UserSearchIndex.rebuild``; each call runs ``search_query`` for the next of
+a rotating list of typeahead prefixes.
+"""
+import os
+import sys
+import time
+import argparse
+import tempfile
+
+from sqlalchemy import create_engine, insert
+
+from app.extensions import db, user_search
+from app.models.user_model import User
+from app.controllers.search_controller import search_query
+from app.utils.search import search_terms
+
+from .harness import run_closed_loop, environment, add_result_arguments, report
+
+NAMES = ('Thandiwe', 'Sipho', 'Ayanda', 'Lerato', 'Kagiso', 'Naledi', 'Bongani', 'Zanele', 'Mpho', 'Karabo')
+SURNAMES = ('Nkosi', 'Dlamini', 'Mokoena', 'Naidoo', 'Botha', 'Khumalo', 'Pillay', 'Van Wyk', 'Mahlangu', 'Sithole')
+QUERIES = ('th', 'nko', 'sipho dl', 'lerato.naid', 'zan kh', 'student1234', 'mpho mahl', 'karabo sith')
+
+
+def seed(engine, count, batch=10000):
+    db.metadata.create_all(engine, tables=[User.__table__])
+    with engine.begin() as connection:
+        for start in range(0, count, batch):
+            connection.execute(insert(User), [{
+                "email": f"{NAMES[i % 10].lower()}.{SURNAMES[i // 10 % 10].lower().replace(' ', '')}{i}@numeraid.org",
+                "username": f"student{i}",
+                "name": NAMES[i % 10],
+                "surname": f"{SURNAMES[i // 10 % 10]}{i % 997}",
+                "role": 'student' if i % 20 else 'staff',
+            } for i in range(start, min(start + batch, count))])
+        started = time.perf_counter()
+        user_search.rebuild(connection)
+        return time.perf_counter() - started
+
+
+def run_benchmarks(engine, backends, iterations, warmup):
+    results = {}
+    for backend in backends:
+        with engine.connect() as connection:
+            def operation(session, n, connection=connection, backend=backend):
+                stmt = search_query(backend, search_terms(QUERIES[n % len(QUERIES)]), limit=10)
+                return len(connection.execute(stmt).all()) <= 10
+
+            results[f'typeahead.{backend or "scan"}'] = run_closed_loop(operation, [None], iterations, warmup)
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--users', type=int, default=300000, help='Users to seed (default 300000)')
+    parser.add_argument('-n', '--iterations', type=int, default=2000, help='Measured searches per index')
+    parser.add_argument('--scan-iterations', type=int, default=40, help='Measured searches for the LIKE scan')
+    parser.add_argument('--warmup', type=int, default=5, help='Unmeasured searches per index')
+    add_result_arguments(parser)
+    args = parser.parse_args(argv)
+
+    workdir = tempfile.mkdtemp(prefix='user-bench-')
+    engine = create_engine(f"sqlite:///{os.path.join(workdir, 'search.db')}")
+    build_seconds = seed(engine, args.users)
+    print(f"Indexed {args.users} users in {build_seconds:.2f}s", file=sys.stderr)
+
+    results = run_benchmarks(engine, ['fts5'], args.iterations, args.warmup)
+    results.update(run_benchmarks(engine, [None], args.scan_iterations, 1))
+    engine.dispose()
+
+    return report(args, results, {**environment(), "users": args.users, "iterations": args.iterations})
+
+
+if __name__ == '__main__':
+    sys.exit(main())
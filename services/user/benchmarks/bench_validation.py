@@ -0,0 +1,139 @@
+"""
+Micro-benchmark of request body validation: the WTForms forms the auth
+controller used to build on every call against the precompiled schemas in
+``app/validation.py``.
+
+Each call validates one body inside a pushed request context, which is what
+a view pays for; request parsing is included for both. Run from
+``services/user``:
+
+    python -m benchmarks.bench_validation --output validation.json
+    python -m benchmarks.bench_validation --baseline validation.json
+
+The WTForms cases need ``email_validator`` (the ``Email()`` validator imports
+it), a benchmark-only dependency listed in ``benchmarks/README.md``; they are
+skipped when it is not installed.
+"""
+import re
+import sys
+import argparse
+
+from flask import Flask, request
+
+from app.validation import REGISTER_SCHEMA, LOGIN_SCHEMA, request_data, sanitize_input
+
+from .harness import run_closed_loop, environment, add_result_arguments, report
+
+BODIES = {
+    'register_valid': {
+        'email': 'bench@numeraid.org', 'username': 'bench', 'name': 'Bench', 'surname': 'User',
+        'password': 'Benchmark1Password', 'confirm_password': 'Benchmark1Password', 'consent': 'y',
+    },
+    'register_invalid': {
+        'email': 'not-an-email', 'username': 'ab', 'name': 'Bench', 'surname': '',
+        'password': 'weakpassword', 'confirm_password': 'other', 'consent': '',
+    },
+    'login': {'email': 'bench@numeraid.org', 'password': 'Benchmark1Password', 'remember': 'y'},
+}
+
+
+def legacy_forms():
+    """The forms as they were before the schema layer, or None without email_validator."""
+    try:
+        import email_validator  # noqa: F401
+    except ImportError:
+        return None
+
+    from flask_wtf import FlaskForm
+    from wtforms import StringField, PasswordField, SubmitField, BooleanField
+    from wtforms.validators import DataRequired, Email, Length, EqualTo, ValidationError
+
+    def validate_password_strength(form, field):
+        password = field.data
+        if len(password) < 8:
+            raise ValidationError('Password must be at least 8 characters long.')
+        if not re.search(r'[A-Z]', password):
+            raise ValidationError('Password must contain at least one uppercase letter.')
+        if not re.search(r'[a-z]', password):
+            raise ValidationError('Password must contain at least one lowercase letter.')
+        if not re.search(r'\d', password):
+            raise ValidationError('Password must contain at least one number.')
+
+    class RegisterForm(FlaskForm):
+        email = StringField("Email", validators=[DataRequired(), Email()])
+        username = StringField("Username", validators=[DataRequired(), Length(min=3, max=50)])
+        name = StringField("First Name", validators=[DataRequired(), Length(max=100)])
+        surname = StringField("Surname", validators=[DataRequired(), Length(max=100)])
+        password = PasswordField("Password", validators=[DataRequired(), validate_password_strength])
+        confirm_password = PasswordField("Confirm Password", validators=[DataRequired(), EqualTo("password")])
+        consent = BooleanField("I consent to data processing", validators=[DataRequired()])
+        submit = SubmitField("Register")
+
+        def validate_email(self, field):
+            email = sanitize_input(field.data).lower()
+            pattern = r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$'
+            if not re.match(pattern, email):
+                raise ValidationError('Invalid email format.')
+
+    class LoginForm(FlaskForm):
+        email = StringField("Email", validators=[DataRequired(), Email()])
+        password = PasswordField("Password", validators=[DataRequired()])
+        remember = BooleanField("Remember Me")
+        submit = SubmitField("Login")
+
+    return {'register': RegisterForm, 'login': LoginForm}
+
+
+def validators(forms):
+    """``{implementation: {form name: callable returning True when valid}}``."""
+    implementations = {
+        'schema': {
+            'register': lambda: not REGISTER_SCHEMA.validate(request_data(request))[1],
+            'login': lambda: not LOGIN_SCHEMA.validate(request_data(request))[1],
+        },
+    }
+    if forms is not None:
+        implementations['wtforms'] = {
+            name: (lambda form_class: lambda: form_class().validate_on_submit())(form_class)
+            for name, form_class in forms.items()
+        }
+    return implementations
+
+
+def run_benchmarks(app, implementations, iterations, warmup):
+    results = {}
+    for case, body in BODIES.items():
+        form_name = case.split('_')[0]
+        expected = not case.endswith('_invalid')
+        for implementation, checks in implementations.items():
+            check = checks[form_name]
+
+            def operation(session, n, check=check, body=body, expected=expected):
+                with app.test_request_context('/', method='POST', data=body):
+                    return check() is expected
+
+            results[f'{case}.{implementation}'] = run_closed_loop(operation, [None], iterations, warmup)
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('-n', '--iterations', type=int, default=20000, help='Measured calls per benchmark')
+    parser.add_argument('--warmup', type=int, default=200, help='Unmeasured calls per benchmark')
+    add_result_arguments(parser)
+    args = parser.parse_args(argv)
+
+    app = Flask(__name__)
+    app.config.update(SECRET_KEY='benchmark', WTF_CSRF_ENABLED=False)
+
+    forms = legacy_forms()
+    if forms is None:
+        print("email_validator is not installed; skipping the WTForms cases "
+              "(pip install email-validator, see benchmarks/README.md)", file=sys.stderr)
+    results = run_benchmarks(app, validators(forms), args.iterations, args.warmup)
+
+    return report(args, results, {**environment(), "iterations": args.iterations})
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,235 @@
+"""
+Shared machinery for the in-process benchmarks: closed-loop runners, HTTP
+drivers for the Flask test client and a real WSGI server, JSON results and
+baseline comparison.
+"""
+import os
+import sys
+import json
+import time
+import logging
+import platform
+import threading
+import http.client
+import itertools
+from http.cookies import SimpleCookie
+
+from werkzeug.serving import make_server
+
+from .load_test import summarize
+
+
+class TestClientDriver:
+    """Calls the app in-process through Flask's test client; no sockets involved."""
+
+    name = 'client'
+
+    def __init__(self, app):
+        self.app = app
+
+    def session(self):
+        return TestClientSession(self.app.test_client())
+
+    def close(self):
+        pass
+
+
+class TestClientSession:
+    def __init__(self, client):
+        self.client = client
+
+    def request(self, method, path, json=None, headers=None):
+        response = self.client.open(path, method=method, json=json, headers=headers)
+        response.close()
+        return response.status_code
+
+
+class WSGIServerDriver:
+    """Serves the app from a threaded werkzeug server and calls it over keep-alive HTTP."""
+
+    name = 'wsgi'
+
+    def __init__(self, app):
+        # Per-request access log lines would dominate the measurement
+        logging.getLogger('werkzeug').setLevel(logging.WARNING)
+        self.server = make_server('127.0.0.1', 0, app, threaded=True)
+        self._thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self._thread.start()
+
+    def session(self):
+        return HTTPSession('127.0.0.1', self.server.server_port)
+
+    def close(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+class HTTPSession:
+    """One keep-alive connection with a minimal cookie jar."""
+
+    def __init__(self, host, port):
+        self.host = host
+        self.port = port
+        self.cookies = {}
+        self.conn = http.client.HTTPConnection(host, port, timeout=30)
+
+    def request(self, method, path, json=None, headers=None):
+        headers = dict(headers or {})
+        body = None
+        if json is not None:
+            body = _json_dumps(json)
+            headers['Content-Type'] = 'application/json'
+        if self.cookies:
+            headers['Cookie'] = '; '.join(f'{name}={value}' for name, value in self.cookies.items())
+        try:
+            self.conn.request(method, path, body=body, headers=headers)
+            response = self.conn.getresponse()
+            response.read()
+        except (OSError, http.client.HTTPException):
+            self.conn.close()
+            self.conn = http.client.HTTPConnection(self.host, self.port, timeout=30)
+            raise
+        for header in response.headers.get_all('Set-Cookie') or ():
+            for name, morsel in SimpleCookie(header).items():
+                self.cookies[name] = morsel.value
+        return response.status
+
+
+def _json_dumps(payload):
+    return json.dumps(payload).encode()
+
+
+DRIVERS = {'client': TestClientDriver, 'wsgi': WSGIServerDriver}
+
+
+def run_closed_loop(operation, sessions, iterations, warmup=0):
+    """
+    Runs ``operation(session, n)`` back to back from one thread per session.
+
+    ``n`` is unique across threads, so operations can derive unique data
+    from it. ``operation`` returns True on success. ``iterations`` is the
+    total across all threads; ``warmup`` calls per thread are not measured.
+    Returns the load_test summary.
+    """
+    counter = itertools.count()
+    remaining = itertools.count()
+    latencies = []
+    errors = [0]
+    lock = threading.Lock()
+    start = threading.Barrier(len(sessions) + 1)
+
+    def worker(session):
+        for _ in range(warmup):
+            operation(session, next(counter))
+        local_latencies, local_errors = [], 0
+        start.wait()
+        while next(remaining) < iterations:
+            n = next(counter)
+            started = time.perf_counter()
+            try:
+                ok = operation(session, n)
+            except Exception:
+                ok = False
+            if ok:
+                local_latencies.append(time.perf_counter() - started)
+            else:
+                local_errors += 1
+        with lock:
+            latencies.extend(local_latencies)
+            errors[0] += local_errors
+
+    threads = [threading.Thread(target=worker, args=(session,)) for session in sessions]
+    for thread in threads:
+        thread.start()
+    start.wait()
+    started = time.perf_counter()
+    for thread in threads:
+        thread.join()
+    return summarize(latencies, errors[0], time.perf_counter() - started)
+
+
+def environment():
+    """Describes where the numbers came from, so runs are only compared like for like."""
+    return {
+        "python": platform.python_version(),
+        "implementation": platform.python_implementation(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "argv": sys.argv[1:],
+        "timestamp": time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime()),
+    }
+
+
+def add_result_arguments(parser):
+    """Adds the ``--output``, ``--baseline`` and ``--threshold`` options that ``report`` reads."""
+    parser.add_argument('-o', '--output', help='Write results as JSON')
+    parser.add_argument('--baseline', help='Compare against a previous --output file')
+    parser.add_argument('--threshold', type=float, default=0.15,
+                        help='Allowed fractional drop in ops/sec or rise in p95 (default 0.15)')
+
+
+def report(args, results, meta):
+    """
+    Writes ``results`` to ``--output``, prints them, and compares them with
+    ``--baseline``. Returns the exit status: 1 if anything regressed.
+    """
+    if args.output:
+        write_results(args.output, results, meta)
+
+    print(json.dumps(results, indent=2, sort_keys=True))
+
+    if args.baseline:
+        rows, regressions = compare(results, load_results(args.baseline), args.threshold)
+        print(format_comparison(rows), file=sys.stderr)
+        if regressions:
+            print(f"Regressed beyond {args.threshold:.0%}: {', '.join(regressions)}", file=sys.stderr)
+            return 1
+    return 0
+
+
+def write_results(path, results, meta):
+    with open(path, 'w') as fh:
+        json.dump({"meta": meta, "results": results}, fh, indent=2, sort_keys=True)
+        fh.write('\n')
+
+
+def load_results(path):
+    with open(path) as fh:
+        return json.load(fh)["results"]
+
+
+def compare(results, baseline, threshold):
+    """
+    Compares ``results`` with ``baseline`` benchmark by benchmark.
+
+    A benchmark regresses when its ops/sec falls, or its p95 rises, by more
+    than ``threshold`` (a fraction, e.g. 0.15). Returns (rows, regressions)
+    where rows describe every benchmark present in both runs.
+    """
+    rows, regressions = [], []
+    for name in sorted(results.keys() & baseline.keys()):
+        current, previous = results[name], baseline[name]
+        ops_change = _change(current['ops_per_s'], previous['ops_per_s'])
+        p95_change = _change(current['p95_ms'], previous['p95_ms'])
+        regressed = ops_change < -threshold or p95_change > threshold or current['errors'] > previous['errors']
+        rows.append((name, previous['ops_per_s'], current['ops_per_s'], ops_change,
+                     previous['p95_ms'], current['p95_ms'], p95_change, regressed))
+        if regressed:
+            regressions.append(name)
+    return rows, regressions
+
+
+def _change(current, previous):
+    if not previous:
+        return 0.0
+    return (current - previous) / previous
+
+
+def format_comparison(rows):
+    lines = [f"{'benchmark':<28} {'ops/s':>18} {'change':>8} {'p95 ms':>18} {'change':>8}"]
+    for name, old_ops, new_ops, ops_change, old_p95, new_p95, p95_change, regressed in rows:
+        lines.append(
+            f"{name:<28} {old_ops:>8.1f}->{new_ops:<8.1f} {ops_change:>+8.1%} "
+            f"{old_p95:>8.2f}->{new_p95:<8.2f} {p95_change:>+8.1%}{'  REGRESSION' if regressed else ''}"
+        )
+    return '\n'.join(lines)
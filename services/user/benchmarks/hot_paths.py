@@ -0,0 +1,181 @@
+"""
+Benchmarks for the user service's hot paths: login, registration, profile
+reads under concurrency and the Google OAuth callback (against a local stub).
+
+Every scenario drives the real app built by ``create_app`` through the Flask
+test client, a threaded WSGI server, or both. Run from ``services/user``:
+
+    python -m benchmarks.hot_paths --output results.json
+    python -m benchmarks.hot_paths --baseline results.json --threshold 0.15
+
+With ``--baseline`` the process exits with status 1 when any benchmark
+regressed by more than the threshold.
+"""
+import os
+import sys
+import json
+import argparse
+import tempfile
+
+from config import Config
+from app import create_app
+from app.extensions import db, password_hasher, user_cache, last_login_buffer, avatars
+from app.models.user_model import User
+from tests.google_stub import GoogleStub
+
+from .harness import DRIVERS, run_closed_loop, environment, add_result_arguments, report
+
+PASSWORD = 'Benchmark1Password'
+SCENARIOS = ('login', 'register', 'profile', 'oauth_callback')
+
+
+def benchmark_config(database_uri, google_url, hash_method, workdir):
+    """Production settings with the knobs that would distort a benchmark switched off."""
+    return type('BenchmarkConfig', (Config,), {
+        'SECRET_KEY': 'benchmark',
+        'SQLALCHEMY_DATABASE_URI': database_uri,
+        'SQLALCHEMY_ENGINE_OPTIONS': {},
+        'WTF_CSRF_ENABLED': False,
+        'RATELIMIT_ENABLED': False,
+        'PASSWORD_HASH_METHOD': hash_method,
+        'PASSWORD_HASH_WORKERS': 0,
+        'GOOGLE_CLIENT_ID': 'stub-client-id',
+        'GOOGLE_CLIENT_SECRET': 'stub-secret',
+        'GOOGLE_REDIRECT_URI': 'http://127.0.0.1/oauth/callback',
+        'GOOGLE_TOKEN_URI': f'{google_url}/token',
+        'GOOGLE_JWKS_URI': f'{google_url}/certs',
+        'AVATAR_DIR': os.path.join(workdir, 'avatars'),
+    })
+
+
+def seed_users(count):
+    """Creates ``count`` active students sharing one password hash."""
+    password_hash = password_hasher.hash(PASSWORD)
+    db.session.execute(User.__table__.insert(), [
+        {
+            "email": f"bench{i}@bench.numeraid.org",
+            "username": f"bench{i}",
+            "name": "Bench",
+            "surname": f"User{i}",
+            "role": 'student',
+            "password_hash": password_hash,
+            "is_active": True,
+            "consent_given": True,
+        }
+        for i in range(count)
+    ])
+    db.session.commit()
+
+
+def login(session, n, users):
+    email = f"bench{n % users}@bench.numeraid.org"
+    return session.request('POST', '/api/auth/login', json={"email": email, "password": PASSWORD}) == 200
+
+
+def register(session, n, prefix):
+    return session.request('POST', '/api/auth/register', json={
+        "email": f"{prefix}{n}@bench.numeraid.org",
+        "username": f"{prefix}{n}",
+        "name": "New",
+        "surname": "Student",
+        "password": PASSWORD,
+        "confirm_password": PASSWORD,
+        "consent": True,
+    }) == 201
+
+
+def read_profile(session, n):
+    return session.request('GET', '/api/profile/me') == 200
+
+
+def oauth_callback(session, n):
+    return session.request('GET', f'/api/oauth/google/callback?code=bench-{n}') == 302
+
+
+def logged_in_sessions(driver, count, users):
+    sessions = []
+    for i in range(count):
+        session = driver.session()
+        assert login(session, i, users), "login failed while preparing profile sessions"
+        sessions.append(session)
+    return sessions
+
+
+def run_scenarios(app, args):
+    results = {}
+    for driver_name in args.drivers:
+        driver = DRIVERS[driver_name](app)
+        try:
+            for scenario in args.scenarios:
+                concurrency = args.concurrency if scenario == 'profile' else args.write_concurrency
+                if scenario == 'login':
+                    operation = lambda session, n: login(session, n, args.users)
+                    sessions = [driver.session() for _ in range(concurrency)]
+                elif scenario == 'register':
+                    prefix = f"new-{driver_name}-"
+                    operation = lambda session, n: register(session, n, prefix)
+                    sessions = [driver.session() for _ in range(concurrency)]
+                elif scenario == 'profile':
+                    operation = read_profile
+                    sessions = logged_in_sessions(driver, concurrency, args.users)
+                else:
+                    operation = oauth_callback
+                    sessions = [driver.session() for _ in range(concurrency)]
+
+                with app.app_context():
+                    user_cache.clear()
+                summary = run_closed_loop(operation, sessions, args.iterations, warmup=args.warmup)
+                summary['concurrency'] = concurrency
+                results[f"{driver_name}/{scenario}"] = summary
+                print(f"{driver_name}/{scenario}: {json.dumps(summary)}", file=sys.stderr)
+        finally:
+            driver.close()
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--driver', dest='drivers', action='append', choices=sorted(('client', 'wsgi')),
+                        help='Repeatable; default runs both')
+    parser.add_argument('--scenario', dest='scenarios', action='append', choices=SCENARIOS,
+                        help='Repeatable; default runs all')
+    parser.add_argument('-n', '--iterations', type=int, default=200, help='Measured calls per benchmark')
+    parser.add_argument('--warmup', type=int, default=5, help='Unmeasured calls per thread')
+    parser.add_argument('-c', '--concurrency', type=int, default=8, help='Threads for profile reads')
+    parser.add_argument('--write-concurrency', type=int, default=1,
+                        help='Threads for login, register and OAuth (SQLite serializes writes)')
+    parser.add_argument('--users', type=int, default=100, help='Seeded users')
+    parser.add_argument('--database-url', help='Defaults to a fresh SQLite file')
+    parser.add_argument('--hash-method', default=Config.PASSWORD_HASH_METHOD,
+                        help='Password hash policy; defaults to the production setting')
+    add_result_arguments(parser)
+    args = parser.parse_args(argv)
+    args.drivers = args.drivers or ['client', 'wsgi']
+    args.scenarios = args.scenarios or list(SCENARIOS)
+
+    workdir = tempfile.mkdtemp(prefix='user-bench-')
+    database_uri = args.database_url or f"sqlite:///{os.path.join(workdir, 'bench.db')}"
+
+    with GoogleStub() as google:
+        app = create_app(benchmark_config(database_uri, google.url, args.hash_method, workdir))
+        with app.app_context():
+            db.drop_all()
+            db.create_all()
+            seed_users(args.users)
+
+        results = run_scenarios(app, args)
+        # Write buffered logins and finish picture fetches now; afterwards the tables are gone
+        last_login_buffer.shutdown()
+        avatars.shutdown()
+
+        with app.app_context():
+            db.drop_all()
+            db.engine.dispose()
+
+    meta = {**environment(), "database": database_uri.split(':', 1)[0],
+            "hash_method": args.hash_method, "iterations": args.iterations}
+    return report(args, results, meta)
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,120 @@
+"""
+Cold start profile: how long a fresh process takes to import the app, build it
+with ``create_app``, warm the database pool and answer its first request, and
+which packages the import time goes to.
+
+Every run starts a new interpreter under ``python -X importtime``, so nothing
+is cached in ``sys.modules``. Run from ``services/user``:
+
+    python -m benchmarks.startup --runs 10 --output startup.json
+    python -m benchmarks.startup --runs 10 --baseline startup.json
+
+With ``--baseline`` the process exits with status 1 when any phase regressed
+by more than the threshold.
+"""
+import os
+import sys
+import json
+import time
+import argparse
+import tempfile
+import subprocess
+from collections import defaultdict
+
+from .harness import environment, add_result_arguments, report
+from .load_test import summarize
+
+SERVICE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Runs in the child process; prints one JSON line of phase timings
+CHILD = r"""
+import sys, json, time
+started = time.perf_counter()
+from app import create_app
+imported = time.perf_counter()
+app = create_app()
+created = time.perf_counter()
+from app.extensions import readiness
+readiness.warm()
+warmed = time.perf_counter()
+response = app.test_client().get('/api/internal/ready')
+answered = time.perf_counter()
+print(json.dumps({
+    "status": response.status_code,
+    "import": imported - started,
+    "create_app": created - imported,
+    "warm": warmed - created,
+    "first_response": answered - warmed,
+    "modules": sorted(m for m in sys.modules if m.split('.')[0] in ('app', 'requests', 'jwt', 'flask_mail')),
+}))
+"""
+
+PHASES = ('import', 'create_app', 'warm', 'first_response')
+
+
+def child_env(database_url):
+    env = dict(os.environ)
+    env.setdefault('SECRET_KEY', 'startup-benchmark')
+    env['USER_DATABASE_URL'] = database_url
+    return env
+
+
+def run_once(env):
+    """Starts one interpreter. Returns (wall seconds, child timings, import self-times by package)."""
+    started = time.perf_counter()
+    completed = subprocess.run([sys.executable, '-X', 'importtime', '-c', CHILD], cwd=SERVICE_DIR,
+                               env=env, capture_output=True, text=True, check=True)
+    wall = time.perf_counter() - started
+    return wall, json.loads(completed.stdout.strip().splitlines()[-1]), parse_importtime(completed.stderr)
+
+
+def parse_importtime(stderr):
+    """Sums ``-X importtime`` self times (microseconds) by top-level package."""
+    totals = defaultdict(int)
+    for line in stderr.splitlines():
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        self_us, _, name = line[len('import time:'):].split('|')
+        totals[name.strip().split('.')[0]] += int(self_us)
+    return totals
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('-n', '--runs', type=int, default=5, help='Fresh processes to start')
+    parser.add_argument('--top', type=int, default=15, help='Packages to list in the import profile')
+    parser.add_argument('--database-url', help='Defaults to a fresh SQLite file')
+    add_result_arguments(parser)
+    args = parser.parse_args(argv)
+
+    database_url = args.database_url or f"sqlite:///{os.path.join(tempfile.mkdtemp(prefix='user-startup-'), 'startup.db')}"
+    env = child_env(database_url)
+
+    samples = defaultdict(list)
+    packages = defaultdict(int)
+    errors = 0
+    started = time.perf_counter()
+    for _ in range(args.runs):
+        wall, timings, imports = run_once(env)
+        errors += timings['status'] != 200
+        samples['process_to_first_response'].append(wall)
+        for phase in PHASES:
+            samples[phase].append(timings[phase])
+        for package, self_us in imports.items():
+            packages[package] += self_us
+    elapsed = time.perf_counter() - started
+
+    results = {name: summarize(values, errors, elapsed) for name, values in samples.items()}
+    profile = sorted(((us / args.runs / 1000, package) for package, us in packages.items()), reverse=True)
+
+    meta = {**environment(), "database": database_url.split(':', 1)[0], "runs": args.runs,
+            "deferred_modules_loaded": timings['modules']}
+    status = report(args, results, meta)
+    print(f"\nImport time by package (mean self time over {args.runs} runs):")
+    for ms, package in profile[:args.top]:
+        print(f"  {package:<24} {ms:8.1f} ms")
+    return status
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -1,11 +1,43 @@
 import os
 
 
+def _engine_options(database_uri):
+    """Builds SQLALCHEMY_ENGINE_OPTIONS for server databases from the environment."""
+    if not database_uri or database_uri.startswith('sqlite'):
+        return {}
+
+    options = {
+        'pool_size': int(os.getenv('DB_POOL_SIZE', '5')),
+        'max_overflow': int(os.getenv('DB_MAX_OVERFLOW', '10')),
+        'pool_timeout': float(os.getenv('DB_POOL_TIMEOUT', '10')),  # seconds to wait for a connection
+        'pool_recycle': int(os.getenv('DB_POOL_RECYCLE', '1800')),  # seconds, -1 disables
+        'pool_pre_ping': os.getenv('DB_POOL_PRE_PING', 'True').lower() == 'true',
+    }
+
+    statement_timeout = int(os.getenv('DB_STATEMENT_TIMEOUT_MS', '0'))
+    if statement_timeout and database_uri.startswith('postgresql'):
+        options['connect_args'] = {'options': f'-c statement_timeout={statement_timeout}'}
+
+    return options
+
+
+def _rate_limit_storage_options(storage_uri):
+    """
+    Builds RATELIMIT_STORAGE_OPTIONS for the configured storage. Other
+    storages pass their options on to their client, so only bounded-memory
+    gets ``max_keys``.
+    """
+    if storage_uri.startswith('bounded-memory://'):
+        return {'max_keys': int(os.getenv('RATELIMIT_MAX_KEYS', '10000'))}
+    return {}
+
+
 class Config:
     SECRET_KEY = os.getenv('SECRET_KEY')
 
     SQLALCHEMY_DATABASE_URI = os.getenv('USER_DATABASE_URL')
     SQLALCHEMY_TRACK_MODIFICATIONS = False
+    SQLALCHEMY_ENGINE_OPTIONS = _engine_options(SQLALCHEMY_DATABASE_URI)
 
     # Security settings
     SESSION_COOKIE_HTTPONLY = True
@@ -22,10 +54,115 @@ class Config:
     WTF_CSRF_ENABLED = True
     WTF_CSRF_TIME_LIMIT = 3600  # 1 hour
 
+    # Rate limiting. 'bounded-memory://' counts per worker; 'redis://host:6379/0'
+    # (or 'rediss://' for TLS) shares counters across workers through Redis
+    RATELIMIT_STORAGE_URI = os.getenv('RATELIMIT_STORAGE_URI', 'bounded-memory://')
+    RATELIMIT_STORAGE_OPTIONS = _rate_limit_storage_options(RATELIMIT_STORAGE_URI)
+    RATELIMIT_STRATEGY = os.getenv('RATELIMIT_STRATEGY', 'sliding-window-counter')
+    RATELIMIT_HEADERS_ENABLED = True
+    RATELIMIT_IN_MEMORY_FALLBACK_ENABLED = os.getenv('RATELIMIT_IN_MEMORY_FALLBACK', 'True').lower() == 'true'
+    # Reverse proxies in front of the app whose X-Forwarded-For is trusted (0 = use the socket address)
+    PROXY_FIX_X_FOR = int(os.getenv('PROXY_FIX_X_FOR', '0'))
+
+    # Internal service-to-service endpoints (loopback only when unset)
+    INTERNAL_API_TOKEN = os.getenv('INTERNAL_API_TOKEN')
+
+    # Bearer tokens for service-to-service calls, accepted alongside the session cookie
+    AUTH_TOKENS_ENABLED = os.getenv('AUTH_TOKENS_ENABLED', 'False').lower() == 'true'
+    JWT_SECRET_KEY = os.getenv('JWT_SECRET_KEY')  # falls back to SECRET_KEY
+    JWT_ALGORITHM = os.getenv('JWT_ALGORITHM', 'HS256')
+    JWT_ACCESS_TOKEN_TTL = int(os.getenv('JWT_ACCESS_TOKEN_TTL', '900'))  # seconds
+    JWT_REFRESH_TOKEN_TTL = int(os.getenv('JWT_REFRESH_TOKEN_TTL', '1209600'))  # seconds (14 days)
+    TOKEN_REVOCATION_SYNC_INTERVAL = int(os.getenv('TOKEN_REVOCATION_SYNC_INTERVAL', '30'))  # seconds
+
+    # User loader cache (per process)
+    USER_CACHE_TTL = int(os.getenv('USER_CACHE_TTL', '60'))  # seconds, 0 disables caching
+    USER_CACHE_MAX_SIZE = int(os.getenv('USER_CACHE_MAX_SIZE', '10000'))
+
+    # Internal batch lookup (POST /api/internal/users/lookup)
+    USER_LOOKUP_MAX_KEYS = int(os.getenv('USER_LOOKUP_MAX_KEYS', '1000'))  # ids or emails per request
+    USER_LOOKUP_CHUNK_SIZE = int(os.getenv('USER_LOOKUP_CHUNK_SIZE', '500'))  # keys per IN query
+    USER_LOOKUP_CACHE_TTL = int(os.getenv('USER_LOOKUP_CACHE_TTL', '0'))  # seconds, 0 disables caching
+    USER_LOOKUP_CACHE_MAX_SIZE = int(os.getenv('USER_LOOKUP_CACHE_MAX_SIZE', '10000'))
+
+    # Password hashing (werkzeug method string, e.g. 'scrypt:32768:8:1' or 'pbkdf2:sha256:1000000')
+    PASSWORD_HASH_METHOD = os.getenv('PASSWORD_HASH_METHOD', 'scrypt:32768:8:1')
+    PASSWORD_SALT_LENGTH = int(os.getenv('PASSWORD_SALT_LENGTH', '16'))
+    PASSWORD_HASH_WORKERS = int(os.getenv('PASSWORD_HASH_WORKERS', '2'))  # 0 hashes inline
+    PASSWORD_HASH_MAX_QUEUE = int(os.getenv('PASSWORD_HASH_MAX_QUEUE', '16'))
+    PASSWORD_HASH_TIMEOUT = float(os.getenv('PASSWORD_HASH_TIMEOUT', '5'))  # seconds
+    PASSWORD_HASH_RETRY_AFTER = int(os.getenv('PASSWORD_HASH_RETRY_AFTER', '2'))  # seconds
+
+    # Outbound mail (Flask-Mail), delivered by a background worker per process
+    MAIL_SERVER = os.getenv('MAIL_SERVER', 'localhost')
+    MAIL_PORT = int(os.getenv('MAIL_PORT', '25'))
+    MAIL_USE_TLS = os.getenv('MAIL_USE_TLS', 'False').lower() == 'true'
+    MAIL_USE_SSL = os.getenv('MAIL_USE_SSL', 'False').lower() == 'true'
+    MAIL_USERNAME = os.getenv('MAIL_USERNAME')
+    MAIL_PASSWORD = os.getenv('MAIL_PASSWORD')
+    MAIL_DEFAULT_SENDER = os.getenv('MAIL_DEFAULT_SENDER', 'no-reply@numeraid.local')
+    MAIL_QUEUE_SIZE = int(os.getenv('MAIL_QUEUE_SIZE', '1000'))  # messages; extra mail is dropped and counted
+    MAIL_BATCH_SIZE = int(os.getenv('MAIL_BATCH_SIZE', '50'))  # messages per SMTP connection
+    MAIL_MAX_RETRIES = int(os.getenv('MAIL_MAX_RETRIES', '3'))
+    MAIL_RETRY_BACKOFF = float(os.getenv('MAIL_RETRY_BACKOFF', '1'))  # seconds, doubled per attempt
+    MAIL_SHUTDOWN_TIMEOUT = float(os.getenv('MAIL_SHUTDOWN_TIMEOUT', '5'))  # seconds to drain on exit
+
+    # Set-password invites for users imported without a password
+    PASSWORD_INVITE_TTL = int(os.getenv('PASSWORD_INVITE_TTL', str(7 * 24 * 3600)))  # seconds
+    PASSWORD_SETUP_URL = os.getenv('PASSWORD_SETUP_URL', 'http://localhost:5173/set-password')
+
+    # Response JSON encoder: 'auto' (orjson when installed), 'orjson' or 'stdlib'
+    JSON_BACKEND = os.getenv('JSON_BACKEND', 'auto')
+
+    # Request instrumentation; requests slower than the threshold are logged with their SQL
+    SLOW_REQUEST_THRESHOLD_MS = int(os.getenv('SLOW_REQUEST_THRESHOLD_MS', '0'))  # 0 disables the slow log
+    SLOW_REQUEST_MAX_STATEMENTS = int(os.getenv('SLOW_REQUEST_MAX_STATEMENTS', '50'))  # per logged request
+
+    # last_login is buffered in memory and written in bulk; 0 writes on every login
+    LAST_LOGIN_FLUSH_INTERVAL = float(os.getenv('LAST_LOGIN_FLUSH_INTERVAL', '5'))  # seconds
+    LAST_LOGIN_MAX_PENDING = int(os.getenv('LAST_LOGIN_MAX_PENDING', '10000'))  # users; flush early when reached
+
+    # Readiness: connections each worker opens before reporting ready; 0 uses DB_POOL_SIZE
+    DB_WARM_CONNECTIONS = int(os.getenv('DB_WARM_CONNECTIONS', '0'))
+
+    # Medical proof uploads, stored content-addressed on local disk
+    MEDICAL_PROOF_DIR = os.getenv('MEDICAL_PROOF_DIR')  # defaults to <instance>/medical_proofs
+    MEDICAL_PROOF_MAX_BYTES = int(os.getenv('MEDICAL_PROOF_MAX_BYTES', str(10 * 1024 * 1024)))
+    MEDICAL_PROOF_CHUNK_SIZE = int(os.getenv('MEDICAL_PROOF_CHUNK_SIZE', str(64 * 1024)))  # bytes per read
+    USE_X_SENDFILE = os.getenv('USE_X_SENDFILE', 'False').lower() == 'true'  # front server sends files
+
+    # Bulk application status transitions
+    APPLICATION_STATUS_CHUNK_SIZE = int(os.getenv('APPLICATION_STATUS_CHUNK_SIZE', '1000'))  # rows per UPDATE and commit
+    APPLICATION_STATUS_NOTIFY = os.getenv('APPLICATION_STATUS_NOTIFY', 'True').lower() == 'true'  # mail moved students
+
+    # Profile pictures, resized once and stored on local disk
+    AVATAR_DIR = os.getenv('AVATAR_DIR')  # defaults to <instance>/avatars
+    AVATAR_MAX_BYTES = int(os.getenv('AVATAR_MAX_BYTES', str(5 * 1024 * 1024)))
+    AVATAR_QUALITY = int(os.getenv('AVATAR_QUALITY', '85'))  # WebP quality, 1-100
+    AVATAR_FETCH_TIMEOUT = float(os.getenv('AVATAR_FETCH_TIMEOUT', '5'))  # seconds for a whole download
+    AVATAR_FETCH_WORKERS = int(os.getenv('AVATAR_FETCH_WORKERS', '2'))  # background fetch threads per worker
+    AVATAR_MAX_PENDING = int(os.getenv('AVATAR_MAX_PENDING', '100'))  # queued fetches before new ones are skipped
+
+    # Bulk student import
+    IMPORT_CHUNK_SIZE = int(os.getenv('IMPORT_CHUNK_SIZE', '1000'))
+
     # OAuth
     GOOGLE_CLIENT_ID = os.environ.get("GOOGLE_CLIENT_ID")
     GOOGLE_CLIENT_SECRET = os.environ.get("GOOGLE_CLIENT_SECRET")
     GOOGLE_REDIRECT_URI = os.environ.get("GOOGLE_REDIRECT_URI")
+    GOOGLE_TOKEN_URI = os.environ.get("GOOGLE_TOKEN_URI", "https://oauth2.googleapis.com/token")
+    GOOGLE_JWKS_URI = os.environ.get("GOOGLE_JWKS_URI", "https://www.googleapis.com/oauth2/v3/certs")
+    GOOGLE_ISSUERS = ("https://accounts.google.com", "accounts.google.com")
+    JWKS_CACHE_TTL = int(os.getenv('JWKS_CACHE_TTL', '3600'))  # seconds, upper bound on provider max-age
+    JWKS_MIN_REFRESH_INTERVAL = int(os.getenv('JWKS_MIN_REFRESH_INTERVAL', '60'))  # seconds between kid-miss refreshes
+
+    # Outbound HTTP (shared keep-alive session)
+    HTTP_POOL_CONNECTIONS = int(os.getenv('HTTP_POOL_CONNECTIONS', '4'))
+    HTTP_POOL_MAXSIZE = int(os.getenv('HTTP_POOL_MAXSIZE', '16'))
+    HTTP_MAX_RETRIES = int(os.getenv('HTTP_MAX_RETRIES', '2'))
+    HTTP_BACKOFF_FACTOR = float(os.getenv('HTTP_BACKOFF_FACTOR', '0.2'))
+    HTTP_CONNECT_TIMEOUT = float(os.getenv('HTTP_CONNECT_TIMEOUT', '3.05'))  # seconds
+    HTTP_READ_TIMEOUT = float(os.getenv('HTTP_READ_TIMEOUT', '10'))  # seconds
 
 
 class DevelopmentConfig(Config):
@@ -0,0 +1,69 @@
+"""
+Gunicorn settings for the user service.
+
+    gunicorn -c gunicorn.conf.py run:app
+
+Every setting can be overridden through the GUNICORN_* environment variables
+below. The default worker is ``gthread``; set GUNICORN_WORKER_CLASS=gevent
+(requires the ``gevent`` package) to serve many slow outbound calls, such as
+the Google OAuth callback, from a single process.
+"""
+import os
+import multiprocessing
+
+worker_class = os.getenv('GUNICORN_WORKER_CLASS', 'gthread')
+
+if worker_class == 'gevent':
+    # Patch before the app (and requests/ssl) is preloaded in the master
+    from gevent import monkey
+    monkey.patch_all()
+
+cpu_count = multiprocessing.cpu_count()
+
+bind = os.getenv('GUNICORN_BIND', '0.0.0.0:8000')
+
+if worker_class == 'gevent':
+    workers = int(os.getenv('GUNICORN_WORKERS', str(cpu_count)))
+    worker_connections = int(os.getenv('GUNICORN_WORKER_CONNECTIONS', '500'))
+else:
+    workers = int(os.getenv('GUNICORN_WORKERS', str(cpu_count * 2 + 1)))
+    threads = int(os.getenv('GUNICORN_THREADS', '4'))
+
+# Import create_app() and all models once in the master, then fork
+preload_app = os.getenv('GUNICORN_PRELOAD', 'true').lower() == 'true'
+
+# Recycle workers periodically to bound memory growth; jitter avoids
+# every worker restarting at the same moment
+max_requests = int(os.getenv('GUNICORN_MAX_REQUESTS', '2000'))
+max_requests_jitter = int(os.getenv('GUNICORN_MAX_REQUESTS_JITTER', '200'))
+
+timeout = int(os.getenv('GUNICORN_TIMEOUT', '30'))
+graceful_timeout = int(os.getenv('GUNICORN_GRACEFUL_TIMEOUT', '30'))
+keepalive = int(os.getenv('GUNICORN_KEEPALIVE', '5'))
+
+accesslog = os.getenv('GUNICORN_ACCESS_LOG', '-')
+errorlog = '-'
+loglevel = os.getenv('GUNICORN_LOG_LEVEL', 'info')
+
+
+def post_fork(server, worker):
+    """Drops database connections inherited from the master so workers never share sockets."""
+    from app.extensions import db
+
+    app = server.app.wsgi()
+    with app.app_context():
+        db.engine.dispose(close=False)
+
+
+def post_worker_init(worker):
+    """Warms the database pool before the worker accepts connections, so it starts out ready."""
+    from app.extensions import readiness
+
+    readiness.warm()
+
+
+def worker_exit(server, worker):
+    """Writes buffered last-login times before the worker goes away."""
+    from app.extensions import last_login_buffer
+
+    last_login_buffer.shutdown()
@@ -1,12 +1,77 @@
+import uuid
+from contextlib import contextmanager
+
 import pytest
-from flask import Flask
+from flask import Flask, g
+from sqlalchemy import event
 from flask_login import LoginManager
 
-from services.user.app.extensions import db as _db
+from services.user.app import register_user_loaders
+from services.user.app.extensions import db as _db, tokens, user_cache
 from services.user.app.routes.auth_router import auth_bp
 from services.user.app.routes.oauth_router import oauth_bp
 from services.user.app.routes.profile_router import profile_bp
-from services.user.app.models.user_model import User
+from services.user.app.routes.users_router import users_bp
+from services.user.app.routes.internal_router import internal_bp
+from services.user.app.models.user_model import User, Student, Staff
+# Defines the revoked_token table on the metadata create_all builds from
+import services.user.app.models.token_model  # noqa: F401
+from services.user.app.utils.json_provider import JSONProvider
+from .google_stub import GoogleStub
+
+
+@contextmanager
+def recorded_statements(engine):
+    """Collects the SQL statements executed on ``engine`` inside the block."""
+    statements = []
+
+    def record(conn, cursor, statement, *args):
+        statements.append(statement)
+
+    event.listen(engine, 'before_cursor_execute', record)
+    try:
+        yield statements
+    finally:
+        event.remove(engine, 'before_cursor_execute', record)
+
+
+@contextmanager
+def assert_queries(engine, expected):
+    """Fails unless exactly ``expected`` SQL statements run on ``engine`` inside the block."""
+    with recorded_statements(engine) as statements:
+        yield statements
+    assert len(statements) == expected, (
+        f"expected {expected} queries, got {len(statements)}:\n" + "\n".join(statements)
+    )
+
+
+def make_csv(rows):
+    """An import CSV body with the standard header and one line per row tuple."""
+    header = 'email,username,name,surname,faculty,course,year_of_study\n'
+    return (header + ''.join(','.join(row) + '\n' for row in rows)).encode()
+
+
+def create_role_users(count, role):
+    """Commits ``count`` users of ``role`` with a student or staff row each."""
+    users = []
+    for i in range(count):
+        user = User(email=f'{role}-{uuid.uuid4().hex[:8]}@test.com', name='Role', surname=str(i), role=role)
+        if role == 'student':
+            user.student = Student(faculty='Science', course='Mathematics', year_of_study=2)
+        else:
+            user.staff = Staff(department='Registry')
+        users.append(user)
+    _db.session.add_all(users)
+    _db.session.commit()
+    return users
+
+
+def login_as(client, user):
+    """Signs ``client`` in as ``user``, dropping whoever the shared app context last loaded."""
+    g.pop('_login_user', None)
+    _db.session.expire_all()
+    with client.session_transaction() as sess:
+        sess['_user_id'] = str(user.user_id)
 
 
 class TestingConfig:
@@ -20,18 +85,22 @@ class TestingConfig:
 def app():
     app = Flask(__name__)
     app.config.from_object(TestingConfig)
+    app.json = JSONProvider(app)
     _db.init_app(app)
     app.register_blueprint(auth_bp, url_prefix='/api/auth')
     app.register_blueprint(oauth_bp, url_prefix='/api/oauth')
     app.register_blueprint(profile_bp, url_prefix='/api/profile')
+    app.register_blueprint(users_bp, url_prefix='/api/users')
+    app.register_blueprint(internal_bp, url_prefix='/api/internal')
 
     # Initialize Flask-Login
     login_manager = LoginManager()
     login_manager.init_app(app)
 
-    @login_manager.user_loader
-    def load_user(user_id):
-        return User.query.get(int(user_id))
+    # The service's own loaders, so tests go through the user cache as production does
+    register_user_loaders(login_manager)
+    user_cache.init_app(app)
+    tokens.init_app(app)
 
     import services.user.app.controllers.auth_controller as auth_controller
     auth_controller.limiter = type('DummyLimiter', (), {'limit': lambda *a, **k: (lambda f: f)})()
@@ -52,7 +121,96 @@ def db_session(app):
         transaction.rollback()
         connection.close()
         _db.session.remove()
+        # Rolled back and bulk-deleted rows skip the model's invalidation, and SQLite reuses their ids
+        user_cache.clear()
 
 @pytest.fixture(scope='function')
 def client(app, db_session):
     return app.test_client()
+
+
+@pytest.fixture
+def make_course(db_session):
+    """
+    Returns a factory that puts ``count`` students on a course unique to the
+    test and returns the course name. ``user`` and ``student`` map a
+    student's index to extra column values for its user and student rows.
+    Every course made is deleted after the test.
+    """
+    courses = []
+
+    def make(count, user=lambda i: {}, student=lambda i: {}):
+        batch = uuid.uuid4().hex[:8]
+        course = f'Course {batch}'
+        for i in range(count):
+            row = User(email=f'course_{i}_{batch}@test.com', name=f'Student{i}', surname='Course',
+                       role='student', **user(i))
+            row.student = Student(faculty='Science', course=course, **student(i))
+            _db.session.add(row)
+        _db.session.commit()
+        courses.append(course)
+        return course
+
+    yield make
+    _db.session.rollback()
+    for course in courses:
+        user_ids = [s.student_id for s in Student.query.filter_by(course=course)]
+        Student.query.filter(Student.student_id.in_(user_ids)).delete()
+        User.query.filter(User.user_id.in_(user_ids)).delete()
+    _db.session.commit()
+
+
+@pytest.fixture
+def staff_client(client, db_session):
+    """The test client signed in as a staff member created for the test."""
+    batch = uuid.uuid4().hex[:8]
+    staff = User(email=f'staff_{batch}@test.com', username=f'staff_{batch}', name='Staff', surname='User',
+                 role='staff')
+    staff.staff = Staff(department=f'Dept {batch}')
+    _db.session.add(staff)
+    _db.session.commit()
+    with client.session_transaction() as sess:
+        sess['_user_id'] = str(staff.user_id)
+    yield client
+    _db.session.rollback()
+    Staff.query.filter_by(staff_id=staff.user_id).delete()
+    User.query.filter_by(user_id=staff.user_id).delete()
+    _db.session.commit()
+
+
+@pytest.fixture
+def batch_id():
+    """A tag unique to the test; users whose email contains it are deleted afterwards."""
+    batch = uuid.uuid4().hex[:8]
+    yield batch
+    _db.session.rollback()
+    user_ids = [user_id for (user_id,) in
+                _db.session.query(User.user_id).filter(User.email.like(f'%{batch}%')).all()]
+    Student.query.filter(Student.student_id.in_(user_ids)).delete()
+    User.query.filter(User.user_id.in_(user_ids)).delete()
+    _db.session.commit()
+
+
+@pytest.fixture
+def google_stub(app, db_session):
+    """A running GoogleStub the OAuth settings, HTTP client and JWKS cache point at."""
+    from services.user.app.extensions import http_client, google_jwks
+
+    with GoogleStub(client_id='stub-client-id') as stub:
+        app.config.update(
+            GOOGLE_CLIENT_ID='stub-client-id',
+            GOOGLE_CLIENT_SECRET='secret',
+            GOOGLE_REDIRECT_URI='uri',
+            GOOGLE_TOKEN_URI=f'{stub.url}/token',
+            GOOGLE_JWKS_URI=f'{stub.url}/certs',
+            JWKS_MIN_REFRESH_INTERVAL=0,
+        )
+        http_client.init_app(app)
+        google_jwks.init_app(app)
+        yield stub
+        google_jwks.clear()
+        http_client.close()
+
+    _db.session.rollback()
+    User.query.filter(User.email.like('%@stub.example.com')).delete(synchronize_session=False)
+    _db.session.commit()
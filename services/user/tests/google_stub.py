@@ -0,0 +1,126 @@
+import io
+import json
+import time
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import jwt
+from cryptography.hazmat.primitives.asymmetric import rsa
+
+ISSUER = 'https://accounts.google.com'
+
+
+def sample_picture(size=(320, 240), color=(40, 120, 200)):
+    """A small PNG, standing in for a Google profile picture."""
+    from PIL import Image
+
+    buffer = io.BytesIO()
+    Image.new('RGB', size, color).save(buffer, 'PNG')
+    return buffer.getvalue()
+
+
+class GoogleStub:
+    """Local stand-in for Google's OAuth token, JWKS and profile picture endpoints."""
+
+    def __init__(self, client_id='stub-client-id'):
+        self.client_id = client_id
+        self.keys = {}
+        self.active_kid = None
+        self.claims = {}
+        self.token_status = 200
+        self.requests = []
+        self.picture = sample_picture()
+        self.rotate_key('key-1')
+
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+
+            def do_GET(self):
+                stub.requests.append(('GET', self.path, self.client_address[1]))
+                if self.path == '/picture.png':
+                    return self._send_bytes(200, stub.picture, 'image/png')
+                if self.path != '/certs':
+                    return self._send(404, {})
+                self._send(200, stub.jwks(), {'Cache-Control': 'public, max-age=3600'})
+
+            def do_POST(self):
+                stub.requests.append(('POST', self.path, self.client_address[1]))
+                self.rfile.read(int(self.headers.get('Content-Length', 0)))
+                if self.path != '/token':
+                    return self._send(404, {})
+                if stub.token_status != 200:
+                    return self._send(stub.token_status, {'error': 'unavailable'})
+                self._send(200, {'access_token': 'stub-access-token', 'id_token': stub.id_token()})
+
+            def _send(self, status, payload, headers=None):
+                self._send_bytes(status, json.dumps(payload).encode(), 'application/json', headers)
+
+            def _send_bytes(self, status, body, content_type, headers=None):
+                self.send_response(status)
+                self.send_header('Content-Type', content_type)
+                self.send_header('Content-Length', str(len(body)))
+                for name, value in (headers or {}).items():
+                    self.send_header(name, value)
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        self.server.daemon_threads = True
+        self._thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+
+    @property
+    def url(self):
+        host, port = self.server.server_address
+        return f'http://{host}:{port}'
+
+    def rotate_key(self, kid):
+        self.keys[kid] = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+        self.active_kid = kid
+
+    def jwks(self):
+        keys = []
+        for kid, private_key in self.keys.items():
+            jwk = jwt.algorithms.RSAAlgorithm.to_jwk(private_key.public_key(), as_dict=True)
+            jwk.update({'kid': kid, 'alg': 'RS256', 'use': 'sig'})
+            keys.append(jwk)
+        return {'keys': keys}
+
+    def id_token(self, private_key=None, kid=None, **overrides):
+        now = int(time.time())
+        claims = {
+            'iss': ISSUER,
+            'aud': self.client_id,
+            'iat': now,
+            'exp': now + 3600,
+            'sub': 'stub-google-id',
+            'email': 'stub.user@example.com',
+            'given_name': 'Stub',
+            'family_name': 'User',
+            'picture': f'{self.url}/picture.png',
+        }
+        claims.update(self.claims)
+        claims.update(overrides)
+        kid = kid or self.active_kid
+        return jwt.encode(claims, private_key or self.keys[kid], algorithm='RS256', headers={'kid': kid})
+
+    def count(self, method, path):
+        return sum(1 for m, p, _ in self.requests if m == method and p == path)
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
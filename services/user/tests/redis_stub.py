@@ -0,0 +1,186 @@
+import time
+import hashlib
+import threading
+from socketserver import StreamRequestHandler, ThreadingTCPServer
+
+from limits.storage import RedisStorage
+
+
+def _sha(script):
+    if isinstance(script, str):
+        script = script.encode()
+    return hashlib.sha1(script).hexdigest()
+
+
+class RedisStub:
+    """
+    Local stand-in for a Redis server, for limits' RedisStorage.
+
+    Speaks RESP2, or RESP3 once a client sends ``HELLO 3`` as redis-py does,
+    over TCP and answers the plain commands the storage sends.
+    Lua is not interpreted: the sliding-window scripts RedisStorage loads
+    are recognised by their SHA1 and run as the Python equivalents below.
+    """
+
+    def __init__(self):
+        self.data = {}
+        self.expires = {}
+        self.commands = []
+        self._lock = threading.Lock()
+        self._scripts = {
+            _sha(RedisStorage.SCRIPT_ACQUIRE_SLIDING_WINDOW): self._acquire_sliding_window,
+            _sha(RedisStorage.SCRIPT_SLIDING_WINDOW): self._sliding_window,
+        }
+
+        stub = self
+
+        class Handler(StreamRequestHandler):
+            def handle(self):
+                protocol = 2
+                while True:
+                    command = self._read_command()
+                    if command is None:
+                        return
+                    name, args = command[0].upper(), command[1:]
+                    if name == 'HELLO':
+                        protocol = int(args[0]) if args else protocol
+                    with stub._lock:
+                        stub.commands.append(name)
+                        reply = stub.execute(name, args)
+                    self.wfile.write(_encode(reply, protocol))
+
+            def _read_command(self):
+                line = self.rfile.readline()
+                if not line:
+                    return None
+                args = []
+                for _ in range(int(line[1:])):
+                    length = int(self.rfile.readline()[1:])
+                    args.append(self.rfile.read(length + 2)[:-2].decode())
+                return args
+
+        self.server = ThreadingTCPServer(('127.0.0.1', 0), Handler)
+        self.server.daemon_threads = True
+        self._thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+
+    @property
+    def url(self):
+        host, port = self.server.server_address
+        return f'redis://{host}:{port}/0'
+
+    def execute(self, name, args):
+        """Runs one command, returning its reply as a Python value or an ``Error``."""
+        self._expire()
+        if name == 'HELLO':
+            return {'proto': int(args[0]) if args else 2}
+        if name == 'PING':
+            return Status('PONG')
+        if name == 'GET':
+            return self.data.get(args[0])
+        if name in ('TTL', 'PTTL'):
+            ttl = self._pttl(args[0])
+            return ttl // 1000 if name == 'TTL' and ttl > 0 else ttl
+        if name == 'SCRIPT' and args[0].upper() == 'LOAD':
+            return _sha(args[1])
+        if name == 'EVALSHA':
+            script = self._scripts.get(args[0])
+            if script is None:
+                return Error('NOSCRIPT No matching script.')
+            count = int(args[1])
+            return script(args[2:2 + count], args[2 + count:])
+        return Error(f"ERR unknown command '{name}'")
+
+    def _acquire_sliding_window(self, keys, args):
+        # acquire_sliding_window.lua; Lua false is a nil reply, true is 1
+        previous, current = keys
+        limit, expiry, amount = int(args[0]), int(args[1]) * 1000, int(args[2])
+        if amount > limit:
+            return None
+        self._shift(previous, current, expiry)
+        previous_ttl = max(self._pttl(previous), 0)
+        weighted = int(self._count(previous) * previous_ttl / expiry) + self._count(current)
+        if weighted + amount > limit:
+            return None
+        if current in self.data:
+            self.data[current] = str(self._count(current) + amount)
+        else:
+            self._set(current, amount, expiry * 2)
+        return 1
+
+    def _sliding_window(self, keys, args):
+        # sliding_window.lua
+        previous, current = keys
+        self._shift(previous, current, int(args[0]) * 1000)
+        return [self.data.get(previous), self._pttl(previous),
+                self.data.get(current), self._pttl(current)]
+
+    def _shift(self, previous, current, expiry):
+        """Moves an expiring current window into the previous one, as both scripts do."""
+        ttl = self._pttl(current)
+        if 0 < ttl < expiry:
+            self.data[previous] = self.data.pop(current)
+            self.expires[previous] = self.expires.pop(current)
+            self._set(current, 0, ttl + expiry)
+
+    def _set(self, key, value, px):
+        self.data[key] = str(value)
+        self.expires[key] = time.time() + px / 1000
+
+    def _count(self, key):
+        return int(self.data.get(key) or 0)
+
+    def _pttl(self, key):
+        if key not in self.data:
+            return -2
+        if key not in self.expires:
+            return -1
+        return int((self.expires[key] - time.time()) * 1000)
+
+    def _expire(self):
+        now = time.time()
+        for key in [k for k, expires in self.expires.items() if expires <= now]:
+            self.data.pop(key, None)
+            self.expires.pop(key, None)
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+
+class Status(str):
+    """A simple-string reply, such as ``+PONG``."""
+
+
+class Error(str):
+    """An error reply."""
+
+
+def _encode(value, protocol):
+    """RESP encoding of a reply; RESP3 sends nil and maps differently from RESP2."""
+    if value is None:
+        return b'_\r\n' if protocol == 3 else b'$-1\r\n'
+    if isinstance(value, Error):
+        return b'-%s\r\n' % value.encode()
+    if isinstance(value, Status):
+        return b'+%s\r\n' % value.encode()
+    if isinstance(value, int):
+        return b':%d\r\n' % value
+    if isinstance(value, list):
+        return b'*%d\r\n' % len(value) + b''.join(_encode(item, protocol) for item in value)
+    if isinstance(value, dict):
+        items = [item for pair in value.items() for item in pair]
+        if protocol == 3:
+            return b'%%%d\r\n' % len(value) + b''.join(_encode(item, protocol) for item in items)
+        return _encode(items, protocol)
+    value = str(value).encode()
+    return b'$%d\r\n%s\r\n' % (len(value), value)
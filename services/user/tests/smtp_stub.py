@@ -0,0 +1,90 @@
+import threading
+from email import message_from_bytes
+from socketserver import StreamRequestHandler, ThreadingTCPServer
+
+
+class SMTPStub:
+    """Local debugging SMTP server that records sessions and messages."""
+
+    def __init__(self):
+        self.connections = 0
+        self.messages = []
+        # Reply codes to send instead of 250 for upcoming DATA commands, e.g. [451]
+        self.data_failures = []
+        self.refused_recipients = set()
+        self._lock = threading.Lock()
+
+        stub = self
+
+        class Handler(StreamRequestHandler):
+            def handle(self):
+                with stub._lock:
+                    stub.connections += 1
+                self._reply(220, 'stub ESMTP')
+                mail_from, recipients = None, []
+                while True:
+                    line = self.rfile.readline()
+                    if not line:
+                        return
+                    command, _, argument = line.decode().strip().partition(' ')
+                    command = command.upper()
+                    if command in ('EHLO', 'HELO'):
+                        self._reply(250, 'stub')
+                    elif command == 'MAIL':
+                        mail_from, recipients = argument.split(':', 1)[1].strip('<> '), []
+                        self._reply(250, 'OK')
+                    elif command == 'RCPT':
+                        recipient = argument.split(':', 1)[1].strip('<> ')
+                        if recipient in stub.refused_recipients:
+                            self._reply(550, 'No such user')
+                        else:
+                            recipients.append(recipient)
+                            self._reply(250, 'OK')
+                    elif command == 'DATA':
+                        self._reply(354, 'End data with <CR><LF>.<CR><LF>')
+                        data = self._read_data()
+                        with stub._lock:
+                            code = stub.data_failures.pop(0) if stub.data_failures else 250
+                            if code == 250:
+                                stub.messages.append((mail_from, recipients, message_from_bytes(data)))
+                        self._reply(code, 'OK' if code == 250 else 'Try again later')
+                    elif command in ('RSET', 'NOOP'):
+                        self._reply(250, 'OK')
+                    elif command == 'QUIT':
+                        self._reply(221, 'Bye')
+                        return
+                    else:
+                        self._reply(502, 'Command not implemented')
+
+            def _read_data(self):
+                lines = []
+                while True:
+                    line = self.rfile.readline()
+                    if line in (b'.\r\n', b''):
+                        return b''.join(lines)
+                    lines.append(line[1:] if line.startswith(b'..') else line)
+
+            def _reply(self, code, text):
+                self.wfile.write(f'{code} {text}\r\n'.encode())
+
+        self.server = ThreadingTCPServer(('127.0.0.1', 0), Handler)
+        self.server.daemon_threads = True
+        self._thread = threading.Thread(target=self.server.serve_forever, args=(0.05,), daemon=True)
+
+    @property
+    def port(self):
+        return self.server.server_address[1]
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
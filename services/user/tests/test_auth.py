@@ -1,42 +1,18 @@
 import pytest
 
-from unittest.mock import MagicMock, patch
+from unittest.mock import patch
+from services.user.app.extensions import db as _db
 from services.user.app.models.user_model import User
+from .conftest import recorded_statements
 
 AUTH_BASE_URL = '/api/auth'
 
 
-class MockRegisterForm:
-    def __init__(self, data=None):
-        self.data = data or {}
-        self.email = MagicMock(data=self.data.get('email', ''))
-        self.username = MagicMock(data=self.data.get('username', ''))
-        self.name = MagicMock(data=self.data.get('name', ''))
-        self.surname = MagicMock(data=self.data.get('surname', ''))
-        self.password = MagicMock(data=self.data.get('password', ''))
-        self.consent = MagicMock(data=self.data.get('consent', False))
-        self.errors = {}
-
-    def validate_on_submit(self):
-        return True
-
-
-class MockLoginForm:
-    def __init__(self, data=None):
-        self.data = data or {}
-        self.email = MagicMock(data=self.data.get('email', ''))
-        self.password = MagicMock(data=self.data.get('password', ''))
-        self.remember = MagicMock(data=self.data.get('remember', False))
-        self.errors = {}
-
-    def validate_on_submit(self):
-        return True
-
-
-@pytest.fixture(autouse=True)
-def mock_forms(mocker):
-    mocker.patch('services.user.app.controllers.auth_controller.RegisterForm', MockRegisterForm)
-    mocker.patch('services.user.app.controllers.auth_controller.LoginForm', MockLoginForm)
+def register_data(**overrides):
+    data = {'email': 'newuser@test.com', 'username': 'newuser', 'name': 'Test', 'surname': 'User',
+            'password': 'StrongPassword123', 'confirm_password': 'StrongPassword123', 'consent': True}
+    data.update(overrides)
+    return data
 
 
 # --- Test Cases ---
@@ -65,20 +41,7 @@ def test_auth_routes_wrong_method(client, method):
 def test_register_route_success(client, db_session):
     """Test successful user registration."""
 
-    # Setup mock form data that passes validation
-    data = {
-        'email': 'newuser@test.com',
-        'username': 'newuser',
-        'name': 'Test',
-        'surname': 'User',
-        'password': 'StrongPassword123',
-        'consent': True
-    }
-
-    # Override the mock form instance with specific data for this test
-    with patch('services.user.app.controllers.auth_controller.RegisterForm',
-               lambda: MockRegisterForm(data=data)):
-        response = client.post(f'{AUTH_BASE_URL}/register', json=data)
+    response = client.post(f'{AUTH_BASE_URL}/register', json=register_data())
 
     assert response.status_code == 201
     assert response.get_json()['message'] == "User registered successfully."
@@ -87,8 +50,7 @@ def test_register_route_success(client, db_session):
     user = User.query.filter_by(email='newuser@test.com').first()
     assert user is not None
     assert user.username == 'newuser'
-
-    # Clean up the session (handled by db_session fixture rollback)
+    assert user.consent_given is True
 
 
 def test_register_route_email_exists(client, db_session):
@@ -101,32 +63,73 @@ def test_register_route_email_exists(client, db_session):
     db_session.add(existing_user)
     db_session.commit()
 
-    # 2. Setup mock form data for the duplicate user
-    data = {'email': 'existing@test.com', 'username': 'new', 'password': 'p', 'consent': True}
+    # 2. Register again with the same email, in a different case
+    data = register_data(email='Existing@test.com', username='new')
 
-    with patch('services.user.app.controllers.auth_controller.RegisterForm',
-               lambda: MockRegisterForm(data=data)):
-        response = client.post(f'{AUTH_BASE_URL}/register', json=data)
+    response = client.post(f'{AUTH_BASE_URL}/register', json=data)
 
     assert response.status_code == 400
     assert response.get_json()['message'] == "Email already registered."
 
 
-def test_register_route_form_validation_fail(client, mocker):
+def test_register_route_username_taken(client, db_session):
+    """Test registration failure when the username belongs to another account."""
+
+    existing_user = User(email='taken_name@test.com', username='taken_name', name='Test', surname='User', role='student')
+    db_session.add(existing_user)
+    db_session.commit()
+
+    data = register_data(email='other_email@test.com', username='taken_name')
+
+    response = client.post(f'{AUTH_BASE_URL}/register', json=data)
+
+    assert response.status_code == 400
+    assert response.get_json()['message'] == "Username already taken."
+    assert User.query.filter_by(email='other_email@test.com').first() is None
+
+
+def test_register_route_single_insert(client, db_session):
+    """Test that a successful registration runs one INSERT and no uniqueness SELECTs."""
+
+    data = register_data(email='one_trip@test.com', username='one_trip', name='One', surname='Trip')
+
+    with recorded_statements(_db.engine) as statements:
+        response = client.post(f'{AUTH_BASE_URL}/register', json=data)
+
+    assert response.status_code == 201
+    assert len(statements) == 1
+    assert statements[0].startswith('INSERT INTO user')
+    assert 'ON CONFLICT DO NOTHING' in statements[0]
+
+
+def test_register_route_form_validation_fail(client):
     """Test registration failure due to form validation errors."""
 
-    # 1. Mock the form to fail validation and provide errors
-    mock_form_instance = MockRegisterForm(data={'email': 'invalid'})
-    mock_form_instance.validate_on_submit = MagicMock(return_value=False)
-    mock_form_instance.errors = {'email': ['Not a valid email address.']}
+    data = register_data(email='invalid', password='weak', confirm_password='other', consent=False)
 
-    with patch('services.user.app.controllers.auth_controller.RegisterForm',
-               lambda: mock_form_instance):
-        response = client.post(f'{AUTH_BASE_URL}/register', json={'email': 'invalid'})
+    with recorded_statements(_db.engine) as statements:
+        response = client.post(f'{AUTH_BASE_URL}/register', json=data)
 
     assert response.status_code == 400
-    assert response.get_json()['message'] == "Form validation failed."
-    assert 'email' in response.get_json()['errors']
+    body = response.get_json()
+    assert body['message'] == "Form validation failed."
+    assert body['errors'] == {
+        'email': ['Invalid email address.'],
+        'password': ['Password must be at least 8 characters long.'],
+        'consent': ['This field is required.'],
+    }
+    assert statements == []
+
+
+def test_register_route_accepts_form_encoded_body(client, db_session):
+    """Test that browser form posts are validated like JSON bodies."""
+
+    data = register_data(email='form_post@test.com', username='form_post', consent='y')
+
+    response = client.post(f'{AUTH_BASE_URL}/register', data=data)
+
+    assert response.status_code == 201
+    assert User.query.filter_by(email='form_post@test.com').first().consent_given is True
 
 
 # --- Login Tests ---
@@ -154,9 +157,7 @@ def test_login_route_success(client, setup_user, mocker):
     # Use the same email as the created user
     data = {'email': setup_user.email, 'password': 'testpassword', 'remember': False}
 
-    with patch('services.user.app.controllers.auth_controller.LoginForm',
-               lambda: MockLoginForm(data=data)):
-        response = client.post(f'{AUTH_BASE_URL}/login', json=data)
+    response = client.post(f'{AUTH_BASE_URL}/login', json=data)
 
     assert response.status_code == 200
     assert response.get_json()['message'] == "Login successful."
@@ -169,14 +170,42 @@ def test_login_route_invalid_credentials(client, setup_user):
 
     data = {'email': 'login@test.com', 'password': 'wrongpassword', 'remember': False}
 
-    with patch('services.user.app.controllers.auth_controller.LoginForm',
-               lambda: MockLoginForm(data=data)):
-        response = client.post(f'{AUTH_BASE_URL}/login', json=data)
+    response = client.post(f'{AUTH_BASE_URL}/login', json=data)
 
     assert response.status_code == 401
     assert response.get_json()['message'] == "Invalid email or password."
 
 
+def test_login_route_pool_full_returns_503(client, setup_user, mocker):
+    """Test that a saturated hashing pool answers fast with 503 and Retry-After."""
+    from services.user.app.utils.hashing import HashPoolFull
+    mocker.patch('services.user.app.models.user_model.password_hasher.verify', side_effect=HashPoolFull(3))
+
+    data = {'email': setup_user.email, 'password': 'testpassword', 'remember': False}
+
+    response = client.post(f'{AUTH_BASE_URL}/login', json=data)
+
+    assert response.status_code == 503
+    assert response.headers['Retry-After'] == '3'
+
+
+def test_login_route_rehashes_outdated_hash(client, setup_user, mocker):
+    """Test that a hash written under an older policy is upgraded on login."""
+    from werkzeug.security import generate_password_hash
+    mocker.patch('services.user.app.controllers.auth_controller.login_user')
+    setup_user.password_hash = generate_password_hash('testpassword', method='pbkdf2:sha256:1000')
+    User.query.session.commit()
+
+    data = {'email': setup_user.email, 'password': 'testpassword', 'remember': False}
+
+    response = client.post(f'{AUTH_BASE_URL}/login', json=data)
+
+    assert response.status_code == 200
+    user = User.query.filter_by(email=setup_user.email).first()
+    assert user.password_hash.startswith('scrypt:')
+    assert user.check_password('testpassword')
+
+
 # --- Logout Tests ---
 
 @patch('services.user.app.controllers.auth_controller.login_required', lambda func: func)
@@ -0,0 +1,249 @@
+import io
+import os
+import time
+import hashlib
+import threading
+
+import pytest
+from PIL import Image
+
+from services.user.app.extensions import db, avatars
+from services.user.app.models.user_model import User
+from services.user.app.utils.avatars import AvatarError
+from services.user.app.controllers.avatar_controller import refresh_from_url
+from .google_stub import sample_picture
+from .conftest import create_role_users, login_as
+
+PICTURE = sample_picture()
+
+
+@pytest.fixture
+def store(app, tmp_path):
+    app.config.update(AVATAR_DIR=str(tmp_path))
+    avatars.init_app(app)
+    yield avatars
+    app.config.pop('AVATAR_DIR')
+    avatars.root = None
+
+
+@pytest.fixture
+def person(db_session):
+    user = create_role_users(1, 'student')[0]
+    yield user
+    db.session.delete(user)
+    db.session.commit()
+
+
+def fake_response(body, headers=None):
+    class Response:
+        def __init__(self):
+            self.headers = headers or {}
+            self.closed = False
+
+        def raise_for_status(self):
+            pass
+
+        def iter_content(self, chunk_size):
+            for start in range(0, len(body), chunk_size):
+                yield body[start:start + chunk_size]
+
+        def close(self):
+            self.closed = True
+
+    return Response()
+
+
+def test_store_writes_square_webp_variants(store):
+    digest = store.store(PICTURE)
+
+    assert digest == hashlib.sha256(PICTURE).hexdigest()
+    for name, size in store.sizes.items():
+        with Image.open(store.path(digest, name)) as image:
+            assert image.format == 'WEBP'
+            assert image.size == (size, size)
+
+
+def test_stored_picture_is_not_resized_again(store, mocker):
+    store.store(PICTURE)
+    resize = mocker.spy(store, '_resize')
+
+    store.store(PICTURE)
+
+    resize.assert_not_called()
+    assert store.stats()['reused'] >= 1
+
+
+def test_store_rejects_non_images(store):
+    with pytest.raises(AvatarError):
+        store.store(b'<html>not a picture</html>')
+    assert os.listdir(store.root) == []
+
+
+@pytest.mark.parametrize('digest,name', [('../../etc/passwd', 'sm'), ('a' * 64, 'xl'), ('A' * 64, 'sm')])
+def test_path_rejects_unknown_variants(store, digest, name):
+    with pytest.raises(ValueError):
+        store.path(digest, name)
+
+
+def test_fetch_stops_at_the_size_limit(store, mocker):
+    response = fake_response(b'x' * (store.max_bytes + 1))
+    mocker.patch.object(store.http_client, 'get', return_value=response)
+    resize = mocker.spy(store, '_resize')
+
+    with pytest.raises(AvatarError):
+        store.fetch('http://pictures.example.com/big.png')
+
+    resize.assert_not_called()
+    assert response.closed
+
+
+def test_fetch_trusts_content_length_before_reading(store, mocker):
+    response = fake_response(PICTURE, {'Content-Length': str(store.max_bytes + 1)})
+    iter_content = mocker.spy(response, 'iter_content')
+    mocker.patch.object(store.http_client, 'get', return_value=response)
+
+    with pytest.raises(AvatarError):
+        store.fetch('http://pictures.example.com/big.png')
+
+    iter_content.assert_not_called()
+
+
+def test_upload_sets_avatar_and_profile_lists_variants(client, store, person):
+    login_as(client, person)
+
+    response = client.put('/api/profile/me/avatar', data=PICTURE, content_type='image/png')
+
+    assert response.status_code == 201
+    digest = hashlib.sha256(PICTURE).hexdigest()
+    assert db.session.get(User, person.user_id).avatar_key == digest
+    urls = client.get('/api/profile/me').get_json()['avatar']
+    assert urls == {name: f'/api/profile/avatars/{digest}/{name}.webp' for name in store.sizes}
+
+
+def test_multipart_upload(client, store, person):
+    login_as(client, person)
+
+    response = client.put('/api/profile/me/avatar', content_type='multipart/form-data',
+                          data={'file': (io.BytesIO(PICTURE), 'me.png')})
+
+    assert response.status_code == 201
+    assert db.session.get(User, person.user_id).avatar_key == hashlib.sha256(PICTURE).hexdigest()
+
+
+def test_upload_rejects_non_images(client, store, person):
+    login_as(client, person)
+
+    response = client.put('/api/profile/me/avatar', data=b'GIF89a-ish', content_type='image/gif')
+
+    assert response.status_code == 415
+    assert db.session.get(User, person.user_id).avatar_key is None
+
+
+def test_oversized_upload_is_rejected(client, store, person, mocker):
+    login_as(client, person)
+    resize = mocker.spy(store, '_resize')
+
+    response = client.put('/api/profile/me/avatar', data=b'x' * (store.max_bytes + 1), content_type='image/png')
+
+    assert response.status_code == 413
+    resize.assert_not_called()
+
+
+def test_variants_are_served_as_immutable(client, store):
+    digest = store.store(PICTURE)
+    url = f'/api/profile/avatars/{digest}/md.webp'
+
+    response = client.get(url)
+    assert response.status_code == 200
+    assert response.mimetype == 'image/webp'
+    assert response.headers['ETag'] == f'"{digest}-md"'
+    assert 'immutable' in response.headers['Cache-Control']
+    assert 'public' in response.headers['Cache-Control']
+
+    assert client.get(url, headers={'If-None-Match': f'"{digest}-md"'}).status_code == 304
+    assert client.get(f'/api/profile/avatars/{digest}/xl.webp').status_code == 404
+    assert client.get(f'/api/profile/avatars/{"0" * 64}/md.webp').status_code == 404
+
+
+def test_google_sign_in_fetches_picture_once(client, store, google_stub, mocker):
+    mocker.patch('services.user.app.controllers.oauth_controller.login_user')
+    google_stub.claims = {'sub': 'stub-sub-avatar', 'email': 'avatar@stub.example.com'}
+
+    assert client.get('/api/oauth/google/callback?code=one').status_code == 302
+    assert store.wait_idle(5)
+    db.session.expire_all()
+    assert client.get('/api/oauth/google/callback?code=two').status_code == 302
+    assert store.wait_idle(5)
+
+    db.session.expire_all()
+    user = User.query.filter_by(social_provider_id='stub-sub-avatar').one()
+    assert user.avatar_key == hashlib.sha256(google_stub.picture).hexdigest()
+    assert user.profile_picture_url == f'{google_stub.url}/picture.png'
+    assert google_stub.count('GET', '/picture.png') == 1
+
+
+def test_google_sign_in_survives_a_broken_picture(client, store, google_stub, mocker):
+    mocker.patch('services.user.app.controllers.oauth_controller.login_user')
+    google_stub.claims = {'sub': 'stub-sub-nopic', 'email': 'nopic@stub.example.com',
+                          'picture': f'{google_stub.url}/missing.png'}
+
+    assert client.get('/api/oauth/google/callback?code=one').status_code == 302
+    assert store.wait_idle(5)
+
+    db.session.expire_all()
+    user = User.query.filter_by(social_provider_id='stub-sub-nopic').one()
+    assert user.avatar_key is None
+
+
+def test_sign_in_does_not_wait_for_the_picture(client, store, google_stub, mocker):
+    mocker.patch('services.user.app.controllers.oauth_controller.login_user')
+    google_stub.claims = {'sub': 'stub-sub-slow', 'email': 'slow@stub.example.com'}
+    released = threading.Event()
+    fetch = store.fetch
+    mocker.patch.object(store, 'fetch', side_effect=lambda url: released.wait(5) and fetch(url))
+
+    assert client.get('/api/oauth/google/callback?code=one').status_code == 302
+    assert store.stats()['pending'] == 1
+
+    released.set()
+    assert store.wait_idle(5)
+    db.session.expire_all()
+    assert User.query.filter_by(social_provider_id='stub-sub-slow').one().avatar_key is not None
+
+
+def test_new_picture_url_bumps_updated_at(app, store, person, mocker):
+    mocker.patch.object(store, 'fetch', return_value=store.store(PICTURE))
+    person.avatar_key = store.store(PICTURE)
+    person.profile_picture_url = 'https://example.com/old.png'
+    stale = person.updated_at = person.updated_at.replace(year=2020)
+    db.session.commit()
+
+    refresh_from_url(person, 'https://example.com/new.png')
+    assert store.wait_idle(5)
+
+    db.session.expire_all()
+    assert person.profile_picture_url == 'https://example.com/new.png'
+    assert person.updated_at > stale
+
+
+def test_fetch_gives_up_after_the_timeout(store, mocker):
+    class Slow:
+        headers = {}
+
+        def raise_for_status(self):
+            pass
+
+        def iter_content(self, chunk_size):
+            while True:
+                time.sleep(0.02)
+                yield b'x'
+
+        def close(self):
+            pass
+
+    mocker.patch.object(store, 'fetch_timeout', 0.05)
+    mocker.patch.object(store.http_client, 'get', return_value=Slow())
+
+    with pytest.raises(AvatarError, match='longer than'):
+        store.fetch('https://example.com/slow.png')
+
@@ -0,0 +1,79 @@
+import datetime
+
+import pytest
+
+from services.user.app.extensions import db
+from services.user.app.models.user_model import Student
+from services.user.app.controllers.directory_controller import encode_cursor, decode_cursor
+from .conftest import recorded_statements
+
+DIRECTORY_URL = '/api/users'
+
+
+@pytest.fixture
+def course(make_course):
+    """Five students, created one second apart; odd ones Approved, the last inactive."""
+    base = datetime.datetime(2025, 1, 1, 12, 0, 0)
+    return make_course(
+        5,
+        user=lambda i: {'is_active': i != 4, 'created_at': base + datetime.timedelta(seconds=i)},
+        student=lambda i: {'application_status': 'Approved' if i % 2 else 'Pending'},
+    )
+
+
+def test_directory_pages_with_cursor(staff_client, course):
+    seen, cursor = [], None
+    for _ in range(3):
+        params = {'course': course, 'limit': 2, **({'cursor': cursor} if cursor else {})}
+        response = staff_client.get(DIRECTORY_URL, query_string=params)
+        assert response.status_code == 200
+        data = response.get_json()
+        seen.extend(user['name'] for user in data['users'])
+        cursor = data['next_cursor']
+        if cursor is None:
+            break
+
+    assert seen == ['Student4', 'Student3', 'Student2', 'Student1', 'Student0']
+    assert cursor is None
+
+
+def test_directory_filters_and_projection(staff_client, course):
+    response = staff_client.get(DIRECTORY_URL, query_string={
+        'course': course, 'application_status': 'Approved', 'is_active': 'true'})
+
+    users = response.get_json()['users']
+    assert [user['name'] for user in users] == ['Student3', 'Student1']
+    assert set(users[0]) == {
+        'user_id', 'email', 'username', 'name', 'surname', 'role', 'is_active', 'created_at',
+        'last_login', 'faculty', 'course', 'year_of_study', 'application_status', 'department'}
+    assert users[0]['course'] == course
+    assert users[0]['department'] is None
+
+
+def test_directory_page_is_one_keyset_query(app, staff_client, course):
+    cursor = encode_cursor(datetime.datetime(2025, 1, 1, 12, 0, 3), 0)
+    with recorded_statements(db.engine) as statements:
+        response = staff_client.get(DIRECTORY_URL, query_string={'course': course, 'cursor': cursor})
+
+    assert [user['name'] for user in response.get_json()['users']] == ['Student2', 'Student1', 'Student0']
+    listing = [s for s in statements if 'LEFT OUTER JOIN student' in s]
+    assert len(listing) == 1
+    assert '(user.created_at, user.user_id) < (?, ?)' in listing[0]
+
+
+def test_directory_rejects_bad_cursor(staff_client):
+    response = staff_client.get(DIRECTORY_URL, query_string={'cursor': 'not-a-cursor'})
+    assert response.status_code == 400
+    assert response.get_json()['error'] == 'Invalid cursor'
+
+
+def test_directory_forbidden_for_students(client, course):
+    student = Student.query.filter_by(course=course).first()
+    with client.session_transaction() as sess:
+        sess['_user_id'] = str(student.student_id)
+    assert client.get(DIRECTORY_URL).status_code == 403
+
+
+def test_cursor_round_trip():
+    created_at = datetime.datetime(2025, 3, 4, 5, 6, 7, 890)
+    assert decode_cursor(encode_cursor(created_at, 42)) == (created_at, 42)
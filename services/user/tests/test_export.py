@@ -0,0 +1,61 @@
+import csv
+import gzip
+import io
+import json
+
+import pytest
+
+from services.user.app.cli import users_cli
+from services.user.app.controllers import export_controller
+
+EXPORT_URL = '/api/users/export'
+
+
+@pytest.fixture
+def course(make_course):
+    return make_course(3, student=lambda i: {'year_of_study': i + 1})
+
+
+def test_export_streams_csv_in_batches(staff_client, course, monkeypatch):
+    monkeypatch.setattr(export_controller, 'EXPORT_BATCH_SIZE', 2)
+    response = staff_client.get(EXPORT_URL, query_string={'course': course, 'columns': 'email,course,year_of_study'})
+
+    assert response.status_code == 200
+    assert response.is_streamed
+    assert response.mimetype == 'text/csv'
+    chunks = list(response.response)
+    assert len(chunks) == 2  # header with the first batch, then the last row
+
+    rows = list(csv.reader(io.StringIO(b''.join(chunks).decode())))
+    assert rows[0] == ['email', 'course', 'year_of_study']
+    assert [row[2] for row in rows[1:]] == ['1', '2', '3']
+    assert all(row[1] == course for row in rows[1:])
+
+
+def test_export_ndjson_gzip(staff_client, course):
+    response = staff_client.get(EXPORT_URL, query_string={'course': course, 'format': 'ndjson'},
+                                headers={'Accept-Encoding': 'gzip'})
+
+    assert response.headers['Content-Encoding'] == 'gzip'
+    lines = gzip.decompress(response.data).decode().splitlines()
+    records = [json.loads(line) for line in lines]
+    assert [record['name'] for record in records] == ['Student0', 'Student1', 'Student2']
+    assert set(records[0]) == set(export_controller.EXPORT_COLUMNS)
+    assert records[0]['department'] is None
+
+
+def test_export_rejects_unknown_columns(staff_client):
+    response = staff_client.get(EXPORT_URL, query_string={'columns': 'email,password_hash'})
+    assert response.status_code == 400
+    assert 'password_hash' in response.get_json()['error']
+
+
+def test_export_cli_gzip(app, course, tmp_path):
+    output = tmp_path / 'students.csv.gz'
+    result = app.test_cli_runner().invoke(
+        users_cli, ['export', str(output), '--course', course, '--columns', 'email', '--gzip'])
+
+    assert result.exit_code == 0, result.output
+    lines = gzip.decompress(output.read_bytes()).decode().splitlines()
+    assert lines[0] == 'email'
+    assert len(lines) == 4
@@ -0,0 +1,86 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+from flask import Flask
+
+from services.user.app.utils.hashing import PasswordHasher, HashPoolFull, canonical_hash_method
+
+
+def make_hasher(**config):
+    app = Flask(__name__)
+    app.config.update(config)
+    hasher = PasswordHasher()
+    hasher.init_app(app)
+    return hasher
+
+
+def test_canonical_hash_method_expands_defaults():
+    assert canonical_hash_method('scrypt') == 'scrypt:32768:8:1'
+    assert canonical_hash_method('pbkdf2:sha256:1000') == 'pbkdf2:sha256:1000'
+    with pytest.raises(ValueError):
+        canonical_hash_method('md5')
+
+
+def test_inline_hash_and_verify():
+    hasher = make_hasher(PASSWORD_HASH_METHOD='pbkdf2:sha256:1000', PASSWORD_HASH_WORKERS=0)
+    pwhash = hasher.hash('Secret123')
+    assert pwhash.startswith('pbkdf2:sha256:1000$')
+    assert hasher.verify(pwhash, 'Secret123')
+    assert not hasher.verify(pwhash, 'wrong')
+
+
+def test_needs_rehash_when_policy_changes():
+    old = make_hasher(PASSWORD_HASH_METHOD='pbkdf2:sha256:1000', PASSWORD_HASH_WORKERS=0)
+    new = make_hasher(PASSWORD_HASH_METHOD='pbkdf2:sha256:2000', PASSWORD_HASH_WORKERS=0)
+    pwhash = old.hash('Secret123')
+    assert not old.needs_rehash(pwhash)
+    assert new.needs_rehash(pwhash)
+
+
+def test_needs_rehash_when_salt_length_changes():
+    old = make_hasher(PASSWORD_HASH_METHOD='pbkdf2:sha256:1000', PASSWORD_SALT_LENGTH=8)
+    new = make_hasher(PASSWORD_HASH_METHOD='pbkdf2:sha256:1000', PASSWORD_SALT_LENGTH=16)
+    assert new.needs_rehash(old.hash('Secret123'))
+
+
+def test_process_pool_hash_and_verify():
+    hasher = make_hasher(PASSWORD_HASH_METHOD='pbkdf2:sha256:1000',
+                         PASSWORD_HASH_WORKERS=1, PASSWORD_HASH_MAX_QUEUE=1, PASSWORD_HASH_TIMEOUT=30)
+    try:
+        pwhash = hasher.hash('Secret123')
+        assert hasher.verify(pwhash, 'Secret123')
+    finally:
+        hasher.shutdown()
+
+
+def test_full_pool_rejects_immediately():
+    hasher = make_hasher(PASSWORD_HASH_WORKERS=1, PASSWORD_HASH_MAX_QUEUE=0, PASSWORD_HASH_RETRY_AFTER=7)
+    hasher._slots.acquire()
+    with pytest.raises(HashPoolFull) as exc_info:
+        hasher.hash('Secret123')
+    assert exc_info.value.retry_after == 7
+    assert hasher.stats()['rejected'] == 1
+
+
+def test_timed_out_job_keeps_its_slot_until_it_finishes(mocker):
+    hasher = make_hasher(PASSWORD_HASH_WORKERS=1, PASSWORD_HASH_MAX_QUEUE=0, PASSWORD_HASH_TIMEOUT=0.05)
+    executor = ThreadPoolExecutor(max_workers=1)
+    mocker.patch.object(hasher, '_get_executor', return_value=executor)
+    release = threading.Event()
+    try:
+        with pytest.raises(HashPoolFull):
+            hasher._submit(release.wait)
+        # The abandoned job is still running, so the pool is still full
+        with pytest.raises(HashPoolFull):
+            hasher._submit(lambda: 'hashed')
+        assert hasher.stats()['rejected'] == 2
+
+        release.set()
+        executor.shutdown(wait=True)
+        executor = ThreadPoolExecutor(max_workers=1)
+        hasher._get_executor.return_value = executor
+        assert hasher._submit(lambda: 'hashed') == 'hashed'
+    finally:
+        release.set()
+        executor.shutdown(wait=True)
@@ -0,0 +1,81 @@
+import io
+import json
+
+from services.user.app.cli import users_cli
+from services.user.app.extensions import db
+from services.user.app.models.user_model import User, Student
+
+from .conftest import make_csv
+
+IMPORT_URL = '/api/users/import'
+
+
+def test_import_csv_creates_users_and_students(staff_client, batch_id):
+    body = make_csv([
+        (f'a_{batch_id}@uni.ac.za', f'a_{batch_id}', 'Alice', 'One', 'Science', 'Maths', '1'),
+        (f'b_{batch_id}@uni.ac.za', '', 'Bob', 'Two', 'Science', 'Maths', ''),
+    ])
+    response = staff_client.post(IMPORT_URL, data={'file': (io.BytesIO(body), 'students.csv')},
+                                 content_type='multipart/form-data')
+
+    assert response.status_code == 200
+    report = response.get_json()
+    assert report == {'processed': 2, 'created': 2, 'invited': 0, 'failed': 0, 'errors': []}
+
+    user = User.query.filter_by(email=f'a_{batch_id}@uni.ac.za').first()
+    assert user.role == 'student'
+    assert user.password_hash is None
+    assert user.student.course == 'Maths'
+    assert user.student.year_of_study == 1
+
+
+def test_import_ndjson_reports_row_errors(staff_client, batch_id):
+    existing = User(email=f'taken_{batch_id}@uni.ac.za', name='Taken', surname='User', role='student')
+    db.session.add(existing)
+    db.session.commit()
+
+    lines = [
+        {'email': f'c_{batch_id}@uni.ac.za', 'name': 'Carol', 'surname': 'Three', 'faculty': 'Arts', 'course': 'History'},
+        {'email': f'C_{batch_id}@uni.ac.za', 'name': 'Carol', 'surname': 'Dup', 'faculty': 'Arts', 'course': 'History'},
+        {'email': f'taken_{batch_id}@uni.ac.za', 'name': 'T', 'surname': 'U', 'faculty': 'Arts', 'course': 'History'},
+        {'email': 'not-an-email', 'name': 'X', 'surname': 'Y', 'faculty': 'Arts', 'course': 'History'},
+    ]
+    body = '\n'.join(json.dumps(line) for line in lines) + '\n{broken\n'
+    response = staff_client.post(f'{IMPORT_URL}?format=ndjson', data=body,
+                                 content_type='application/x-ndjson')
+
+    assert response.status_code == 200
+    report = response.get_json()
+    assert report['processed'] == 5
+    assert report['created'] == 1
+    errors = {error['row']: error['errors'] for error in report['errors']}
+    assert errors[2] == {'email': ['Duplicate email in import file.']}
+    assert errors[3] == {'email': ['Email already registered.']}
+    assert 'email' in errors[4]
+    assert errors[5] == {'row': ['Malformed record.']}
+
+
+def test_import_requires_staff_role(client, db_session, batch_id):
+    student = User(email=f'student_{batch_id}@test.com', name='S', surname='U', role='student')
+    db.session.add(student)
+    db.session.commit()
+    with client.session_transaction() as sess:
+        sess['_user_id'] = str(student.user_id)
+
+    response = client.post(IMPORT_URL, data=make_csv([]), content_type='text/csv')
+    assert response.status_code == 403
+
+
+def test_import_cli_with_small_chunks(app, db_session, batch_id, tmp_path):
+    source = tmp_path / 'students.csv'
+    source.write_bytes(make_csv([
+        (f's{i}_{batch_id}@uni.ac.za', f's{i}_{batch_id}', 'S', str(i), 'Eng', 'Civil', '2')
+        for i in range(5)
+    ]))
+
+    result = app.test_cli_runner().invoke(users_cli, ['import', str(source), '--chunk-size', '2'])
+
+    assert result.exit_code == 0, result.output
+    assert 'Processed 5 rows: 5 created, 0 failed, 0 invited.' in result.output
+    assert Student.query.join(User, User.user_id == Student.student_id) \
+        .filter(User.email.like(f'%{batch_id}%')).count() == 5
@@ -0,0 +1,177 @@
+import uuid
+from urllib.parse import urlsplit, parse_qs
+
+import pytest
+from sqlalchemy import update
+
+from services.user.app.cli import users_cli
+from services.user.app.extensions import db, password_hasher, password_invites, user_cache, lookup_cache
+from services.user.app.models.user_model import User, Student
+from services.user.app.utils.hashing import HashPoolFull
+from .conftest import make_csv
+
+IMPORT_URL = '/api/users/import'
+SETUP_URL = '/api/auth/password/setup'
+PASSWORD = 'Str0ng!Passw0rd'
+
+
+@pytest.fixture
+def invites(app, mocker):
+    """Enables invites and captures the messages they queue instead of sending them."""
+    app.config['MAIL_DEFAULT_SENDER'] = 'noreply@numeraid.org'
+    password_invites.init_app(app)
+    outbox = []
+    mocker.patch.object(password_invites.dispatcher, 'enqueue_many',
+                        side_effect=lambda messages: outbox.extend(messages) or len(outbox))
+    yield outbox
+    password_invites.enabled = False
+    app.config.pop('MAIL_DEFAULT_SENDER')
+
+
+@pytest.fixture
+def invited_user(db_session):
+    user = User(email=f'invitee_{uuid.uuid4().hex[:8]}@test.com', name='Invitee', surname='User', role='student')
+    db.session.add(user)
+    db.session.commit()
+    yield user
+    db.session.rollback()
+    db.session.delete(user)
+    db.session.commit()
+
+
+def token_from(message):
+    link = next(line for line in message.body.splitlines() if line.startswith('http'))
+    return parse_qs(urlsplit(link).query)['token'][0]
+
+
+def setup(client, token, password=PASSWORD, confirm=None):
+    return client.post(SETUP_URL, json={'token': token, 'password': password, 'confirm_password': confirm or password})
+
+
+def test_invite_sets_the_first_password(client, invites, invited_user):
+    assert password_invites.send([(invited_user.user_id, invited_user.email, invited_user.name)]) == 1
+    assert invites[0].recipients == [invited_user.email]
+
+    response = setup(client, token_from(invites[0]))
+
+    assert response.status_code == 200
+    db.session.refresh(invited_user)
+    assert invited_user.check_password(PASSWORD)
+    login = client.post('/api/auth/login', json={'email': invited_user.email, 'password': PASSWORD})
+    assert login.status_code == 200
+
+
+def test_invite_cannot_be_redeemed_twice(client, invites, invited_user):
+    token = password_invites.token(invited_user.user_id)
+    assert setup(client, token).status_code == 200
+
+    response = setup(client, token, password='An0ther!Passw0rd')
+
+    assert response.status_code == 400
+    db.session.refresh(invited_user)
+    assert invited_user.check_password(PASSWORD)
+
+
+def test_redemption_drops_cached_copies_of_the_user(client, invites, invited_user, monkeypatch):
+    monkeypatch.setattr(lookup_cache, 'ttl', 30)
+    user_cache.load(db.session, User, invited_user.user_id)
+    lookup_cache.set(('id', invited_user.user_id), {'user_id': invited_user.user_id})
+    lookup_cache.set(('email', invited_user.email), {'user_id': invited_user.user_id})
+
+    assert setup(client, password_invites.token(invited_user.user_id)).status_code == 200
+
+    assert user_cache.get(invited_user.user_id) is None
+    assert lookup_cache.get(('id', invited_user.user_id)) is None
+    assert lookup_cache.get(('email', invited_user.email)) is None
+
+
+def test_concurrent_redemption_keeps_the_first_password(client, invites, invited_user, mocker):
+    token = password_invites.token(invited_user.user_id)
+    first_hash = password_hasher.hash(PASSWORD)
+    hash_password = password_hasher.hash
+
+    def redeemed_while_hashing(password):
+        # The other redemption commits after this one checked, but before it writes
+        db.session.execute(update(User).where(User.user_id == invited_user.user_id)
+                           .values(password_hash=first_hash))
+        db.session.commit()
+        return hash_password(password)
+
+    mocker.patch.object(password_hasher, 'hash', side_effect=redeemed_while_hashing)
+    response = setup(client, token, password='An0ther!Passw0rd')
+
+    assert response.status_code == 400
+    assert response.get_json() == {'message': 'Password has already been set.'}
+    db.session.refresh(invited_user)
+    assert invited_user.check_password(PASSWORD)
+
+
+def test_invite_rejects_bad_and_expired_tokens(client, invites, invited_user, mocker):
+    assert setup(client, 'not-a-token').get_json() == {'message': 'Invalid or expired invite.'}
+
+    token = password_invites.token(invited_user.user_id)
+    mocker.patch.object(password_invites, 'ttl', -1)
+    assert setup(client, token).status_code == 400
+    db.session.refresh(invited_user)
+    assert invited_user.password_hash is None
+
+
+def test_invite_validates_the_password(client, invites, invited_user):
+    token = password_invites.token(invited_user.user_id)
+
+    response = setup(client, token, confirm='Different!Passw0rd')
+
+    assert response.status_code == 400
+    assert 'confirm_password' in response.get_json()['errors']
+
+
+def test_setup_is_unavailable_without_invites(client, invited_user):
+    assert setup(client, 'anything').status_code == 404
+
+
+def test_import_invites_users_without_passwords(staff_client, batch_id, invites):
+    body = make_csv([
+        (f'i{i}_{batch_id}@uni.ac.za', '', 'Imported', str(i), 'Science', 'Maths', '1') for i in range(3)
+    ])
+    response = staff_client.post(IMPORT_URL, data=body, content_type='text/csv')
+
+    assert response.status_code == 200
+    assert response.get_json()['invited'] == 3
+    assert sorted(message.recipients[0] for message in invites) == [f'i{i}_{batch_id}@uni.ac.za' for i in range(3)]
+    user = User.query.filter_by(email=invites[0].recipients[0]).one()
+    assert password_invites.verify(token_from(invites[0])) == user.user_id
+
+
+def test_import_stops_with_503_when_the_hashing_pool_is_full(app, staff_client, batch_id, mocker):
+    mocker.patch.dict(app.config, {'IMPORT_CHUNK_SIZE': 2})
+    mocker.patch('services.user.app.controllers.import_controller.password_hasher.hash',
+                 side_effect=['hash-0', 'hash-1', HashPoolFull(4)])
+    body = 'email,name,surname,faculty,course,password\n' + ''.join(
+        f'p{i}_{batch_id}@uni.ac.za,Pooled,{i},Science,Maths,Secret!123\n' for i in range(4)
+    )
+
+    response = staff_client.post(f'{IMPORT_URL}?with_passwords=true', data=body.encode(), content_type='text/csv')
+
+    assert response.status_code == 503
+    assert response.headers['Retry-After'] == '4'
+    report = response.get_json()
+    assert report['retry_after'] == 4
+    assert report['resume_row'] == 4
+    assert report['created'] == 2
+    assert User.query.filter(User.email.like(f'p%_{batch_id}@uni.ac.za')).count() == 2
+
+
+def test_import_cli_fails_when_the_hashing_pool_is_full(app, batch_id, tmp_path, mocker):
+    mocker.patch('services.user.app.controllers.import_controller.password_hasher.hash', side_effect=HashPoolFull(2))
+    source = tmp_path / 'students.csv'
+    source.write_bytes(
+        b'email,name,surname,faculty,course,password\n'
+        + f'c_{batch_id}@uni.ac.za,C,L,Eng,Civil,Secret!123\n'.encode()
+    )
+
+    result = app.test_cli_runner().invoke(users_cli, ['import', str(source), '--with-passwords'])
+
+    assert result.exit_code != 0
+    assert 'Retry them in 2s' in result.output
+    assert Student.query.join(User, User.user_id == Student.student_id) \
+        .filter(User.email == f'c_{batch_id}@uni.ac.za').count() == 0
@@ -0,0 +1,120 @@
+import json
+import uuid
+import decimal
+import datetime
+
+import pytest
+from flask import Flask
+
+from services.user.app.utils import json_provider
+from services.user.app.utils.json_provider import JSONProvider, resolve_backend
+
+BACKENDS = ['stdlib', 'orjson']
+
+
+def make_app(backend, **config):
+    app = Flask(__name__)
+    app.config.update(JSON_BACKEND=backend, **config)
+    app.json = JSONProvider(app)
+    return app
+
+
+def user_payload():
+    return {
+        "user_id": 7,
+        "email": "ana@numeraid.org",
+        "name": "Ana",
+        "surname": "Müller",
+        "is_active": True,
+        "created_at": datetime.datetime(2026, 3, 1, 9, 30, 0, 123456),
+        "last_login": datetime.datetime(2026, 3, 2, 8, 0, tzinfo=datetime.timezone.utc),
+        "updated_at": None,
+        "student": {"year_of_study": 2, "enrolled_on": datetime.date(2025, 9, 1)},
+    }
+
+
+@pytest.mark.parametrize('backend', BACKENDS)
+def test_datetimes_are_iso_8601(backend):
+    data = json.loads(make_app(backend).json.dumps(user_payload()))
+
+    assert data['created_at'] == '2026-03-01T09:30:00.123456'
+    assert data['last_login'] == '2026-03-02T08:00:00+00:00'
+    assert data['student']['enrolled_on'] == '2025-09-01'
+    assert data['updated_at'] is None
+
+
+def test_backends_produce_the_same_document():
+    payload = {"users": [user_payload() for _ in range(3)], "next_cursor": None}
+
+    stdlib, fast = (make_app(backend).json.dumpb(payload) for backend in BACKENDS)
+
+    assert json.loads(stdlib) == json.loads(fast)
+    # Both sort keys, so documents list fields in the same order
+    assert list(json.loads(stdlib)['users'][0]) == list(json.loads(fast)['users'][0])
+
+
+@pytest.mark.parametrize('backend', BACKENDS)
+def test_other_types(backend):
+    value = uuid.uuid4()
+    data = json.loads(make_app(backend).json.dumps({
+        "amount": decimal.Decimal('1.50'), "id": value, "by_year": {2: 'second', 1: 'first'},
+    }))
+
+    assert data == {"amount": '1.50', "id": str(value), "by_year": {"1": 'first', "2": 'second'}}
+
+
+@pytest.mark.parametrize('backend', BACKENDS)
+def test_unknown_types_raise(backend):
+    with pytest.raises(TypeError):
+        make_app(backend).json.dumps({"value": object()})
+
+
+@pytest.mark.parametrize('backend', BACKENDS)
+def test_response(backend):
+    app = make_app(backend)
+    with app.app_context():
+        response = app.json.response({"b": 1, "a": datetime.datetime(2026, 1, 1)})
+
+    assert response.mimetype == 'application/json'
+    assert response.get_data() == b'{"a":"2026-01-01T00:00:00","b":1}\n'
+
+
+@pytest.mark.parametrize('backend', BACKENDS)
+def test_response_is_indented_in_debug(backend):
+    app = make_app(backend)
+    app.debug = True
+    with app.app_context():
+        response = app.json.response({"a": 1})
+
+    assert response.get_data() == b'{\n  "a": 1\n}\n'
+
+
+@pytest.mark.parametrize('backend', BACKENDS)
+def test_request_bodies_are_parsed(backend):
+    app = make_app(backend)
+
+    @app.post('/echo')
+    def echo():
+        from flask import request
+        return request.get_json()
+
+    client = app.test_client()
+    response = client.post('/echo', data='{"name": "Zoë"}', content_type='application/json')
+    assert response.get_json() == {"name": "Zoë"}
+
+    response = client.post('/echo', data='{"name": ', content_type='application/json')
+    assert response.status_code == 400
+
+
+def test_auto_falls_back_to_stdlib(monkeypatch):
+    monkeypatch.setattr(json_provider, 'orjson', None)
+
+    assert resolve_backend('auto') == 'stdlib'
+    assert make_app('auto').json.dumps({"at": datetime.date(2026, 1, 1)}) == '{"at": "2026-01-01"}'
+    with pytest.raises(RuntimeError):
+        resolve_backend('orjson')
+
+
+def test_unknown_backend_is_rejected():
+    with pytest.raises(ValueError):
+        resolve_backend('simplejson')
@@ -0,0 +1,102 @@
+import time
+import uuid
+import datetime
+
+import pytest
+
+from services.user.app.extensions import db
+from services.user.app.models.user_model import User
+from services.user.app.utils.last_login import LastLoginBuffer
+from .conftest import recorded_statements
+
+UTC = datetime.timezone.utc
+
+
+@pytest.fixture
+def login_users(db_session):
+    users = [User(email=f'last-login-{uuid.uuid4().hex[:8]}@test.com', name='Last', surname='Login', role='student')
+             for _ in range(3)]
+    for user in users:
+        user.set_password('testpassword')
+    db.session.add_all(users)
+    db.session.commit()
+    yield users
+    for user in users:
+        db.session.delete(user)
+    db.session.commit()
+
+
+@pytest.fixture
+def buffer(app):
+    buffer = LastLoginBuffer()
+    buffer.init_app(app)
+    buffer.interval = 3600  # flushed by hand unless a test shortens it
+    yield buffer
+    buffer.shutdown()
+
+
+def stored_last_login(user_id):
+    db.session.expire_all()
+    value = db.session.get(User, user_id).last_login
+    return value.replace(tzinfo=UTC) if value is not None else None
+
+
+def test_logins_are_coalesced_into_one_bulk_update(buffer, login_users):
+    first, second = login_users[0].user_id, login_users[1].user_id
+    t0 = datetime.datetime(2026, 3, 1, 8, 0, tzinfo=UTC)
+    buffer.record(first, t0)
+    buffer.record(first, t0 + datetime.timedelta(minutes=5))
+    buffer.record(first, t0 + datetime.timedelta(minutes=1))
+    buffer.record(second, t0)
+
+    with recorded_statements(db.engine) as statements:
+        assert buffer.flush() == 2
+
+    assert [s for s in statements if s.startswith('UPDATE')] == [statements[0]]
+    assert stored_last_login(first) == t0 + datetime.timedelta(minutes=5)
+    assert stored_last_login(second) == t0
+    assert buffer.stats()['recorded'] == 4
+    assert buffer.stats()['rows_written'] == 2
+
+
+def test_flush_never_moves_last_login_backwards(buffer, login_users):
+    user_id = login_users[0].user_id
+    newer = datetime.datetime(2026, 3, 2, tzinfo=UTC)
+    buffer.record(user_id, newer)
+    buffer.flush()
+
+    buffer.record(user_id, newer - datetime.timedelta(days=1))
+    buffer.flush()
+
+    assert stored_last_login(user_id) == newer
+
+
+def test_worker_flushes_on_interval(buffer, login_users):
+    buffer.interval = 0.05
+    user_id = login_users[2].user_id
+    buffer.record(user_id)
+
+    # pending empties when the worker takes the batch, rows_written once it is committed
+    deadline = time.monotonic() + 5
+    while not buffer.stats()['rows_written'] and time.monotonic() < deadline:
+        time.sleep(0.01)
+
+    assert buffer.stats()['pending'] == 0
+    assert stored_last_login(user_id) is not None
+
+
+def test_login_does_not_write_the_user_row(client, buffer, login_users, mocker):
+    mocker.patch('services.user.app.controllers.auth_controller.login_user')
+    mocker.patch('services.user.app.controllers.auth_controller.last_login_buffer', buffer)
+    user = login_users[0]
+    data = {'email': user.email, 'password': 'testpassword', 'remember': False}
+
+    with recorded_statements(db.engine) as statements:
+        response = client.post('/api/auth/login', json=data)
+
+    assert response.status_code == 200
+    assert not [s for s in statements if s.startswith('UPDATE')]
+    assert buffer.stats()['pending'] == 1
+
+    buffer.flush()
+    assert stored_last_login(user.user_id) is not None
@@ -0,0 +1,104 @@
+import time
+
+import pytest
+from flask import Flask
+from flask_mail import Mail, Message
+
+from services.user.app.utils.mail_queue import MailDispatcher
+from .smtp_stub import SMTPStub
+
+
+@pytest.fixture
+def smtp_stub():
+    with SMTPStub() as stub:
+        yield stub
+
+
+def make_dispatcher(smtp_stub, **config):
+    app = Flask(__name__)
+    app.config.update(
+        MAIL_SERVER='127.0.0.1',
+        MAIL_PORT=smtp_stub.port,
+        MAIL_DEFAULT_SENDER='no-reply@numeraid.test',
+        MAIL_SUPPRESS_SEND=False,
+        **config,
+    )
+    mail = Mail()
+    mail.init_app(app)
+    dispatcher = MailDispatcher(mail)
+    dispatcher.init_app(app)
+    return app, dispatcher
+
+
+@pytest.fixture
+def dispatcher(smtp_stub):
+    app, dispatcher = make_dispatcher(smtp_stub, MAIL_BATCH_SIZE=10, MAIL_RETRY_BACKOFF=0.05, MAIL_MAX_RETRIES=2)
+    with app.app_context():
+        yield dispatcher
+    dispatcher.shutdown()
+
+
+def notice(i):
+    return Message(subject=f'Status update {i}', recipients=[f'student{i}@uni.test'], body='Approved')
+
+
+def test_enqueue_returns_without_waiting_for_smtp(dispatcher, smtp_stub):
+    started = time.perf_counter()
+    assert dispatcher.enqueue(notice(0))
+    assert time.perf_counter() - started < 0.05
+
+    assert dispatcher.wait_idle(timeout=5)
+    assert len(smtp_stub.messages) == 1
+    mail_from, recipients, message = smtp_stub.messages[0]
+    assert recipients == ['student0@uni.test']
+    assert message['Subject'] == 'Status update 0'
+
+
+def test_bulk_notifications_share_connections(dispatcher, smtp_stub):
+    assert dispatcher.enqueue_many(notice(i) for i in range(25)) == 25
+    assert dispatcher.wait_idle(timeout=5)
+
+    stats = dispatcher.stats()
+    assert stats['sent'] == 25
+    assert len(smtp_stub.messages) == 25
+    # One connection per batch of up to MAIL_BATCH_SIZE, never one per message
+    assert smtp_stub.connections == stats['connections'] == stats['batches']
+    assert stats['connections'] <= 5
+
+
+def test_temporary_failures_are_retried(dispatcher, smtp_stub):
+    smtp_stub.data_failures = [451]
+    dispatcher.enqueue(notice(1))
+    assert dispatcher.wait_idle(timeout=5)
+
+    stats = dispatcher.stats()
+    assert stats['retried'] == 1
+    assert stats['sent'] == 1
+    assert len(smtp_stub.messages) == 1
+
+
+def test_permanent_and_exhausted_failures_are_counted(dispatcher, smtp_stub):
+    smtp_stub.refused_recipients = {'student2@uni.test'}
+    smtp_stub.data_failures = [451, 451, 451]
+    dispatcher.enqueue(notice(2))
+    dispatcher.enqueue(notice(3))
+    assert dispatcher.wait_idle(timeout=5)
+
+    stats = dispatcher.stats()
+    assert stats['failed'] == 2
+    assert stats['retried'] == 2
+    assert smtp_stub.messages == []
+
+
+def test_full_queue_drops_and_counts(smtp_stub):
+    app, dispatcher = make_dispatcher(smtp_stub, MAIL_QUEUE_SIZE=2)
+    dispatcher._worker.ensure()
+    dispatcher._worker.stopping.set()  # park the worker so the queue fills up
+    dispatcher._worker.join()
+
+    with app.app_context():
+        accepted = dispatcher.enqueue_many(notice(i) for i in range(5))
+
+    assert accepted == 2
+    assert dispatcher.stats()['dropped'] == 3
+    assert dispatcher.stats()['queued'] == 2
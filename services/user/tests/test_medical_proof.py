@@ -0,0 +1,190 @@
+import io
+import os
+import hashlib
+
+import pytest
+
+from services.user.app.extensions import db, proof_store
+from services.user.app.models.user_model import Student
+from services.user.app.utils.file_store import ContentStore, FileTooLarge
+from .conftest import create_role_users, login_as
+
+PDF = b'%PDF-1.7\n' + b'scanned page\n' * 5000 + b'%%EOF\n'
+PNG = b'\x89PNG\r\n\x1a\n' + b'\x00' * 1000
+
+
+@pytest.fixture
+def store(app, tmp_path):
+    app.config.update(MEDICAL_PROOF_DIR=str(tmp_path), MEDICAL_PROOF_MAX_BYTES=128 * 1024,
+                      MEDICAL_PROOF_CHUNK_SIZE=4096)
+    proof_store.init_app(app)
+    yield proof_store
+    for key in ('MEDICAL_PROOF_DIR', 'MEDICAL_PROOF_MAX_BYTES', 'MEDICAL_PROOF_CHUNK_SIZE'):
+        app.config.pop(key)
+
+
+@pytest.fixture
+def people(db_session):
+    users = create_role_users(2, 'student') + create_role_users(1, 'staff')
+    yield users
+    for user in users:
+        db.session.delete(user)
+    db.session.commit()
+
+
+def upload(client, body, content_type='application/pdf'):
+    return client.put('/api/profile/me/medical-proof', data=body, content_type=content_type)
+
+
+def stored_files(root):
+    return sorted(name for _, _, names in os.walk(root) for name in names)
+
+
+def test_content_store_hashes_while_writing(store):
+    key, size, created = store.save(store.chunks(io.BytesIO(PDF)), 'pdf')
+
+    digest = hashlib.sha256(PDF).hexdigest()
+    assert key == f'{digest[:2]}/{digest}.pdf'
+    assert (size, created) == (len(PDF), True)
+    with open(store.path(key), 'rb') as fh:
+        assert fh.read() == PDF
+
+
+def test_content_store_stops_at_the_limit(tmp_path):
+    store = ContentStore()
+    store.root, store.max_bytes = str(tmp_path), 10
+    read = []
+
+    def chunks():
+        for chunk in (b'a' * 6, b'b' * 6, b'c' * 6):
+            read.append(chunk)
+            yield chunk
+
+    with pytest.raises(FileTooLarge):
+        store.save(chunks(), 'pdf')
+    assert len(read) == 2
+    assert stored_files(tmp_path) == []
+
+
+@pytest.mark.parametrize('key', ['../etc/passwd', 'ab/abc.pdf', 'zz/' + 'a' * 64 + '.pdf', 'aa/' + 'a' * 64 + '.p/f'])
+def test_content_store_rejects_non_keys(store, key):
+    with pytest.raises(ValueError):
+        store.path(key)
+
+
+def test_upload_stores_proof(client, store, people):
+    student = people[0]
+    login_as(client, student)
+
+    response = upload(client, PDF)
+
+    assert response.status_code == 201
+    body = response.get_json()
+    assert body['sha256'] == hashlib.sha256(PDF).hexdigest()
+    assert body['size'] == len(PDF)
+    assert body['deduplicated'] is False
+    path = db.session.get(Student, student.user_id).medical_proof_path
+    assert path == f"{body['sha256'][:2]}/{body['sha256']}.pdf"
+
+
+def test_identical_uploads_are_stored_once(client, store, people):
+    login_as(client, people[0])
+    upload(client, PDF)
+    login_as(client, people[1])
+
+    response = upload(client, PDF)
+
+    assert response.get_json()['deduplicated'] is True
+    assert len(stored_files(os.path.join(store.root))) == 1
+    assert store.stats()['deduplicated'] == 1
+
+
+def test_multipart_upload(client, store, people):
+    login_as(client, people[0])
+
+    response = client.put('/api/profile/me/medical-proof', content_type='multipart/form-data',
+                          data={'file': (io.BytesIO(PNG), 'scan.png')})
+
+    assert response.status_code == 201
+    assert db.session.get(Student, people[0].user_id).medical_proof_path.endswith('.png')
+
+
+def test_oversized_upload_is_rejected_from_content_length(client, store, people, mocker):
+    login_as(client, people[0])
+    save = mocker.spy(store, 'save')
+
+    response = upload(client, PDF + b'x' * store.max_bytes)
+
+    assert response.status_code == 413
+    save.assert_not_called()
+
+
+def test_oversized_upload_without_length_stops_streaming(client, store, people):
+    login_as(client, people[0])
+    body = io.BytesIO(b'%PDF-1.7\n' + b'x' * (store.max_bytes * 4))
+
+    # Chunked transfer: no Content-Length to check up front
+    response = client.put('/api/profile/me/medical-proof', input_stream=body, content_type='application/pdf',
+                          headers={'Transfer-Encoding': 'chunked'},
+                          environ_overrides={'wsgi.input_terminated': True})
+
+    assert response.status_code == 413
+    assert body.tell() < store.max_bytes * 2
+    assert stored_files(store.root) == []
+    assert db.session.get(Student, people[0].user_id).medical_proof_path is None
+
+
+def test_unknown_file_type_is_rejected(client, store, people):
+    login_as(client, people[0])
+
+    response = upload(client, b'MZ\x90\x00 not a scan', content_type='application/pdf')
+
+    assert response.status_code == 415
+    assert stored_files(store.root) == []
+
+
+def test_only_students_upload(client, store, people):
+    login_as(client, people[2])
+
+    assert upload(client, PDF).status_code == 403
+
+
+def test_download_supports_range_and_validators(client, store, people):
+    login_as(client, people[0])
+    digest = upload(client, PDF).get_json()['sha256']
+
+    response = client.get('/api/profile/me/medical-proof')
+    assert response.status_code == 200
+    assert response.data == PDF
+    assert response.mimetype == 'application/pdf'
+    assert response.headers['ETag'] == f'"{digest}"'
+    assert response.headers['Accept-Ranges'] == 'bytes'
+    assert 'private' in response.headers['Cache-Control']
+
+    response = client.get('/api/profile/me/medical-proof', headers={'Range': 'bytes=0-9'})
+    assert response.status_code == 206
+    assert response.data == PDF[:10]
+    assert response.headers['Content-Range'] == f'bytes 0-9/{len(PDF)}'
+
+    response = client.get('/api/profile/me/medical-proof', headers={'If-None-Match': f'"{digest}"'})
+    assert response.status_code == 304
+
+
+def test_staff_download_student_proof(client, store, people):
+    student, staff = people[0], people[2]
+    login_as(client, student)
+    upload(client, PDF)
+
+    login_as(client, staff)
+    response = client.get(f'/api/users/{student.user_id}/medical-proof')
+    assert response.status_code == 200
+    assert response.data == PDF
+
+    login_as(client, people[1])
+    assert client.get(f'/api/users/{student.user_id}/medical-proof').status_code == 403
+
+
+def test_download_without_proof(client, store, people):
+    login_as(client, people[0])
+
+    assert client.get('/api/profile/me/medical-proof').status_code == 404
@@ -1,6 +1,7 @@
 from unittest.mock import patch
 
 
+
 def test_google_auth_route(client, app):
     with app.app_context():
         app.config['GOOGLE_CLIENT_ID'] = 'test-client-id'
@@ -33,7 +34,7 @@ def test_google_callback_token_exchange_error(client, app):
         app.config['GOOGLE_CLIENT_ID'] = 'id'
         app.config['GOOGLE_CLIENT_SECRET'] = 'secret'
         app.config['GOOGLE_REDIRECT_URI'] = 'uri'
-        with patch('services.user.app.controllers.oauth_controller.requests.post', side_effect=Exception('fail')):
+        with patch('services.user.app.controllers.oauth_controller.http_client.post', side_effect=Exception('fail')):
             response = client.get('/api/oauth/google/callback?code=badcode')
             assert response.status_code == 500
 
@@ -43,10 +44,10 @@ def test_google_callback_invalid_token(client, app):
         app.config['GOOGLE_CLIENT_ID'] = 'id'
         app.config['GOOGLE_CLIENT_SECRET'] = 'secret'
         app.config['GOOGLE_REDIRECT_URI'] = 'uri'
-        with patch('services.user.app.controllers.oauth_controller.requests.post') as mock_post:
+        with patch('services.user.app.controllers.oauth_controller.http_client.post') as mock_post:
             mock_post.return_value.json.return_value = {'id_token': 'badtoken'}
             mock_post.return_value.raise_for_status = lambda: None
-            with patch('services.user.app.controllers.oauth_controller.jwt.decode', side_effect=Exception('bad jwt')):
+            with patch('services.user.app.controllers.oauth_controller.google_jwks.decode', side_effect=Exception('bad jwt')):
                 response = client.get('/api/oauth/google/callback?code=code')
                 assert response.status_code == 500
                 assert 'Invalid token' in response.get_json()['error']
@@ -65,10 +66,10 @@ def test_google_callback_success_new_user(client, app, db_session, mocker):
             'family_name': 'User',
             'picture': 'http://pic.url'
         }
-        with patch('services.user.app.controllers.oauth_controller.requests.post') as mock_post:
+        with patch('services.user.app.controllers.oauth_controller.http_client.post') as mock_post:
             mock_post.return_value.json.return_value = fake_tokens
             mock_post.return_value.raise_for_status = lambda: None
-            with patch('services.user.app.controllers.oauth_controller.jwt.decode', return_value=fake_userinfo):
+            with patch('services.user.app.controllers.oauth_controller.google_jwks.decode', return_value=fake_userinfo):
                 mock_login_user = mocker.patch('services.user.app.controllers.oauth_controller.login_user')
                 response = client.get('/api/oauth/google/callback?code=code')
                 assert response.status_code == 302
@@ -98,12 +99,70 @@ def test_google_callback_success_existing_user(client, app, db_session, mocker):
             'family_name': 'User',
             'picture': 'http://pic.url'
         }
-        with patch('services.user.app.controllers.oauth_controller.requests.post') as mock_post:
+        with patch('services.user.app.controllers.oauth_controller.http_client.post') as mock_post:
             mock_post.return_value.json.return_value = fake_tokens
             mock_post.return_value.raise_for_status = lambda: None
-            with patch('services.user.app.controllers.oauth_controller.jwt.decode', return_value=fake_userinfo):
+            with patch('services.user.app.controllers.oauth_controller.google_jwks.decode', return_value=fake_userinfo):
                 mock_login_user = mocker.patch('services.user.app.controllers.oauth_controller.login_user')
                 response = client.get('/api/oauth/google/callback?code=code')
                 assert response.status_code == 302
                 assert response.headers['Location'].endswith('/student/dashboard')
                 mock_login_user.assert_called_once()
+
+
+def test_google_callback_verifies_token_against_stub(client, google_stub, mocker):
+    from services.user.app.models.user_model import User
+    mocker.patch('services.user.app.controllers.oauth_controller.login_user')
+    google_stub.claims = {'sub': 'stub-sub-1', 'email': 'verified@stub.example.com'}
+
+    first = client.get('/api/oauth/google/callback?code=one')
+    second = client.get('/api/oauth/google/callback?code=two')
+
+    assert first.status_code == 302
+    assert second.status_code == 302
+    assert User.query.filter_by(social_provider_id='stub-sub-1').count() == 1
+    # Keys are fetched once and both token exchanges share one keep-alive connection
+    assert google_stub.count('GET', '/certs') == 1
+    assert google_stub.count('POST', '/token') == 2
+    assert len({port for method, path, port in google_stub.requests}) == 1
+
+
+def test_google_callback_never_replays_token_exchange(client, google_stub):
+    google_stub.token_status = 503
+
+    response = client.get('/api/oauth/google/callback?code=single-use')
+
+    assert response.status_code == 500
+    assert google_stub.count('POST', '/token') == 1
+
+
+def test_google_callback_refreshes_keys_on_unknown_kid(client, google_stub, mocker):
+    mocker.patch('services.user.app.controllers.oauth_controller.login_user')
+    google_stub.claims = {'sub': 'stub-sub-2', 'email': 'rotated@stub.example.com'}
+
+    assert client.get('/api/oauth/google/callback?code=one').status_code == 302
+    google_stub.rotate_key('key-2')
+    assert client.get('/api/oauth/google/callback?code=two').status_code == 302
+
+    assert google_stub.count('GET', '/certs') == 2
+
+
+def test_google_callback_rejects_forged_signature(client, google_stub):
+    from cryptography.hazmat.primitives.asymmetric import rsa
+    forged_key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+    forged = google_stub.id_token(private_key=forged_key, kid='key-1')
+
+    with patch.object(google_stub, 'id_token', return_value=forged):
+        response = client.get('/api/oauth/google/callback?code=code')
+
+    assert response.status_code == 500
+    assert 'Invalid token' in response.get_json()['error']
+
+
+def test_google_callback_rejects_wrong_audience(client, google_stub):
+    google_stub.claims = {'aud': 'someone-else'}
+
+    response = client.get('/api/oauth/google/callback?code=code')
+
+    assert response.status_code == 500
+    assert 'Invalid token' in response.get_json()['error']
@@ -0,0 +1,73 @@
+import pytest
+from sqlalchemy import create_engine, exc, text
+
+from services.user.app.utils.pool_metrics import PoolMetrics
+from services.user.config import _engine_options
+
+
+@pytest.fixture
+def metrics_engine(tmp_path):
+    metrics = PoolMetrics()
+    engine = create_engine(f'sqlite:///{tmp_path / "pool.db"}', poolclass=metrics.pool_class,
+                           pool_size=1, max_overflow=0, pool_timeout=0.1)
+    yield metrics, engine
+    engine.dispose()
+
+
+def test_pool_metrics_counts_checkouts_and_churn(metrics_engine):
+    metrics, engine = metrics_engine
+
+    for _ in range(3):
+        with engine.connect() as conn:
+            conn.execute(text('SELECT 1'))
+    engine.dispose()
+
+    stats = metrics.stats(engine)
+    assert stats['pool_class'] == 'TimedQueuePool'
+    assert stats['checkouts'] == 3
+    assert stats['connections_opened'] == 1
+    assert stats['connections_closed'] == 1
+    assert stats['checked_out'] == 0
+
+
+def test_pool_metrics_records_checkout_timeouts(metrics_engine):
+    metrics, engine = metrics_engine
+
+    with engine.connect():
+        assert metrics.stats(engine)['checked_out'] == 1
+        with pytest.raises(exc.TimeoutError):
+            engine.connect()
+
+    stats = metrics.stats(engine)
+    assert stats['checkout_timeouts'] == 1
+    assert stats['checkout_wait_max_ms'] >= 100
+
+
+def test_engine_options_from_environment(monkeypatch):
+    monkeypatch.setenv('DB_POOL_SIZE', '12')
+    monkeypatch.setenv('DB_POOL_PRE_PING', 'false')
+    monkeypatch.setenv('DB_STATEMENT_TIMEOUT_MS', '5000')
+
+    options = _engine_options('postgresql://user:pass@db/users')
+
+    assert options['pool_size'] == 12
+    assert options['pool_pre_ping'] is False
+    assert options['connect_args'] == {'options': '-c statement_timeout=5000'}
+    assert _engine_options('sqlite:///:memory:') == {}
+
+
+def test_internal_stats_endpoint(client, app):
+    response = client.get('/api/internal/stats')
+    assert response.status_code == 200
+    data = response.get_json()
+    assert {'db_pool', 'user_cache', 'password_hasher'} <= data.keys()
+
+
+def test_internal_stats_requires_token_when_configured(client, app):
+    app.config['INTERNAL_API_TOKEN'] = 'secret-token'
+    try:
+        assert client.get('/api/internal/stats').status_code == 403
+        response = client.get('/api/internal/stats', headers={'X-Internal-Token': 'secret-token'})
+        assert response.status_code == 200
+    finally:
+        app.config['INTERNAL_API_TOKEN'] = None
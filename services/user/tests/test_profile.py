@@ -1,6 +1,9 @@
 import pytest
-from services.user.app.models.user_model import User
+from sqlalchemy import select, update
+
+from services.user.app.models.user_model import User, Student, role_loader_options
 from services.user.app.extensions import db
+from .conftest import assert_queries, create_role_users, login_as
 
 def create_test_user():
     user = User(
@@ -57,6 +60,170 @@ def test_update_profile_authenticated(authenticated_client, test_user):
     assert test_user.name == 'Updated'
     assert test_user.username == 'updateduser'
 
+def test_update_profile_rejects_invalid_fields(authenticated_client, test_user):
+    name = test_user.name
+    response = authenticated_client.put('/api/profile/me', json={'name': 'Ok', 'username': 'ab', 'surname': ''})
+    assert response.status_code == 400
+    assert response.get_json()['errors'] == {
+        'username': ['Field must be between 3 and 50 characters long.'],
+        'surname': ['This field is required.'],
+    }
+    db.session.refresh(test_user)
+    assert test_user.name == name
+
+def test_update_profile_rejects_taken_username(authenticated_client, test_user):
+    other = User(email='taken@test.com', username='takenname', name='Other', surname='User', role='student')
+    db.session.add(other)
+    db.session.commit()
+
+    response = authenticated_client.put('/api/profile/me', json={'name': 'Test', 'surname': 'User',
+                                                                 'username': 'takenname'})
+
+    assert response.status_code == 400
+    assert response.get_json() == {'message': 'Username already taken.'}
+    db.session.refresh(test_user)
+    assert test_user.username == 'testuser'
+    db.session.delete(other)
+    db.session.commit()
+
 def test_update_profile_unauthenticated(client):
     response = client.put('/api/profile/me', json={'name': 'X'})
     assert response.status_code == 401
+
+def test_get_profile_sets_validators(authenticated_client):
+    response = authenticated_client.get('/api/profile/me')
+    assert response.headers['ETag'].startswith('"')
+    assert response.headers['Last-Modified']
+    assert 'no-cache' in response.headers['Cache-Control']
+
+def test_get_profile_if_none_match_returns_304(authenticated_client):
+    etag = authenticated_client.get('/api/profile/me').headers['ETag']
+
+    response = authenticated_client.get('/api/profile/me', headers={'If-None-Match': etag})
+    assert response.status_code == 304
+    assert response.data == b''
+    assert response.headers['ETag'] == etag
+
+def test_get_profile_if_modified_since_returns_304(authenticated_client):
+    last_modified = authenticated_client.get('/api/profile/me').headers['Last-Modified']
+
+    response = authenticated_client.get('/api/profile/me', headers={'If-Modified-Since': last_modified})
+    assert response.status_code == 304
+
+def test_update_profile_changes_etag(authenticated_client, test_user):
+    etag = authenticated_client.get('/api/profile/me').headers['ETag']
+
+    # Saving identical values keeps the validator
+    authenticated_client.put('/api/profile/me', json={'name': test_user.name})
+    assert authenticated_client.get('/api/profile/me').headers['ETag'] == etag
+
+    authenticated_client.put('/api/profile/me', json={'name': 'Renamed'})
+    response = authenticated_client.get('/api/profile/me', headers={'If-None-Match': etag})
+    assert response.status_code == 200
+    assert response.headers['ETag'] != etag
+    assert response.get_json()['name'] == 'Renamed'
+
+
+@pytest.fixture
+def role_users(db_session):
+    users = create_role_users(3, 'student') + create_role_users(2, 'staff')
+    yield users
+    for user in users:
+        db.session.delete(user)
+    db.session.commit()
+
+
+def test_get_profile_includes_student_details_in_one_query(client, app, role_users):
+    student = role_users[0]
+    login_as(client, student)
+
+    # The session user is already in the identity map; user and student row share one JOIN
+    with assert_queries(db.engine, 1):
+        data = client.get('/api/profile/me').get_json()
+
+    assert data['student'] == {
+        'faculty': 'Science',
+        'course': 'Mathematics',
+        'year_of_study': 2,
+        'application_status': 'Pending',
+        'has_completed_onboarding': False,
+    }
+    assert 'staff' not in data
+
+
+def test_get_profile_includes_staff_details(client, role_users):
+    login_as(client, role_users[-1])
+
+    data = client.get('/api/profile/me').get_json()
+
+    assert data['staff'] == {'department': 'Registry'}
+    assert 'student' not in data
+
+
+def test_student_status_change_changes_etag(client, role_users):
+    student = role_users[0]
+    login_as(client, student)
+    etag = client.get('/api/profile/me').headers['ETag']
+
+    row = db.session.get(Student, student.user_id)
+    row.application_status = 'Approved'
+    row.updated_at = row.updated_at.replace(year=row.updated_at.year + 1)
+    db.session.commit()
+
+    response = client.get('/api/profile/me', headers={'If-None-Match': etag})
+    assert response.status_code == 200
+    assert response.get_json()['student']['application_status'] == 'Approved'
+
+
+def test_get_profile_reads_changes_made_elsewhere(client, role_users):
+    student = role_users[0]
+    login_as(client, student)
+    etag = client.get('/api/profile/me').headers['ETag']
+
+    # As another worker would: the rows change without touching this session's identity map
+    later = student.updated_at.replace(year=student.updated_at.year + 1)
+    db.session.execute(update(User).where(User.user_id == student.user_id).values(name='Renamed', updated_at=later)
+                       .execution_options(synchronize_session=False))
+    db.session.execute(update(Student).where(Student.student_id == student.user_id).values(year_of_study=3)
+                       .execution_options(synchronize_session=False))
+
+    response = client.get('/api/profile/me', headers={'If-None-Match': etag})
+    assert response.status_code == 200
+    assert response.get_json()['name'] == 'Renamed'
+    assert response.get_json()['student']['year_of_study'] == 3
+    assert response.headers['ETag'] != etag
+
+
+@pytest.mark.parametrize('count', [2, 8])
+def test_mixed_listing_query_count_does_not_grow_with_rows(db_session, count):
+    users = create_role_users(count, 'student') + create_role_users(count, 'staff')
+    ids = [user.user_id for user in users]
+    db.session.expunge_all()
+    try:
+        # Users, then one IN query per extension table
+        with assert_queries(db.engine, 3):
+            loaded = db.session.scalars(
+                select(User).options(*role_loader_options()).where(User.user_id.in_(ids))
+            ).all()
+            details = [user.student.course if user.role == 'student' else user.staff.department for user in loaded]
+        assert len(details) == 2 * count
+    finally:
+        for user in db.session.scalars(select(User).where(User.user_id.in_(ids))):
+            db.session.delete(user)
+        db.session.commit()
+
+
+def test_single_role_listing_joins_extension(db_session):
+    users = create_role_users(4, 'student')
+    ids = [user.user_id for user in users]
+    db.session.expunge_all()
+    try:
+        with assert_queries(db.engine, 1):
+            loaded = db.session.scalars(
+                select(User).options(*role_loader_options('student')).where(User.user_id.in_(ids))
+            ).unique().all()
+            assert {user.student.course for user in loaded} == {'Mathematics'}
+    finally:
+        for user in db.session.scalars(select(User).where(User.user_id.in_(ids))):
+            db.session.delete(user)
+        db.session.commit()
@@ -0,0 +1,196 @@
+import importlib
+
+import pytest
+from flask import Flask, jsonify
+from flask_login import LoginManager, login_user
+from flask_limiter import Limiter
+from limits import parse
+from limits.storage import RedisStorage, storage_from_string
+from limits.strategies import SlidingWindowCounterRateLimiter
+
+from services.user.app.extensions import limiter as app_limiter
+from services.user.app.routes import router_bp
+from services.user.app.utils.rate_limit import BoundedMemoryStorage, RateLimitMetrics, rate_limit_key
+from services.user.config import Config
+from .conftest import create_role_users
+from .redis_stub import RedisStub
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_bounded_memory_evicts_least_recently_used_key():
+    storage = BoundedMemoryStorage(max_keys=2)
+
+    storage.incr('a', 60)
+    storage.incr('b', 60)
+    storage.get('a')
+    storage.incr('c', 60)
+
+    assert storage.get('a') == 1
+    assert storage.get('b') == 0
+    assert storage.stats() == {'keys': 2, 'max_keys': 2, 'evictions': 1}
+
+
+def test_bounded_memory_drops_expired_counters():
+    clock = FakeClock()
+    storage = BoundedMemoryStorage(clock=clock)
+
+    assert storage.incr('a', 10, amount=3) == 3
+    clock.now += 10
+
+    assert storage.get('a') == 0
+    assert storage.incr('a', 10) == 1
+    assert storage.get_expiry('a') == clock.now + 10
+
+
+def test_storages_register_uri_schemes():
+    assert isinstance(storage_from_string('bounded-memory://', max_keys=5), BoundedMemoryStorage)
+    # Shared counters use the storage limits ships for Redis; it connects lazily
+    assert isinstance(storage_from_string('redis://:secret@localhost:6379/0'), RedisStorage)
+    assert isinstance(storage_from_string('rediss://:secret@localhost:6380/0'), RedisStorage)
+
+
+@pytest.fixture
+def load_config(monkeypatch):
+    """Returns ``Config`` as the service builds it from the given environment variables."""
+    import services.user.config as config_module
+
+    def load(**env):
+        for name, value in env.items():
+            monkeypatch.setenv(name, value)
+        return importlib.reload(config_module).Config
+
+    yield load
+    monkeypatch.undo()
+    importlib.reload(config_module)
+
+
+def make_worker_app(config):
+    """One worker's app: its own limiter, with storage built from ``config`` as in production."""
+    app = Flask(__name__)
+    app.config.from_object(config)
+    limiter = Limiter(key_func=lambda: 'client')
+
+    @app.route('/write', methods=['POST'])
+    @limiter.limit('3 per hour')
+    def write():
+        return jsonify({"message": "ok"})
+
+    limiter.init_app(app)
+    return app.test_client(), limiter
+
+
+def test_redis_storage_limits_across_workers(load_config):
+    with RedisStub() as redis_stub:
+        config = load_config(RATELIMIT_STORAGE_URI=redis_stub.url)
+        assert config.RATELIMIT_IN_MEMORY_FALLBACK_ENABLED
+        workers = [make_worker_app(config), make_worker_app(config)]
+
+        statuses = [client.post('/write').status_code for client, _ in workers + workers]
+
+        assert statuses == [200, 200, 200, 429]
+        # Every hit reached the shared server; no worker fell back to in-memory counting
+        assert all(isinstance(limiter.storage, RedisStorage) for _, limiter in workers)
+        assert not any(limiter._storage_dead for _, limiter in workers)
+        assert redis_stub.commands.count('EVALSHA') >= 4
+
+
+def test_bounded_memory_takes_max_keys_from_config(load_config):
+    config = load_config(RATELIMIT_STORAGE_URI='bounded-memory://', RATELIMIT_MAX_KEYS='5')
+    _, limiter = make_worker_app(config)
+
+    assert limiter.storage.max_keys == 5
+
+
+def test_bounded_memory_limits_each_worker_separately(load_config):
+    config = load_config(RATELIMIT_STORAGE_URI='bounded-memory://')
+    workers = [make_worker_app(config), make_worker_app(config)]
+
+    statuses = [client.post('/write').status_code for client, _ in workers + workers]
+
+    assert statuses == [200, 200, 200, 200]
+
+
+def test_sliding_window_limit_on_bounded_memory():
+    limiter = SlidingWindowCounterRateLimiter(BoundedMemoryStorage())
+    limit = parse('3 per hour')
+
+    assert [limiter.hit(limit, 'client') for _ in range(4)] == [True, True, True, False]
+    assert limiter.hit(limit, 'other-client')
+
+
+@pytest.fixture
+def limited_app():
+    app = Flask(__name__)
+    app.config.update(
+        RATELIMIT_STORAGE_URI='bounded-memory://',
+        RATELIMIT_STRATEGY='sliding-window-counter',
+        RATELIMIT_HEADERS_ENABLED=True,
+    )
+    limiter = Limiter(key_func=lambda: 'client')
+    metrics = RateLimitMetrics(limiter)
+
+    @app.route('/limited')
+    @limiter.limit('2 per hour')
+    def limited():
+        return jsonify({"message": "ok"})
+
+    @app.route('/open')
+    def unlimited():
+        return jsonify({"message": "ok"})
+
+    limiter.init_app(app)
+    metrics.init_app(app)
+    return app, metrics
+
+
+def test_limiter_counts_allowed_and_rejected_per_endpoint(limited_app):
+    app, metrics = limited_app
+    client = app.test_client()
+
+    statuses = [client.get('/limited').status_code for _ in range(3)]
+    client.get('/open')
+
+    assert statuses == [200, 200, 429]
+    stats = metrics.stats()
+    assert stats['storage'] == 'BoundedMemoryStorage'
+    assert stats['routes'] == {'limited': {'allowed': 2, 'rejected': 1}}
+
+
+@pytest.fixture
+def service_client():
+    """The service's own routes and limiter, with a fresh bounded-memory storage."""
+    app = Flask(__name__)
+    app.config.update(SECRET_KEY='test_secret', RATELIMIT_STORAGE_URI='bounded-memory://',
+                      RATELIMIT_STRATEGY=Config.RATELIMIT_STRATEGY)
+    LoginManager(app).user_loader(lambda user_id: None)
+    app.register_blueprint(router_bp, url_prefix='/api')
+    app_limiter.init_app(app)
+    return app.test_client()
+
+
+def test_only_write_routes_are_limited(service_client):
+    reads = [service_client.get('/api/profile/me').status_code for _ in range(20)]
+    writes = [service_client.post('/api/auth/login', json={}).status_code for _ in range(6)]
+
+    assert 429 not in reads
+    assert writes == [400] * 5 + [429]
+
+
+def test_signed_in_users_are_limited_per_user(app, db_session):
+    user = create_role_users(1, 'staff')[0]
+
+    with app.test_request_context(environ_base={'REMOTE_ADDR': '10.0.0.7'}):
+        assert rate_limit_key() == '10.0.0.7'
+        login_user(user)
+        assert rate_limit_key() == f'user:{user.user_id}'
+
+    db_session.delete(user)
+    db_session.commit()
+
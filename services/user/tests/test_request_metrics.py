@@ -0,0 +1,83 @@
+import logging
+
+import pytest
+from flask import Blueprint, Flask
+from sqlalchemy import create_engine, text
+
+from services.user.app.utils.request_metrics import RequestMetrics, timed
+
+
+@pytest.fixture
+def metrics_app():
+    app = Flask(__name__)
+    metrics = RequestMetrics()
+    engine = create_engine('sqlite://')
+    bp = Blueprint('lookup', __name__)
+
+    @bp.route('/users/<int:user_id>')
+    def lookup(user_id):
+        with engine.connect() as conn:
+            conn.execute(text('SELECT 1'))
+            conn.execute(text('SELECT :user_id'), {'user_id': user_id})
+        with timed('password_hash'):
+            pass
+        return {'user_id': user_id}
+
+    app.register_blueprint(bp)
+    app.config['SLOW_REQUEST_THRESHOLD_MS'] = 0
+    metrics.init_app(app)
+    yield app, metrics
+    engine.dispose()
+
+
+def test_requests_are_recorded_per_endpoint(metrics_app):
+    app, metrics = metrics_app
+    client = app.test_client()
+
+    for user_id in (1, 2, 3):
+        assert client.get(f'/users/{user_id}').status_code == 200
+    assert client.get('/missing').status_code == 404
+
+    output = metrics.render()
+    assert 'user_http_requests_total{blueprint="lookup",endpoint="lookup.lookup",method="GET",status="200"} 3' in output
+    assert 'user_http_requests_total{blueprint="",endpoint="unmatched",method="GET",status="404"} 1' in output
+    assert 'user_http_request_duration_seconds_count{blueprint="lookup",endpoint="lookup.lookup",method="GET"} 3' in output
+    # Two statements per request, so every observation falls in the le="2" bucket
+    assert 'user_http_request_db_queries_bucket{blueprint="lookup",endpoint="lookup.lookup",le="1"} 0' in output
+    assert 'user_http_request_db_queries_bucket{blueprint="lookup",endpoint="lookup.lookup",le="2"} 3' in output
+    assert 'user_http_request_db_queries_sum{blueprint="lookup",endpoint="lookup.lookup"} 6' in output
+    assert ('user_http_request_dependency_seconds_count'
+            '{blueprint="lookup",endpoint="lookup.lookup",dependency="password_hash"} 3') in output
+
+
+def test_queries_outside_requests_are_not_counted(metrics_app):
+    app, metrics = metrics_app
+    engine = create_engine('sqlite://')
+    with engine.connect() as conn:
+        conn.execute(text('SELECT 1'))
+    with timed('password_hash'):
+        pass
+    engine.dispose()
+
+    assert 'user_http_request_db_queries_sum' not in metrics.render()
+
+
+def test_slow_request_log_lists_statements(metrics_app, caplog):
+    app, metrics = metrics_app
+    metrics.slow_threshold = 1e-9
+
+    with caplog.at_level(logging.WARNING, logger='services.user.app.utils.request_metrics'):
+        app.test_client().get('/users/7')
+
+    [record] = caplog.records
+    assert 'Slow request GET /users/7 (lookup.lookup) -> 200' in record.message
+    assert '2 queries' in record.message
+    assert 'SELECT ?' in record.message
+    assert 'user_http_slow_requests_total{blueprint="lookup",endpoint="lookup.lookup"} 1' in metrics.render()
+
+
+def test_metrics_endpoint_serves_prometheus_text(client):
+    response = client.get('/api/internal/metrics')
+    assert response.status_code == 200
+    assert response.mimetype == 'text/plain'
+    assert '# TYPE user_http_request_duration_seconds histogram' in response.get_data(as_text=True)
@@ -0,0 +1,119 @@
+import datetime
+
+import pytest
+
+from services.user.app.extensions import db, mail_dispatcher
+from services.user.app.models.user_model import Student
+from .conftest import create_role_users, login_as, recorded_statements
+
+TRANSITION_URL = '/api/users/application-status'
+STALE = datetime.datetime(2024, 1, 1)
+
+
+@pytest.fixture
+def course(make_course):
+    """Five students: three Pending, two Approved."""
+    return make_course(5, student=lambda i: {
+        'updated_at': STALE, 'application_status': 'Approved' if i >= 3 else 'Pending'})
+
+
+@pytest.fixture
+def chunk_size(app):
+    app.config['APPLICATION_STATUS_CHUNK_SIZE'] = 2
+    yield 2
+    app.config.pop('APPLICATION_STATUS_CHUNK_SIZE')
+
+
+@pytest.fixture
+def outbox(app, mocker):
+    """Turns on the mail queue and captures what is queued instead of sending it."""
+    mocker.patch.dict(app.config, {'MAIL_DEFAULT_SENDER': 'noreply@numeraid.org'})
+    mocker.patch.object(mail_dispatcher, 'app', app)
+    messages = []
+
+    def enqueue_many(batch):
+        batch = list(batch)
+        messages.extend(batch)
+        return len(batch)
+
+    mocker.patch.object(mail_dispatcher, 'enqueue_many', side_effect=enqueue_many)
+    return messages
+
+
+def statuses(course):
+    db.session.expire_all()
+    return sorted(s.application_status for s in Student.query.filter_by(course=course))
+
+
+def test_transition_moves_matching_students(staff_client, course):
+    response = staff_client.post(TRANSITION_URL, json={
+        'status': 'Under Review', 'from_status': 'Pending', 'course': course})
+
+    assert response.status_code == 200
+    assert response.get_json() == {'status': 'Under Review', 'updated': 3, 'chunks': 1, 'notified': 0}
+    assert statuses(course) == ['Approved', 'Approved', 'Under Review', 'Under Review', 'Under Review']
+    moved = Student.query.filter_by(course=course, application_status='Under Review').all()
+    assert all(student.updated_at > STALE for student in moved)
+    untouched = Student.query.filter_by(course=course, application_status='Approved').all()
+    assert all(student.updated_at == STALE for student in untouched)
+
+
+def test_transition_commits_in_chunks(staff_client, course, chunk_size):
+    with recorded_statements(db.engine) as statements:
+        response = staff_client.post(TRANSITION_URL, json={'status': 'Rejected', 'course': course})
+
+    assert response.get_json() == {'status': 'Rejected', 'updated': 5, 'chunks': 3, 'notified': 0}
+    assert len([s for s in statements if s.startswith('UPDATE student')]) == 3
+    assert statuses(course) == ['Rejected'] * 5
+
+
+def test_transition_mails_each_moved_student_per_chunk(app, staff_client, course, chunk_size, outbox, mocker):
+    response = staff_client.post(TRANSITION_URL, json={
+        'status': 'Approved', 'from_status': 'Pending', 'course': course})
+
+    assert response.get_json()['notified'] == 3
+    assert mail_dispatcher.enqueue_many.call_count == 2
+    moved = {s.user.email for s in Student.query.filter_by(course=course) if s.updated_at > STALE}
+    assert {message.recipients[0] for message in outbox} == moved
+    assert all('Approved' in message.subject for message in outbox)
+
+    mocker.patch.dict(app.config, {'APPLICATION_STATUS_NOTIFY': False})
+    response = staff_client.post(TRANSITION_URL, json={'status': 'Rejected', 'course': course})
+    assert response.get_json()['notified'] == 0
+    assert len(outbox) == 3
+
+
+def test_transition_is_idempotent(staff_client, course):
+    body = {'status': 'Approved', 'course': course}
+    assert staff_client.post(TRANSITION_URL, json=body).get_json()['updated'] == 3
+
+    assert staff_client.post(TRANSITION_URL, json=body).get_json()['updated'] == 0
+
+
+@pytest.mark.parametrize('body', [
+    {'status': 'Done', 'course': 'Mathematics'},
+    {'course': 'Mathematics'},
+    {'status': 'Approved', 'from_status': 'Someday', 'course': 'Mathematics'},
+])
+def test_transition_rejects_invalid_body(staff_client, body):
+    response = staff_client.post(TRANSITION_URL, json=body)
+
+    assert response.status_code == 400
+    assert response.get_json()['errors']
+
+
+def test_transition_requires_a_filter(staff_client, course):
+    response = staff_client.post(TRANSITION_URL, json={'status': 'Approved'})
+
+    assert response.status_code == 400
+    assert statuses(course).count('Pending') == 3
+
+
+def test_students_cannot_transition(client, db_session, course):
+    student = create_role_users(1, 'student')[0]
+    login_as(client, student)
+
+    assert client.post(TRANSITION_URL, json={'status': 'Approved', 'course': course}).status_code == 403
+    assert statuses(course).count('Pending') == 3
+    db.session.delete(student)
+    db.session.commit()
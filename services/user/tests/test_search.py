@@ -0,0 +1,167 @@
+import io
+import uuid
+
+import pytest
+from sqlalchemy import text
+from sqlalchemy.dialects import postgresql
+
+from services.user.app.extensions import db
+from services.user.app.cli import users_cli
+from services.user.app.models.user_model import User, Student
+from services.user.app.controllers.import_controller import StudentImport, iter_records
+from services.user.app.controllers.search_controller import search_query
+from services.user.app.utils.search import FTS_TABLE, search_terms, fts_query, like_pattern
+from .conftest import login_as
+
+SEARCH_URL = '/api/users/search'
+
+
+@pytest.fixture
+def token():
+    """A surname fragment no other test data contains."""
+    return 'q' + uuid.uuid4().hex[:8]
+
+
+@pytest.fixture
+def people(db_session, token):
+    users = [
+        User(email=f'thandi.{token}@test.com', name='Thandiwe', surname=f'Nkosi{token}', role='student',
+             student=Student(faculty='Science', course='Mathematics')),
+        User(email=f'sipho.{token}@test.com', name='Sipho', surname=f'Nkosi{token}', role='staff'),
+        User(email=f'nkosi{token}@mail.test.com', name='Ayanda', surname='Dlamini', username=f'ayanda{token}',
+             role='student', student=Student(faculty='Arts', course='History')),
+    ]
+    db.session.add_all(users)
+    db.session.commit()
+    yield users
+    for user in users:
+        if user in db.session:
+            db.session.delete(user)
+    db.session.commit()
+
+
+def search(client, **params):
+    response = client.get(SEARCH_URL, query_string=params)
+    assert response.status_code == 200
+    return [row['email'] for row in response.get_json()['users']]
+
+
+def indexed_ids():
+    return {row[0] for row in db.session.execute(text(f"SELECT rowid FROM {FTS_TABLE}"))}
+
+
+def test_search_ranks_name_matches_first(staff_client, people, token):
+    emails = search(staff_client, q=f'nkosi{token[:5]}')
+
+    assert len(emails) == 3
+    # Two surname hits ahead of the one found only through its email
+    assert emails[-1] == people[2].email
+
+
+def test_search_matches_every_term_as_prefix(staff_client, people, token):
+    assert search(staff_client, q=f'thand nkosi{token}') == [people[0].email]
+    assert search(staff_client, q=f'sipho.{token[:4]}') == [people[1].email]
+    assert search(staff_client, q=f'ayanda{token}') == [people[2].email]
+    assert search(staff_client, q=f'andiwe {token}') == []
+
+
+def test_search_filters_by_role_and_limits(staff_client, people, token):
+    assert search(staff_client, q=f'nkosi{token}', role='staff') == [people[1].email]
+    assert len(search(staff_client, q=f'nkosi{token}', limit=2)) == 2
+
+
+@pytest.mark.parametrize('query', ['', 'a', '  ', '@@ ..'])
+def test_search_ignores_queries_without_terms(staff_client, people, query):
+    assert search(staff_client, q=query) == []
+
+
+def test_search_uses_the_fts_index(db_session):
+    plan = db.session.execute(
+        text('EXPLAIN QUERY PLAN ' + str(search_query('fts5', ['thand']).compile(compile_kwargs={'literal_binds': True})))
+    ).all()
+
+    assert any('VIRTUAL TABLE INDEX' in row[-1] for row in plan)
+
+
+def test_index_follows_updates_and_deletes(staff_client, people, token):
+    people[0].name = 'Zanele'
+    db.session.commit()
+
+    assert search(staff_client, q=f'zanele nkosi{token}') == [people[0].email]
+    assert search(staff_client, q=f'thandiwe nkosi{token}') == []
+
+    user_id = people[1].user_id
+    db.session.delete(people[1])
+    db.session.commit()
+    assert user_id not in indexed_ids()
+
+
+def test_self_registered_user_is_indexed(client, staff_client, token):
+    response = client.post('/api/auth/register', json={
+        'email': f'reg.{token}@test.com', 'username': f'reg{token}', 'name': 'Lindiwe', 'surname': f'Signup{token}',
+        'password': 'Str0ng!Passw0rd', 'confirm_password': 'Str0ng!Passw0rd', 'consent': True,
+    })
+    assert response.status_code == 201
+
+    assert search(staff_client, q=f'lind signup{token}') == [f'reg.{token}@test.com']
+    user = User.query.filter_by(email=f'reg.{token}@test.com').one()
+    db.session.delete(user)
+    db.session.commit()
+    assert user.user_id not in indexed_ids()
+
+
+def test_search_ranks_before_limiting(staff_client, token):
+    # Many weak matches (email only) inserted ahead of the one strong match (surname)
+    users = [User(email=f'rank{token}.{i}@test.com', name='Weak', surname='Match', role='student') for i in range(20)]
+    users.append(User(email=f'strong.{token}@test.com', name='Strong', surname=f'Rank{token}', role='student'))
+    db.session.add_all(users)
+    db.session.commit()
+
+    assert search(staff_client, q=f'rank{token}', limit=1) == [users[-1].email]
+    sql = str(search_query('fts5', ['rank'], limit=1).compile())
+    # The LIMIT applies to matches already ordered by bm25
+    assert 'ORDER BY score, user_search.rowid' in sql.split('AS candidates')[0]
+    for user in users:
+        db.session.delete(user)
+    db.session.commit()
+
+
+def test_bulk_import_is_indexed(staff_client, token):
+    csv = f'email,username,name,surname,faculty,course,year_of_study\nimp.{token}@test.com,,Lwazi,Import{token},Science,Maths,1\n'
+    report = StudentImport(chunk_size=10).run(iter_records(io.BytesIO(csv.encode()), 'csv'))
+    assert report['created'] == 1
+
+    assert search(staff_client, q=f'import{token}') == [f'imp.{token}@test.com']
+    user = User.query.filter_by(email=f'imp.{token}@test.com').one()
+    db.session.delete(user)
+    db.session.commit()
+
+
+def test_reindex_command_refills_the_index(app, staff_client, people, token):
+    db.session.execute(text(f"DELETE FROM {FTS_TABLE}"))
+    assert search(staff_client, q=f'nkosi{token}') == []
+
+    result = app.test_cli_runner().invoke(users_cli, ['reindex-search'])
+
+    assert result.exit_code == 0, result.output
+    assert f'Indexed {User.query.count()} users.' in result.output
+    assert len(search(staff_client, q=f'nkosi{token}')) == 3
+
+
+def test_students_cannot_search(client, people):
+    login_as(client, people[0])
+
+    assert client.get(SEARCH_URL, query_string={'q': 'nkosi'}).status_code == 403
+
+
+def test_trigram_query_matches_the_indexed_expression():
+    sql = str(search_query('trigram', ['nko', '50%']).compile(dialect=postgresql.dialect()))
+
+    assert "lower(name || ' ' || surname || ' ' || email || ' ' || coalesce(username, '')) LIKE" in sql
+    assert 'word_similarity' in sql
+
+
+def test_query_helpers_escape_user_input():
+    assert search_terms('  Jo  "Smi  @ ') == ['jo', '"smi']
+    assert fts_query(['jo', '"smi']) == '"jo"* AND """smi"*'
+    assert like_pattern('50%_a\\b') == '%50\\%\\_a\\\\b%'
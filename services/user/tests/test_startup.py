@@ -0,0 +1,121 @@
+import os
+import sys
+import json
+import time
+import subprocess
+
+import pytest
+
+from services.user.app.extensions import readiness as app_readiness
+from services.user.app.utils.readiness import Readiness
+
+SERVICE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Modules only rarely used paths need; a new worker should not pay for them
+DEFERRED = ('requests', 'jwt', 'app.controllers.oauth_controller')
+
+# Checks what a fresh process imports, not how long it takes: wall-clock
+# timings vary too much between machines to assert on here, so cold start
+# time is compared against a baseline run by ``benchmarks/startup.py``
+CHILD = r"""
+import sys, json
+import app
+after_import = sorted(sys.modules)
+application = app.create_app()
+client = application.test_client()
+first = client.post('/api/auth/login', json={})
+after_first_request = sorted(sys.modules)
+oauth = client.get('/api/oauth/google/auth')
+print(json.dumps({
+    "after_import": after_import,
+    "after_first_request": after_first_request,
+    "after_oauth": sorted(sys.modules),
+    "first_status": first.status_code,
+    "oauth_status": oauth.status_code,
+}))
+"""
+
+
+@pytest.fixture(scope='module')
+def cold_start():
+    env = {**os.environ, 'SECRET_KEY': 'startup-test', 'USER_DATABASE_URL': 'sqlite://',
+           'GOOGLE_CLIENT_ID': 'id', 'GOOGLE_REDIRECT_URI': 'http://localhost/cb'}
+    completed = subprocess.run([sys.executable, '-c', CHILD], cwd=SERVICE_DIR, env=env,
+                               capture_output=True, text=True, timeout=60)
+    assert completed.returncode == 0, completed.stderr
+    return json.loads(completed.stdout.strip().splitlines()[-1])
+
+
+def test_import_does_not_load_dotenv(cold_start):
+    assert 'dotenv' not in cold_start['after_import']
+
+
+def test_first_request_does_not_import_deferred_modules(cold_start):
+    assert cold_start['first_status'] == 400
+    assert not set(DEFERRED) & set(cold_start['after_first_request'])
+
+
+def test_oauth_controller_is_imported_on_first_use(cold_start):
+    assert cold_start['oauth_status'] == 302
+    assert 'app.controllers.oauth_controller' in cold_start['after_oauth']
+
+
+@pytest.fixture
+def readiness(app):
+    readiness = Readiness()
+    readiness.init_app(app)
+    return readiness
+
+
+def wait_until_ready(readiness, timeout=5):
+    deadline = time.monotonic() + timeout
+    while not readiness.ready and time.monotonic() < deadline:
+        time.sleep(0.01)
+    return readiness.ready
+
+
+def test_warm_opens_connections_and_marks_ready(readiness):
+    assert not readiness.ready
+
+    assert readiness.warm() is True
+
+    stats = readiness.stats()
+    assert stats['ready'] is True
+    assert stats['connections'] == 1
+    assert stats['warmed_in_ms'] is not None
+
+
+def test_check_warms_in_the_background(readiness):
+    assert readiness.check() is False
+    assert wait_until_ready(readiness)
+    assert readiness.check() is True
+
+
+def test_failed_warm_stays_not_ready(readiness, mocker):
+    mocker.patch('services.user.app.extensions.db.engine.connect', side_effect=OSError('refused'))
+
+    assert readiness.warm() is False
+    assert not readiness.ready
+    assert readiness.stats()['failures'] == 1
+
+
+@pytest.fixture
+def service_readiness(app, monkeypatch):
+    """The service's own readiness, pointed at the test app and restored afterwards."""
+    for name in ('app', 'connections', '_ready_pid', '_warming_pid', 'warmed_in_ms', 'failures'):
+        monkeypatch.setattr(app_readiness, name, getattr(app_readiness, name))
+    monkeypatch.setitem(app.extensions, 'readiness', app_readiness)
+    app_readiness.init_app(app)
+    return app_readiness
+
+
+def test_ready_endpoint(client, service_readiness):
+    response = client.get('/api/internal/ready')
+    assert response.status_code == 503
+    assert response.headers['Retry-After'] == '1'
+    assert response.get_json() == {"status": "warming"}
+
+    assert wait_until_ready(service_readiness)
+    response = client.get('/api/internal/ready')
+    assert response.status_code == 200
+    assert response.get_json() == {"status": "ready"}
@@ -0,0 +1,189 @@
+import uuid
+
+import pytest
+from flask import Flask, g
+
+from services.user.app.extensions import db, tokens
+from services.user.app.models.user_model import User
+from services.user.app.models.token_model import RevokedToken
+from services.user.app.utils.tokens import InvalidToken
+from services.user.app.utils.csrf import TokenAwareCSRFProtect
+from .conftest import create_role_users, recorded_statements
+
+AUTH_BASE_URL = '/api/auth'
+
+
+def forget_current_user():
+    # The session-wide app context shares ``g`` between requests, so drop the cached user and claims
+    g.pop('_login_user', None)
+    g.pop('_token_claims', None)
+
+
+@pytest.fixture
+def token_mode(app):
+    forget_current_user()
+    tokens.enabled = True
+    tokens.sync_interval = 30
+    yield tokens
+    tokens.enabled = False
+    forget_current_user()
+
+
+@pytest.fixture
+def token_user(db_session):
+    unique_id = uuid.uuid4().hex[:8]
+    user = User(email=f'token_{unique_id}@test.com', username=f'token_{unique_id}',
+                name='Token', surname='User', role='staff')
+    user.set_password('Password123')
+    db.session.add(user)
+    db.session.commit()
+    user_id = user.user_id
+    yield user
+    db.session.rollback()
+    RevokedToken.query.filter_by(user_id=user_id).delete()
+    User.query.filter_by(user_id=user_id).delete()
+    db.session.commit()
+
+
+def bearer(token):
+    return {'Authorization': f'Bearer {token}'}
+
+
+def test_login_issues_token_pair(client, token_mode, token_user, mocker):
+    response = client.post(f'{AUTH_BASE_URL}/login', json={'email': token_user.email, 'password': 'Password123'})
+
+    data = response.get_json()
+    assert response.status_code == 200
+    assert data['token_type'] == 'Bearer'
+    claims = tokens.verify(data['access_token'])
+    assert claims['sub'] == str(token_user.user_id)
+    assert claims['role'] == 'staff'
+    assert claims['active'] is True
+
+
+def test_bearer_token_authenticates_without_database(app, token_mode, token_user):
+    access_token = tokens.issue(token_user)['access_token']
+    tokens.sync()
+
+    # A fresh client with no session cookie; role checks are answered from the claims
+    with app.test_client() as client:
+        with recorded_statements(db.engine) as statements:
+            response = client.post('/api/users/import', data=b'', content_type='text/csv',
+                                   headers=bearer(access_token))
+        assert response.status_code == 200
+        assert not any('FROM user' in s for s in statements)
+
+        assert client.get('/api/profile/me', headers=bearer(access_token)).get_json()['email'] == token_user.email
+        forget_current_user()
+        assert client.get('/api/profile/me', headers=bearer('not-a-token')).status_code == 401
+
+
+def test_refresh_rotates_and_revokes(client, token_mode, token_user):
+    pair = tokens.issue(token_user)
+
+    response = client.post(f'{AUTH_BASE_URL}/token/refresh', json={'refresh_token': pair['refresh_token']})
+    assert response.status_code == 200
+    assert tokens.verify(response.get_json()['access_token'])['sub'] == str(token_user.user_id)
+
+    # The old refresh token cannot be replayed
+    response = client.post(f'{AUTH_BASE_URL}/token/refresh', json={'refresh_token': pair['refresh_token']})
+    assert response.status_code == 401
+
+    # Access tokens are not accepted as refresh tokens
+    response = client.post(f'{AUTH_BASE_URL}/token/refresh', json={'refresh_token': pair['access_token']})
+    assert response.status_code == 401
+
+
+def test_refresh_rejected_for_deactivated_user(client, token_mode, token_user):
+    refresh_token = tokens.issue(token_user)['refresh_token']
+    token_user.is_active = False
+    db.session.commit()
+
+    response = client.post(f'{AUTH_BASE_URL}/token/refresh', json={'refresh_token': refresh_token})
+    assert response.status_code == 401
+
+
+def test_revocation_reaches_other_workers_on_sync(app, token_mode, token_user):
+    access_token = tokens.issue(token_user)['access_token']
+    claims = tokens.verify(access_token)
+
+    # Simulate another worker revoking the token: only the table knows about it
+    with app.test_client() as client:
+        response = client.post(f'{AUTH_BASE_URL}/token/revoke', json={'token': access_token})
+    assert response.status_code == 200
+    tokens._revoked.clear()
+
+    assert tokens.verify(access_token)['jti'] == claims['jti']  # not yet synced
+    tokens.sync()
+    with pytest.raises(InvalidToken):
+        tokens.verify(access_token)
+    assert RevokedToken.query.get(claims['jti']).user_id == token_user.user_id
+
+
+@pytest.fixture
+def csrf_client(token_mode, token_user):
+    """A client of a CSRF-protected app, holding a cookie session for ``token_user``."""
+    csrf_app = Flask(__name__)
+    csrf_app.config.update(SECRET_KEY='test_secret', WTF_CSRF_ENABLED=True)
+    TokenAwareCSRFProtect(tokens).init_app(csrf_app)
+
+    @csrf_app.route('/write', methods=['POST'])
+    def write():
+        return {"message": "ok"}
+
+    @csrf_app.route('/whoami', methods=['POST'])
+    def whoami():
+        return {"sub": tokens.request_claims()['sub']}
+
+    tokens.sync()
+    client = csrf_app.test_client()
+    with client.session_transaction() as sess:
+        sess['_user_id'] = str(token_user.user_id)
+    return client
+
+
+def test_csrf_exempts_only_verified_bearer_tokens(csrf_client, token_user):
+    access_token = tokens.issue(token_user)['access_token']
+
+    assert csrf_client.post('/write').status_code == 400
+    assert csrf_client.post('/write', headers=bearer('bogus')).status_code == 400
+    assert csrf_client.post('/write', headers={'Authorization': 'Basic abc'}).status_code == 400
+    assert csrf_client.post('/write', headers=bearer(access_token)).status_code == 200
+
+    tokens.enabled = False
+    assert csrf_client.post('/write', headers=bearer(access_token)).status_code == 400
+
+
+def test_bearer_request_ignores_the_session_cookie(client, token_mode, token_user):
+    other = create_role_users(1, 'student')[0]
+    with client.session_transaction() as sess:
+        sess['_user_id'] = str(other.user_id)
+
+    response = client.get('/api/profile/me', headers=bearer(tokens.issue(token_user)['access_token']))
+    assert response.get_json()['email'] == token_user.email
+
+    forget_current_user()
+    assert client.get('/api/profile/me', headers=bearer('bogus')).status_code == 401
+    db.session.delete(other)
+    db.session.commit()
+
+
+
+def test_bearer_header_ignored_when_tokens_disabled(client, token_user):
+    forget_current_user()
+    with client.session_transaction() as sess:
+        sess['_user_id'] = str(token_user.user_id)
+
+    response = client.get('/api/profile/me', headers=bearer('abc'))
+    assert response.status_code == 200
+    assert response.get_json()['email'] == token_user.email
+    forget_current_user()
+
+
+def test_request_verifies_token_once(csrf_client, token_user, mocker):
+    access_token = tokens.issue(token_user)['access_token']
+    verify = mocker.spy(tokens, 'verify')
+
+    response = csrf_client.post('/whoami', headers=bearer(access_token))
+    assert response.get_json()['sub'] == str(token_user.user_id)
+    assert verify.call_count == 1
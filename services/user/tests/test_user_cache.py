@@ -0,0 +1,103 @@
+import uuid
+
+import pytest
+
+from services.user.app.extensions import db
+from services.user.app.models.user_model import User
+from services.user.app.utils.cache import TTLCache, UserCache
+from .conftest import recorded_statements, login_as
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def cached_user(db_session):
+    unique_id = uuid.uuid4().hex[:8]
+    user = User(email=f'cache_{unique_id}@test.com', username=f'cache_{unique_id}',
+                name='Cache', surname='User', role='student')
+    db.session.add(user)
+    db.session.commit()
+    user_id = user.user_id
+    yield user
+    db.session.rollback()
+    User.query.filter_by(user_id=user_id).delete()
+    db.session.commit()
+
+
+def test_ttl_cache_expires_entries():
+    clock = FakeClock()
+    cache = TTLCache(ttl=10, max_size=10, clock=clock)
+    cache.set('a', 1)
+    assert cache.get('a') == 1
+    clock.now = 11
+    assert cache.get('a') is None
+    assert cache.stats()['hits'] == 1
+    assert cache.stats()['misses'] == 1
+
+
+def test_ttl_cache_evicts_least_recently_used():
+    cache = TTLCache(ttl=60, max_size=2)
+    cache.set('a', 1)
+    cache.set('b', 2)
+    cache.get('a')
+    cache.set('c', 3)
+    assert cache.get('b') is None
+    assert cache.get('a') == 1
+    assert cache.get('c') == 3
+    assert cache.stats()['evictions'] == 1
+
+
+def test_ttl_cache_disabled_with_zero_ttl():
+    cache = TTLCache(ttl=0)
+    cache.set('a', 1)
+    assert cache.get('a') is None
+
+
+def test_user_cache_hit_skips_database(app, cached_user):
+    cache = UserCache(ttl=60, max_size=10)
+    user_id = cached_user.user_id
+
+    db.session.expunge_all()
+    assert cache.load(db.session, User, user_id).email == cached_user.email
+
+    db.session.expunge_all()
+    with recorded_statements(db.engine) as statements:
+        user = cache.load(db.session, User, user_id)
+        assert user.email == cached_user.email
+        assert user in db.session
+    assert statements == []
+    assert cache.stats()['hits'] == 1
+    assert cache.stats()['misses'] == 1
+
+
+def test_user_cache_invalidated_on_update(app, cached_user):
+    from services.user.app.extensions import user_cache
+    user_id = cached_user.user_id
+
+    user_cache.clear()
+    db.session.expunge_all()
+    user_cache.load(db.session, User, user_id)
+    assert user_cache.get(user_id) is not None
+
+    user = db.session.get(User, user_id)
+    user.is_active = False
+    db.session.commit()
+    assert user_cache.get(user_id) is None
+
+
+def test_signed_in_requests_load_the_user_from_cache(client, cached_user):
+    from services.user.app.extensions import user_cache
+
+    login_as(client, cached_user)
+    assert client.get('/api/profile/me').status_code == 200
+    hits = user_cache.stats()['hits']
+
+    login_as(client, cached_user)
+    assert client.get('/api/profile/me').status_code == 200
+    assert user_cache.stats()['hits'] == hits + 1
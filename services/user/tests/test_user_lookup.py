@@ -0,0 +1,113 @@
+import uuid
+
+import pytest
+
+from services.user.app.extensions import db, lookup_cache
+from services.user.app.models.user_model import User
+from .conftest import assert_queries
+
+LOOKUP_URL = '/api/internal/users/lookup'
+
+
+@pytest.fixture
+def lookup_users(db_session):
+    users = [
+        User(email=f'lookup-{uuid.uuid4().hex[:8]}@test.com', name='Look', surname=f'Up{i}',
+             role='student', profile_picture_url=f'http://example.com/{i}.png')
+        for i in range(5)
+    ]
+    db.session.add_all(users)
+    db.session.commit()
+    yield users
+    for user in users:
+        db.session.delete(user)
+    db.session.commit()
+    lookup_cache.clear()
+
+
+@pytest.fixture
+def lookup_config(app):
+    keys = ('USER_LOOKUP_CHUNK_SIZE', 'USER_LOOKUP_MAX_KEYS')
+    saved = {key: app.config[key] for key in keys if key in app.config}
+    ttl = lookup_cache.ttl
+    yield app.config
+    for key in keys:
+        app.config.pop(key, None)
+    app.config.update(saved)
+    lookup_cache.ttl = ttl
+    lookup_cache.clear()
+
+
+def test_lookup_keeps_request_order_and_reports_missing(client, lookup_users):
+    ids = [lookup_users[3].user_id, 999999, lookup_users[0].user_id, lookup_users[3].user_id]
+
+    response = client.post(LOOKUP_URL, json={'ids': ids})
+
+    assert response.status_code == 200
+    data = response.get_json()
+    assert [user['user_id'] for user in data['users']] == [lookup_users[3].user_id, lookup_users[0].user_id]
+    assert data['users'][0]['surname'] == 'Up3'
+    assert data['users'][0]['profile_picture_url'] == 'http://example.com/3.png'
+    assert 'password_hash' not in data['users'][0]
+    assert data['missing'] == [999999]
+
+
+def test_lookup_by_email(client, lookup_users):
+    emails = [lookup_users[1].email.upper(), 'nobody@test.com']
+
+    data = client.post(LOOKUP_URL, json={'emails': emails}).get_json()
+
+    assert [user['user_id'] for user in data['users']] == [lookup_users[1].user_id]
+    assert data['missing'] == ['nobody@test.com']
+
+
+def test_large_batches_are_chunked(client, lookup_users, lookup_config):
+    lookup_config['USER_LOOKUP_CHUNK_SIZE'] = 2
+    ids = [user.user_id for user in lookup_users]
+
+    with assert_queries(db.engine, 3):
+        data = client.post(LOOKUP_URL, json={'ids': ids}).get_json()
+
+    assert len(data['users']) == 5
+
+
+def test_lookup_cache_serves_repeats_and_drops_on_write(client, lookup_users, lookup_config):
+    lookup_cache.ttl = 30
+    ids = [user.user_id for user in lookup_users[:2]]
+    client.post(LOOKUP_URL, json={'ids': ids})
+
+    with assert_queries(db.engine, 0):
+        data = client.post(LOOKUP_URL, json={'ids': ids}).get_json()
+    assert len(data['users']) == 2
+
+    lookup_users[0].name = 'Renamed'
+    db.session.commit()
+    with assert_queries(db.engine, 1):
+        data = client.post(LOOKUP_URL, json={'ids': ids}).get_json()
+    assert data['users'][0]['name'] == 'Renamed'
+
+
+@pytest.mark.parametrize('body', [
+    {},
+    {'ids': [1], 'emails': ['a@test.com']},
+    {'ids': '1,2'},
+    {'ids': ['1']},
+    {'emails': [1]},
+])
+def test_lookup_rejects_malformed_bodies(client, body):
+    assert client.post(LOOKUP_URL, json=body).status_code == 400
+
+
+def test_lookup_rejects_oversized_batches(client, lookup_config):
+    lookup_config['USER_LOOKUP_MAX_KEYS'] = 3
+    response = client.post(LOOKUP_URL, json={'ids': [1, 2, 3, 4]})
+    assert response.status_code == 400
+    assert 'At most 3' in response.get_json()['error']
+
+
+def test_lookup_rejects_non_ascii_internal_token(client, app, monkeypatch):
+    monkeypatch.setitem(app.config, 'INTERNAL_API_TOKEN', 'secret-token')
+
+    response = client.post(LOOKUP_URL, json={'ids': [1]}, headers={'X-Internal-Token': 'sécret-tökén'})
+
+    assert response.status_code == 403
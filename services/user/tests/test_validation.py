@@ -0,0 +1,86 @@
+import pytest
+
+from services.user.app.validation import (
+    REGISTER_SCHEMA, LOGIN_SCHEMA, PROFILE_SCHEMA, password_strength, is_valid_email,
+)
+
+
+def register_body(**overrides):
+    body = {'email': 'valid@test.com', 'username': 'valid', 'name': 'Val', 'surname': 'Id',
+            'password': 'Password123', 'confirm_password': 'Password123', 'consent': True}
+    body.update(overrides)
+    return body
+
+
+@pytest.mark.parametrize('password, message', [
+    ('Short1', 'Password must be at least 8 characters long.'),
+    ('password123', 'Password must contain at least one uppercase letter.'),
+    ('PASSWORD123', 'Password must contain at least one lowercase letter.'),
+    ('Password!!', 'Password must contain at least one number.'),
+    ('Password123', None),
+    ('pässwörD 1', None),
+    ('Password\u0663', None),
+    ('Password\u00b2!', 'Password must contain at least one number.'),
+])
+def test_password_strength(password, message):
+    assert password_strength(password) == message
+
+
+@pytest.mark.parametrize('email, valid', [
+    ('user@test.com', True),
+    ('first.last+tag@sub.numeraid.org', True),
+    ('user@localhost', False),
+    ('user at test.com', False),
+    ('@test.com', False),
+])
+def test_is_valid_email(email, valid):
+    assert is_valid_email(email) is valid
+
+
+def test_register_schema_accepts_valid_body():
+    values, errors = REGISTER_SCHEMA.validate(register_body(name='  <b>Val</b> ', extra='ignored'))
+    assert errors == {}
+    assert values['name'] == '&lt;b&gt;Val&lt;/b&gt;'
+    assert values['consent'] is True
+    assert 'extra' not in values
+
+
+def test_register_schema_reports_every_invalid_field():
+    values, errors = REGISTER_SCHEMA.validate({'email': 'nope', 'username': 'ab', 'password': 'Password123',
+                                               'confirm_password': 'Password124', 'name': 42})
+    assert errors == {
+        'email': ['Invalid email address.'],
+        'username': ['Field must be between 3 and 50 characters long.'],
+        'name': ['Must be a string.'],
+        'surname': ['This field is required.'],
+        'confirm_password': ['Field must be equal to password.'],
+        'consent': ['This field is required.'],
+    }
+
+
+def test_passwords_are_not_sanitized():
+    values, errors = REGISTER_SCHEMA.validate(register_body(password=' <Password123> ',
+                                                            confirm_password=' <Password123> '))
+    assert errors == {}
+    assert values['password'] == ' <Password123> '
+
+
+@pytest.mark.parametrize('body', [None, [], 'text'])
+def test_non_object_body_is_rejected(body):
+    assert LOGIN_SCHEMA.validate(body) == ({}, {'body': ['Expected a JSON object.']})
+
+
+@pytest.mark.parametrize('remember, expected', [
+    (True, True), ('y', True), ('true', True), (1, True),
+    (False, False), ('n', False), (None, False), ([], False),
+])
+def test_login_schema_parses_remember(remember, expected):
+    values, errors = LOGIN_SCHEMA.validate({'email': 'a@test.com', 'password': 'x', 'remember': remember})
+    assert errors == {}
+    assert values['remember'] is expected
+
+
+def test_profile_schema_only_returns_present_fields():
+    assert PROFILE_SCHEMA.validate({'name': 'New'}) == ({'name': 'New'}, {})
+    assert PROFILE_SCHEMA.validate({}) == ({}, {})
+    assert PROFILE_SCHEMA.validate({'surname': ' '}) == ({}, {'surname': ['This field is required.']})
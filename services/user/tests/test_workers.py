@@ -0,0 +1,61 @@
+import threading
+
+from services.user.app.utils import workers
+from services.user.app.utils.workers import ProcessThread, wait_for
+
+
+def make_worker(resets):
+    lock = threading.Lock()
+    worker = None
+
+    def run():
+        worker.stopping.wait()
+
+    worker = ProcessThread(run, 'test-worker', lock, reset=lambda: resets.append(1))
+    return worker
+
+
+def test_thread_starts_once_per_process(monkeypatch):
+    resets = []
+    worker = make_worker(resets)
+
+    worker.ensure()
+    first = worker._thread.current()
+    worker.ensure()
+    assert worker._thread.current() is first
+    assert resets == [1]
+
+    # A forked child sees the parent's thread object but not the thread itself
+    parent_stopping = worker.stopping
+    monkeypatch.setattr(workers.os, 'getpid', lambda: -1)
+    assert not worker.started
+    assert worker._thread.clear() is None
+    worker.ensure()
+    assert worker._thread.current() is not first
+    assert resets == [1, 1]
+
+    assert worker.stop(5)
+    parent_stopping.set()
+    first.join(5)
+    assert not first.is_alive()
+
+
+def test_stop_lets_ensure_start_again():
+    worker = make_worker([])
+    assert not worker.stop(5)
+
+    worker.ensure()
+    thread = worker._thread.current()
+    assert worker.stop(5)
+    assert not thread.is_alive()
+    assert not worker.started
+
+    worker.ensure()
+    assert worker._thread.current().is_alive()
+    worker.stop(5)
+
+
+def test_wait_for_times_out():
+    ticks = iter(range(100))
+    assert wait_for(lambda: True, timeout=0)
+    assert not wait_for(lambda: False, timeout=3, clock=lambda: next(ticks))